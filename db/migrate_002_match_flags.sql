@@ -1,3 +1,4 @@
+-- 참고용(수동 실행 X): 실제 스키마는 shaded/services/migrations.py가 PRAGMA user_version 기준으로 적용
 -- 1) 컬럼 추가 (기존 데이터 안 날아감)
 ALTER TABLE matches ADD COLUMN is_custom_match INTEGER NOT NULL DEFAULT 0;
 ALTER TABLE matches ADD COLUMN is_casual      INTEGER NOT NULL DEFAULT 0;
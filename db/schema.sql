@@ -1,3 +1,4 @@
+-- 참고용(수동 실행 X): 실제 스키마는 shaded/services/migrations.py가 PRAGMA user_version 기준으로 적용
 -- sqlite
 PRAGMA foreign_keys = ON;
 
@@ -5,8 +5,10 @@ import discord
 from discord.ext import commands
 
 from .config import Settings
-from shaded.services.user_store import init_db
-from shaded.services.clan_store import init_clan_tables
+from shaded.services.migrations import ensure_schema
+from shaded.services.pubg_http import PubgHttpService
+from shaded.services.sqlite_conn import SqlitePool, register_pool, unregister_pool
+from shaded.services.db_writer import DbWriter, register_writer, unregister_writer
 
 
 def discover_extensions() -> list[str]:
@@ -41,10 +43,27 @@ class ShadedBot(commands.Bot):
             activity=discord.Game(name="Shaded | /ping"),
         )
         self.settings = settings
+        self.pubg = PubgHttpService(settings)
+        self.db_pool = SqlitePool(settings.db_path, readers=settings.db_pool_readers)
+        self.db_writer = DbWriter(
+            settings.db_path,
+            max_batch=settings.db_write_max_batch,
+            linger_ms=settings.db_write_linger_ms,
+        )
 
     async def setup_hook(self):
-        await init_db(self.settings.db_path)
-        await init_clan_tables(self.settings.db_path)
+        # 스키마(user_version 기준, 최신이면 pragma 1번) → 그다음 풀/커넥션
+        await ensure_schema(self.settings.db_path)
+
+        # sqlite 연결 풀(봇 수명 동안 유지) → 이후 open_db(settings.db_path)는 풀에서 빌림
+        await self.db_pool.start()
+        register_pool(self.db_pool)
+        # 봇 쪽 쓰기(run_write)는 writer task 하나가 모아서 group commit
+        self.db_writer.start()
+        register_writer(self.db_writer)
+
+        # PUBG HTTP 세션/클라이언트는 봇 전체에서 1개(cog 로드 전에 준비)
+        await self.pubg.start()
 
         exts = discover_extensions()
         print(f"[BOOT] discover_extensions={len(exts)}", flush=True)
@@ -74,6 +93,16 @@ class ShadedBot(commands.Bot):
             synced = await self.tree.sync()
             print(f"[SYNC] global commands={len(synced)} {[c.name for c in synced]}", flush=True)
 
+    async def close(self):
+        try:
+            await super().close()
+        finally:
+            await self.pubg.close()
+            unregister_writer(self.settings.db_path)
+            await self.db_writer.close()
+            unregister_pool(self.settings.db_path)
+            await self.db_pool.close()
+
     async def on_ready(self):
         print(f"[READY] user={self.user} id={getattr(self.user, 'id', None)}", flush=True)
         print(f"[READY] guilds={len(self.guilds)}", flush=True)
@@ -40,7 +40,7 @@ def _has_any_role(member: discord.Member, role_ids: set[int]) -> bool:
 
 
 async def _table_exists(db_path: str, name: str) -> bool:
-    async with open_db(db_path) as db:
+    async with open_db(db_path, readonly=True) as db:
         cur = await db.execute(
             "SELECT 1 FROM sqlite_master WHERE type='table' AND name=? LIMIT 1",
             (name,),
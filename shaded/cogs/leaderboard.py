@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
 import discord
 from discord.ext import commands
 from discord import app_commands
@@ -7,13 +12,20 @@ from discord import app_commands
 from shaded.config import Settings
 from shaded.utils.time_window import week_window_utc, last_week_window_utc
 from shaded.services.leaderboard_store import fetch_weekly_leaderboard, fetch_weekly_snapshot
-from shaded.services.clan_store import CLAN_ID_ALIAS
-from shaded.services.sync_state import get_weekly_sync_last_utc_z
+from shaded.services.clan_store import CLAN_ID_ALIAS, membership_generation
+from shaded.services.sync_state import get_weekly_sync_last_state
 from datetime import datetime, timezone, timedelta
 
 
 KST = timezone(timedelta(hours=9))
 
+# 실시간 집계 결과 캐시: sync가 weekly_sync_last_utc_z를 새로 쓰면(버전 변경) 무효, /등록·/등록해제도 무효.
+# 수동 도구(ingest_one_player 등)는 sync_state를 안 건드리므로 안전망으로 최대 보관 시간을 둠
+BOARD_CACHE_MAX_ENTRIES = 64
+BOARD_CACHE_MAX_AGE_SEC = 10 * 60
+
+Rows = list[tuple[str, int]]
+
 
 def _fmt_last_sync_kst(utc_z: str | None) -> str:
     if not utc_z:
@@ -37,6 +49,64 @@ def _fmt_snapshot_created_kst(created_at_utc: str | None) -> str | None:
         return None
 
 
+class _BoardCache:
+    """
+    (scope, 주간 구간, 데이터 버전) → TOP 10 rows.
+
+    - 버전 = sync_state weekly_sync_last_utc_z의 (value, updated_at) → sync가 끝나면 키가 바뀌어 자연히 miss
+      + clan_store.membership_generation → 봇에서 멤버 등록/해제하면 바로 miss
+    - 같은 키 동시 miss는 집계 1번을 같이 기다림(single-flight)
+    - 끝난 스냅샷(지난랭킹)은 바뀌지 않으므로 따로 무기한 보관
+    """
+
+    def __init__(self, max_entries: int = BOARD_CACHE_MAX_ENTRIES, max_age_sec: float = BOARD_CACHE_MAX_AGE_SEC):
+        self.max_entries = max_entries
+        self.max_age_sec = max_age_sec
+        self._rows: "OrderedDict[tuple, Tuple[Rows, float]]" = OrderedDict()
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self._snapshots: Dict[Tuple[str, str], Tuple[Rows, str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.dedup_hits = 0
+
+    async def get(self, key: tuple, load: Callable[[], Awaitable[Rows]]) -> Rows:
+        hit = self._rows.get(key)
+        if hit is not None and time.time() - hit[1] < self.max_age_sec:
+            self.hits += 1
+            self._rows.move_to_end(key)
+            return hit[0]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(load())
+            self._inflight[key] = task
+
+            def _done(t: asyncio.Task, k=key) -> None:
+                if self._inflight.get(k) is t:
+                    del self._inflight[k]
+                if t.cancelled() or t.exception() is not None:
+                    return
+                self._rows[k] = (t.result(), time.time())
+                self._rows.move_to_end(k)
+                while len(self._rows) > self.max_entries:
+                    self._rows.popitem(last=False)
+
+            task.add_done_callback(_done)
+        else:
+            self.dedup_hits += 1
+
+        # 한 명이 인터랙션을 놓쳐도(취소) 같이 기다리던 쪽 집계는 계속
+        return await asyncio.shield(task)
+
+    def get_snapshot(self, scope: str, week_start_utc_z: str) -> Optional[Tuple[Rows, str]]:
+        return self._snapshots.get((scope, week_start_utc_z))
+
+    def put_snapshot(self, scope: str, week_start_utc_z: str, rows: Rows, created_at_utc: str) -> None:
+        # 스냅샷이 "있을 때"만 저장(없으면 나중에 생길 수 있음)
+        self._snapshots[(scope, week_start_utc_z)] = (rows, created_at_utc)
+
+
 SCOPE_CHOICES = [
     app_commands.Choice(name="일반(캐주얼/커스텀 제외)", value="normal"),
     app_commands.Choice(name="경쟁(캐주얼/커스텀 제외)", value="ranked"),
@@ -58,27 +128,15 @@ def _scope_desc(scope: str) -> str:
 
 async def _send_board(
     interaction: discord.Interaction,
-    settings: Settings,
     title_prefix: str,
     scope: str,
-    start_utc_z: str,
-    end_utc_z: str,
     start_kst_str: str,
     end_kst_str: str,
-    rows_override: list[tuple[str, int]] | None = None,
+    rows: Rows,
+    last_sync_utc_z: str | None,
     snapshot: bool = False,
     snapshot_created_at_utc: str | None = None,
 ):
-    rows = rows_override if rows_override is not None else await fetch_weekly_leaderboard(
-        db_path=settings.db_path,
-        clan_id=CLAN_ID_ALIAS,         # ✅ DB는 alias로 고정
-        platform=settings.pubg_shard,
-        start_utc_z=start_utc_z,
-        end_utc_z=end_utc_z,
-        scope=scope,
-        limit=10,
-    )
-
     label = _scope_label(scope)
     embed = discord.Embed(
         title=f"{title_prefix}{' (스냅샷)' if snapshot else ''} · {label}",
@@ -86,8 +144,6 @@ async def _send_board(
         + (f"\n스냅샷 생성: {_fmt_snapshot_created_kst(snapshot_created_at_utc)} (KST)" if snapshot and _fmt_snapshot_created_kst(snapshot_created_at_utc) else "")
         + ("\n스냅샷: ✅ (지난 주 주간 종료 시점 기준)" if snapshot else ""),
     )
-
-    last_sync_utc_z = await get_weekly_sync_last_utc_z(settings.db_path)
     embed.set_footer(text=f"마지막 갱신: {_fmt_last_sync_kst(last_sync_utc_z)} (KST)")
 
     if not rows:
@@ -104,6 +160,28 @@ class LeaderboardCog(commands.Cog):
     def __init__(self, bot: commands.Bot, settings: Settings):
         self.bot = bot
         self.settings = settings
+        self.cache = _BoardCache()
+
+    async def _live_rows(self, scope: str, start_utc_z: str, end_utc_z: str) -> Tuple[Rows, str | None]:
+        """실시간 집계(캐시 경유). return: (rows, 마지막 sync UTC Z)"""
+        # 버전 확인은 sync_state 한 줄 조회 → footer 값도 여기서 같이 얻음
+        state = await get_weekly_sync_last_state(self.settings.db_path)
+        last_sync_utc_z = state[0] if state else None
+        key = (scope, start_utc_z, end_utc_z, state, membership_generation(self.settings.db_path))
+
+        rows = await self.cache.get(
+            key,
+            lambda: fetch_weekly_leaderboard(
+                db_path=self.settings.db_path,
+                clan_id=CLAN_ID_ALIAS,         # ✅ DB는 alias로 고정
+                platform=self.settings.pubg_shard,
+                start_utc_z=start_utc_z,
+                end_utc_z=end_utc_z,
+                scope=scope,
+                limit=10,
+            ),
+        )
+        return rows, last_sync_utc_z
 
     @app_commands.command(name="주간랭킹", description="이번 주 주간 킬 랭킹")
     @app_commands.choices(scope=SCOPE_CHOICES)
@@ -113,15 +191,15 @@ class LeaderboardCog(commands.Cog):
         scope: app_commands.Choice[str],
     ):
         w = week_window_utc()
+        rows, last_sync_utc_z = await self._live_rows(scope.value, w.start_utc_z, w.end_utc_z)
         await _send_board(
             interaction=interaction,
-            settings=self.settings,
             title_prefix="주간 킬 랭킹",
             scope=scope.value,
-            start_utc_z=w.start_utc_z,
-            end_utc_z=w.end_utc_z,
             start_kst_str=w.start_kst.strftime("%Y-%m-%d %H:%M"),
             end_kst_str=w.end_kst.strftime("%Y-%m-%d %H:%M"),
+            rows=rows,
+            last_sync_utc_z=last_sync_utc_z,
         )
 
     @app_commands.command(name="지난랭킹", description="지난 주 주간 킬 랭킹")
@@ -133,27 +211,38 @@ class LeaderboardCog(commands.Cog):
     ):
         w = last_week_window_utc()
 
-        # ✅ 스냅샷 우선 (없으면 기존처럼 실시간 집계)
-        snap_rows, snap_created = await fetch_weekly_snapshot(
-            db_path=self.settings.db_path,
-            clan_id=CLAN_ID_ALIAS,
-            platform=self.settings.pubg_shard,
-            week_start_utc_z=w.start_utc_z,
-            scope=scope.value,
-            limit=10,
-        )
+        # ✅ 스냅샷 우선 (없으면 기존처럼 실시간 집계). 스냅샷은 불변 → 한 번 읽으면 메모리에서
+        snap = self.cache.get_snapshot(scope.value, w.start_utc_z)
+        if snap is None:
+            snap_rows, snap_created = await fetch_weekly_snapshot(
+                db_path=self.settings.db_path,
+                clan_id=CLAN_ID_ALIAS,
+                platform=self.settings.pubg_shard,
+                week_start_utc_z=w.start_utc_z,
+                scope=scope.value,
+                limit=10,
+            )
+            if snap_created is not None:
+                self.cache.put_snapshot(scope.value, w.start_utc_z, snap_rows, snap_created)
+                snap = (snap_rows, snap_created)
+
+        if snap is not None:
+            rows, snap_created = snap  # empty list여도 스냅샷이면 그대로 표시
+            state = await get_weekly_sync_last_state(self.settings.db_path)
+            last_sync_utc_z = state[0] if state else None
+        else:
+            snap_created = None
+            rows, last_sync_utc_z = await self._live_rows(scope.value, w.start_utc_z, w.end_utc_z)
 
         await _send_board(
             interaction=interaction,
-            settings=self.settings,
             title_prefix="지난 주 킬 랭킹",
             scope=scope.value,
-            start_utc_z=w.start_utc_z,
-            end_utc_z=w.end_utc_z,
             start_kst_str=w.start_kst.strftime("%Y-%m-%d %H:%M"),
             end_kst_str=w.end_kst.strftime("%Y-%m-%d %H:%M"),
-            rows_override=snap_rows if snap_created is not None else None,  # empty list여도 스냅샷이면 그대로 표시
-            snapshot=True if snap_created is not None else False,
+            rows=rows,
+            last_sync_utc_z=last_sync_utc_z,
+            snapshot=snap is not None,
             snapshot_created_at_utc=snap_created,
         )
 
@@ -1,10 +1,10 @@
 import discord
-import aiohttp
 from discord import app_commands
 from discord.ext import commands
 
 from shaded.services.pubg_stats import PubgStatsService
-from shaded.services.pubg_api import PubgApiClient, PubgApiError
+from shaded.services.pubg_api import PubgApiError
+from shaded.services.player_resolver import PlayerResolver
 from shaded.ui.embeds import normal_embed, ranked_embed
 from shaded.services.user_store import get_pubg_nickname, set_pubg_nickname
 from shaded.services.clan_store import upsert_clan_member, deactivate_clan_member, find_active_member_account_id
@@ -39,8 +39,11 @@ class PubgCog(commands.Cog):
         self.bot = bot
 
     def _svc(self) -> PubgStatsService:
-        settings = getattr(self.bot, "settings", None)
-        return PubgStatsService(settings.pubg_api_key, settings.pubg_shard)
+        # ShadedBot.setup_hook에서 만든 봇 전역 서비스(세션/리미터/시즌 캐시 공유)
+        return self.bot.pubg.stats
+
+    def _resolver(self) -> PlayerResolver:
+        return self.bot.pubg.resolver
 
     def _db_path(self) -> str:
         settings = getattr(self.bot, "settings", None)
@@ -177,13 +180,10 @@ class PubgCog(commands.Cog):
         await interaction.response.defer(ephemeral=True, thinking=True)
 
         try:
-            async with aiohttp.ClientSession() as session:
-                client = PubgApiClient(settings.pubg_api_key, settings.pubg_shard, session)
-                p = await client.get_player(nickname)
+            p = await self._resolver().resolve(nickname)
 
-            account_id = p.get("id")
-            attrs = p.get("attributes") or {}
-            player_name = attrs.get("name") or nickname
+            account_id = p.account_id
+            player_name = p.player_name
             await upsert_clan_member(settings.db_path, settings.pubg_shard, account_id, player_name)
 
             await interaction.followup.send(
@@ -218,12 +218,9 @@ class PubgCog(commands.Cog):
                 await interaction.followup.send("서버 설정에 PUBG_API_KEY가 비어있음", ephemeral=True)
                 return
             try:
-                async with aiohttp.ClientSession() as session:
-                    client = PubgApiClient(settings.pubg_api_key, settings.pubg_shard, session)
-                    p = await client.get_player(nickname)
-                account_id = p.get("id")
-                attrs = p.get("attributes") or {}
-                player_name = attrs.get("name") or nickname
+                p = await self._resolver().resolve(nickname)
+                account_id = p.account_id
+                player_name = p.player_name
             except PubgApiError as e:
                 await interaction.followup.send(f"해제 실패(조회): {e}", ephemeral=True)
                 return
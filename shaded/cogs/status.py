@@ -9,9 +9,13 @@ from discord.ext import commands
 
 from shaded.config import Settings
 from shaded.services.clan_store import CLAN_ID_ALIAS
-from shaded.services.leaderboard_store import fetch_weekly_leaderboard
+from shaded.services.leaderboard_store import SQL_COUNT_WEEK_MATCHES, fetch_weekly_leaderboard
 from shaded.services.sqlite_conn import open_db
-from shaded.services.sync_state import get_weekly_sync_last_utc_z, get_weekly_sync_last_error
+from shaded.services.sync_state import (
+    get_weekly_sync_bad_player_ids,
+    get_weekly_sync_last_error,
+    get_weekly_sync_last_utc_z,
+)
 from shaded.utils.time_window import week_window_utc
 
 KST = timezone(timedelta(hours=9))
@@ -42,7 +46,7 @@ async def _get_job_lock(db_path: str) -> tuple[bool, int, str | None]:
     """return (running, locked_until_epoch, locked_by)"""
     now = int(time.time())
     try:
-        async with open_db(db_path) as db:
+        async with open_db(db_path, readonly=True) as db:
             cur = await db.execute(
                 "SELECT locked_until, locked_by FROM job_lock WHERE job_name=?",
                 (JOB_NAME,),
@@ -61,12 +65,12 @@ async def _get_job_lock(db_path: str) -> tuple[bool, int, str | None]:
 
 
 async def _count_active_members(db_path: str, clan_id: str, platform: str) -> int:
-    async with open_db(db_path) as db:
+    async with open_db(db_path, readonly=True) as db:
         cur = await db.execute(
             """
             SELECT COUNT(*)
               FROM clan_members
-             WHERE clan_id=? AND platform=? AND COALESCE(is_active, 1)=1
+             WHERE clan_id=? AND platform=? AND is_active=1
             """,
             (clan_id, platform),
         )
@@ -76,19 +80,8 @@ async def _count_active_members(db_path: str, clan_id: str, platform: str) -> in
 
 
 async def _count_week_matches(db_path: str, platform: str, start_utc_z: str, end_utc_z: str) -> int:
-    async with open_db(db_path) as db:
-        cur = await db.execute(
-            """
-            SELECT COUNT(*)
-              FROM matches
-             WHERE platform=?
-               AND created_at_utc >= ?
-               AND created_at_utc < ?
-               AND COALESCE(is_casual, 0) = 0
-               AND COALESCE(is_custom_match, 0) = 0
-            """,
-            (platform, start_utc_z, end_utc_z),
-        )
+    async with open_db(db_path, readonly=True) as db:
+        cur = await db.execute(SQL_COUNT_WEEK_MATCHES, (platform, start_utc_z, end_utc_z))
         row = await cur.fetchone()
         await cur.close()
         return int(row[0] or 0)
@@ -146,6 +139,46 @@ class StatusCog(commands.Cog):
         else:
             err_str = "none"
 
+        bad_ids = await get_weekly_sync_bad_player_ids(self.settings.db_path)
+        if bad_ids:
+            bad_str = f"{len(bad_ids)} (404, 조회 제외)\n" + "\n".join(f"`{x}`" for x in bad_ids[:5])
+            if len(bad_ids) > 5:
+                bad_str += f"\n… +{len(bad_ids) - 5}"
+        else:
+            bad_str = "none"
+
+        pubg = getattr(self.bot, "pubg", None)
+        try:
+            cs = pubg.client.stats()
+            api_str = f"sent={cs['flights']} deduped={cs['dedup_hits']}"
+            nb = cs["name_lookups"]
+            api_str += f"\nname lookups={nb['lookups']} batched into={nb['requests']}"
+            rs = pubg.resolver.stats()
+            api_str += (
+                f"\nname cache: mem={rs['mem_hits']} db={rs['db_hits']} "
+                f"neg={rs['negative_hits']} api={rs['api_lookups']}"
+            )
+            st = pubg.stats
+            api_str += f"\nstats cache: hit={st.cache_hits} stale={st.cache_stale_hits} miss={st.cache_misses}"
+        except Exception:
+            api_str = "-"
+
+        pool = getattr(self.bot, "db_pool", None)
+        try:
+            ps = pool.stats()
+            db_str = "\n".join(
+                f"{k}: used={v['acquired']} waited={v['waited']} "
+                f"avg={v['avg_wait_ms']:.1f}ms max={v['max_wait_ms']:.1f}ms"
+                for k, v in ps.items()
+            )
+            ws = self.bot.db_writer.stats()
+            db_str += (
+                f"\nwriter: intents={ws['intents']} commits={ws['commits']} "
+                f"max_batch={ws['max_batch']} failed={ws['failed']}"
+            )
+        except Exception:
+            db_str = "-"
+
         embed = discord.Embed(
             title="Shaded Status",
             description=(
@@ -155,6 +188,9 @@ class StatusCog(commands.Cog):
                 f"**Active Members**: {active_members}\n"
                 f"**Week Matches**: {week_matches}\n"
                 f"**Top1 (kills)**: {top1_str}\n"
+                f"**PUBG API**: {api_str}\n"
+                f"**DB Pool**: {db_str}\n"
+                f"**Bad Player IDs**: {bad_str}\n"
                 f"**Last Error**: {err_str}"
             ),
         )
@@ -37,6 +37,13 @@ def _clean_pubg_key(v: str) -> str:
     return v.strip('"').strip("'")
 
 
+def pubg_keys_from_env() -> tuple[str, ...]:
+    """PUBG_API_KEYS(콤마 구분) + PUBG_API_KEY, 순서 유지 + 중복 제거"""
+    raw = [*(os.getenv("PUBG_API_KEYS", "") or "").split(","), os.getenv("PUBG_API_KEY", "")]
+    keys = [_clean_pubg_key(k) for k in raw]
+    return tuple(dict.fromkeys(k for k in keys if k))
+
+
 @dataclass(frozen=True)
 class Settings:
     # Discord
@@ -53,9 +60,17 @@ class Settings:
     )
 
     # PUBG
-    pubg_api_key: str = _clean_pubg_key(os.getenv("PUBG_API_KEY", ""))
+    pubg_api_key: str = (pubg_keys_from_env() or ("",))[0]
+    pubg_api_keys: tuple[str, ...] = pubg_keys_from_env()
     pubg_shard: str = os.getenv("PUBG_SHARD", "steam").strip()
     pubg_clan_id: str = os.getenv("PUBG_CLAN_ID", "").strip()
+    # 키 RPM 중 봇 명령어용으로 남겨 둘 토큰 수(sync 서브프로세스는 이만큼은 안 씀)
+    pubg_rate_reserved: int = int((os.getenv("PUBG_RATE_RESERVED_INTERACTIVE", "2") or "2").strip())
 
     # DB
     db_path: str = _resolve_db_path(os.getenv("DB_PATH", ""))
+    # 봇 연결 풀의 reader 수(writer는 항상 1개)
+    db_pool_readers: int = int((os.getenv("DB_POOL_READERS", "4") or "4").strip())
+    # 봇 쓰기 group commit: 한 트랜잭션에 모을 최대 intent 수 / 첫 intent 후 더 기다리는 시간(ms)
+    db_write_max_batch: int = int((os.getenv("DB_WRITE_MAX_BATCH", "64") or "64").strip())
+    db_write_linger_ms: float = float((os.getenv("DB_WRITE_LINGER_MS", "5") or "5").strip())
@@ -1,47 +1,31 @@
 import time
 
 from shaded.services.sqlite_conn import open_db
+from shaded.services.db_writer import run_write
+from shaded.services.migrations import ensure_schema
 
 CLAN_ID_ALIAS = "shaded_steam"  # 너 프로젝트에서 쓰는 내부 클랜 키(고정)
 
+# db_path → 이 프로세스에서 멤버 목록/이름을 바꾼 횟수(commit 뒤 증가). 랭킹 캐시 키에 들어감
+_membership_gen: dict[str, int] = {}
+
+
+def membership_generation(db_path: str) -> int:
+    return _membership_gen.get(db_path, 0)
+
+
+def _bump_membership(db_path: str) -> None:
+    _membership_gen[db_path] = _membership_gen.get(db_path, 0) + 1
+
+
 async def init_clan_tables(db_path: str) -> None:
-    async with open_db(db_path) as db:
-        await db.execute("""
-        CREATE TABLE IF NOT EXISTS players (
-            platform TEXT NOT NULL,
-            account_id TEXT NOT NULL,
-            player_name TEXT NOT NULL,
-            updated_at INTEGER NOT NULL,
-            PRIMARY KEY (platform, account_id)
-        )
-        """)
-        await db.execute("""
-        CREATE TABLE IF NOT EXISTS clan_members (
-            clan_id TEXT NOT NULL,
-            platform TEXT NOT NULL,
-            account_id TEXT NOT NULL,
-            clan_role TEXT,
-            is_active INTEGER NOT NULL DEFAULT 1,
-            joined_at TEXT DEFAULT (datetime('now')),
-            left_at TEXT,
-            PRIMARY KEY (clan_id, platform, account_id)
-        )
-        """)
-        await db.execute("""
-        CREATE TABLE IF NOT EXISTS discord_clan_link (
-            discord_id INTEGER PRIMARY KEY,
-            platform TEXT NOT NULL,
-            account_id TEXT NOT NULL,
-            updated_at INTEGER NOT NULL,
-            UNIQUE(platform, account_id)
-        )
-        """)
-        await db.commit()
+    # 스키마는 migrations.py에서(호환용 래퍼)
+    await ensure_schema(db_path)
 
 async def register_member(db_path: str, discord_id: int, platform: str, account_id: str, player_name: str) -> None:
     now = int(time.time())
-    async with open_db(db_path) as db:
-        await db.execute("BEGIN")
+
+    async def _write(db) -> None:
         await db.execute(
             """
             INSERT INTO players (platform, account_id, player_name, updated_at)
@@ -74,7 +58,9 @@ async def register_member(db_path: str, discord_id: int, platform: str, account_
             """,
             (discord_id, platform, account_id, now),
         )
-        await db.commit()
+
+    await run_write(db_path, _write)
+    _bump_membership(db_path)
 
 
 async def upsert_clan_member(
@@ -91,8 +77,8 @@ async def upsert_clan_member(
     - 이미 있으면 이름/활성 상태만 갱신
     """
     now = int(time.time())
-    async with open_db(db_path) as db:
-        await db.execute("BEGIN")
+
+    async def _write(db) -> None:
         await db.execute(
             """
             INSERT INTO players (platform, account_id, player_name, updated_at)
@@ -114,32 +100,38 @@ async def upsert_clan_member(
             """,
             (CLAN_ID_ALIAS, platform, account_id, clan_role),
         )
-        await db.commit()
+
+    await run_write(db_path, _write)
+    _bump_membership(db_path)
 
 
 async def deactivate_clan_member(db_path: str, platform: str, account_id: str) -> int:
     """집계 대상에서 제거(비활성화). 반환값: 영향받은 row 수."""
-    async with open_db(db_path) as db:
+    async def _write(db) -> int:
         cur = await db.execute(
             """
             UPDATE clan_members
                SET is_active=0,
                    left_at=datetime('now')
              WHERE clan_id=? AND platform=? AND account_id=?
-               AND COALESCE(is_active, 1)=1
+               AND is_active=1
             """,
             (CLAN_ID_ALIAS, platform, account_id),
         )
-        await db.commit()
         return int(cur.rowcount or 0)
 
+    rows = await run_write(db_path, _write)
+    if rows:
+        _bump_membership(db_path)
+    return rows
+
 
 async def find_active_member_account_id(db_path: str, platform: str, player_name: str) -> str | None:
     """DB에 이미 등록된(활성) 멤버면 account_id를 반환."""
     name = (player_name or "").strip()
     if not name:
         return None
-    async with open_db(db_path) as db:
+    async with open_db(db_path, readonly=True) as db:
         cur = await db.execute(
             """
             SELECT p.account_id
@@ -148,7 +140,7 @@ async def find_active_member_account_id(db_path: str, platform: str, player_name
                 ON p.platform = cm.platform AND p.account_id = cm.account_id
              WHERE cm.clan_id=?
                AND cm.platform=?
-               AND COALESCE(cm.is_active, 1)=1
+               AND cm.is_active=1
                AND p.player_name=?
              LIMIT 1
             """,
@@ -5,6 +5,8 @@ from typing import Optional
 
 import aiosqlite
 from shaded.services.sqlite_conn import open_db
+from shaded.services.db_writer import run_write
+from shaded.services.migrations import ensure_schema
 
 
 async def _fetchall(con: aiosqlite.Connection, sql: str, params: tuple):
@@ -30,24 +32,8 @@ async def _fetchone(con: aiosqlite.Connection, sql: str, params: tuple):
 
 
 async def init_command_error_log(db_path: str) -> None:
-    async with open_db(db_path) as db:
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS command_error_log (
-              id         INTEGER PRIMARY KEY AUTOINCREMENT,
-              command    TEXT NOT NULL,
-              error      TEXT NOT NULL,
-              created_at INTEGER NOT NULL
-            )
-            """
-        )
-        await db.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_command_error_log_cmd_time
-            ON command_error_log(command, created_at)
-            """
-        )
-        await db.commit()
+    # 스키마는 migrations.py에서(프로세스당 1번만 확인하므로 에러 훅에서 매번 불러도 됨)
+    await ensure_schema(db_path)
 
 
 async def record_command_error(db_path: str, command: str, error_text: str) -> None:
@@ -57,19 +43,21 @@ async def record_command_error(db_path: str, command: str, error_text: str) -> N
         err = "unknown error"
 
     now = int(time.time())
-    async with open_db(db_path) as db:
+
+    async def _write(db: aiosqlite.Connection) -> None:
         await db.execute(
             "INSERT INTO command_error_log(command, error, created_at) VALUES(?,?,?)",
             (cmd, err, now),
         )
-        await db.commit()
+
+    await run_write(db_path, _write)
 
 
 async def fetch_last_errors_by_command(db_path: str, since_epoch: int) -> dict[str, tuple[int, str]]:
     """
     return {command: (last_ts, last_error_tail)}
     """
-    async with open_db(db_path) as db:
+    async with open_db(db_path, readonly=True) as db:
         # 각 command의 최신 ts
         rows = await _fetchall(
             db,
@@ -103,7 +91,7 @@ async def fetch_last_errors_by_command(db_path: str, since_epoch: int) -> dict[s
 
 
 async def fetch_recent_errors(db_path: str, limit: int = 20) -> list[tuple[str, int, str]]:
-    async with open_db(db_path) as db:
+    async with open_db(db_path, readonly=True) as db:
         rows = await _fetchall(
             db,
             """
@@ -123,6 +111,7 @@ async def fetch_recent_errors(db_path: str, limit: int = 20) -> list[tuple[str,
 
 
 async def clear_errors(db_path: str) -> None:
-    async with open_db(db_path) as db:
+    async def _write(db: aiosqlite.Connection) -> None:
         await db.execute("DELETE FROM command_error_log")
-        await db.commit()
+
+    await run_write(db_path, _write)
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiosqlite
+
+from shaded.services.sqlite_conn import open_db
+
+# 쓰기 의도(intent): 연결을 받아 execute만 하는 코루틴 함수(commit/BEGIN은 하지 않음)
+WriteFn = Callable[[aiosqlite.Connection], Awaitable[Any]]
+
+# 봇은 Settings.db_write_max_batch / db_write_linger_ms(DB_WRITE_MAX_BATCH / DB_WRITE_LINGER_MS)로 넘김
+DEFAULT_MAX_BATCH = 64
+DEFAULT_LINGER_MS = 5.0
+
+
+class DbWriterStopped(RuntimeError):
+    """writer task가 없거나 죽음 → intent는 실행/commit되지 않았음(run_write는 직접 연결로 다시 실행)"""
+
+
+def _set_future(fut: asyncio.Future, result: Any = None, exc: Optional[BaseException] = None) -> None:
+    if fut.done():
+        return
+    if exc is not None:
+        fut.set_exception(exc)
+    else:
+        fut.set_result(result)
+
+
+class DbWriter:
+    """
+    봇 쪽 쓰기를 한 task에서 모아 처리(group commit).
+
+    - submit(fn): intent를 큐에 넣고, 그 intent가 들어간 트랜잭션이 commit된 뒤 fn의 반환값으로 깨어남
+    - 첫 intent 도착 후 linger_ms 동안(또는 max_batch개까지) 모아서 BEGIN IMMEDIATE ... COMMIT 한 번
+      → sync의 BEGIN IMMEDIATE와 잠금을 다투는 횟수, fsync 횟수가 batch 수만큼으로 줄어듦
+    - intent마다 SAVEPOINT → 하나가 실패해도 그 intent만 되돌리고 나머지는 commit
+    - task가 어떤 이유로든 끝나면(취소 포함) 아직 commit 안 된 intent는 전부 DbWriterStopped로 깨움
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        linger_ms: float = DEFAULT_LINGER_MS,
+    ):
+        self.db_path = db_path
+        self.max_batch = max(1, int(max_batch))
+        self.linger_sec = max(0.0, float(linger_ms)) / 1000.0
+        self._q: "asyncio.Queue[Optional[Tuple[WriteFn, asyncio.Future]]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._batch: List[Tuple[WriteFn, asyncio.Future]] = []   # 지금 모으는/commit 중인 intent
+
+        self.intents = 0
+        self.commits = 0
+        self.failed = 0
+        self.max_seen_batch = 0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        """큐에 남은 intent까지 commit하고 종료"""
+        if self._task is None:
+            return
+        self._q.put_nowait(None)
+        try:
+            await self._task
+        finally:
+            self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def submit(self, fn: WriteFn) -> Any:
+        if not self.running:
+            raise DbWriterStopped("DbWriter is not running")
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._q.put_nowait((fn, fut))
+        # 호출자가 취소돼도 이미 넣은 intent는 그대로 commit됨
+        return await asyncio.shield(fut)
+
+    async def _collect(self, first: Tuple[WriteFn, asyncio.Future]) -> Tuple[List[Tuple[WriteFn, asyncio.Future]], bool]:
+        """first + linger 동안 들어온 intent들. return: (batch, 종료 요청 여부)"""
+        loop = asyncio.get_running_loop()
+        batch = self._batch = [first]
+        deadline = loop.time() + self.linger_sec
+        while len(batch) < self.max_batch:
+            try:
+                item = self._q.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._q.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _commit_batch(self, batch: List[Tuple[WriteFn, asyncio.Future]]) -> None:
+        results: List[Tuple[Any, Optional[BaseException]]] = []
+        try:
+            async with open_db(self.db_path) as db:
+                await db.execute("BEGIN IMMEDIATE;")
+                for fn, _fut in batch:
+                    await db.execute("SAVEPOINT write_intent;")
+                    try:
+                        r = await fn(db)
+                    except Exception as e:
+                        await db.execute("ROLLBACK TO write_intent;")
+                        await db.execute("RELEASE write_intent;")
+                        results.append((None, e))
+                    else:
+                        await db.execute("RELEASE write_intent;")
+                        results.append((r, None))
+                await db.commit()
+        except Exception as e:
+            # BEGIN/COMMIT 자체 실패(잠김 등) → batch 전체 실패
+            self.failed += len(batch)
+            for _fn, fut in batch:
+                _set_future(fut, exc=e)
+            return
+        except BaseException:
+            # 취소/종료 등: 연결이 닫히며 rollback(commit 안 됨) → 기다리는 intent를 먼저 깨우고 task는 종료
+            self._fail_pending()
+            raise
+
+        self.commits += 1
+        self.intents += len(batch)
+        self.max_seen_batch = max(self.max_seen_batch, len(batch))
+        for (_fn, fut), (r, exc) in zip(batch, results):
+            if exc is not None:
+                self.failed += 1
+            _set_future(fut, r, exc)
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                first = await self._q.get()
+                if first is None:
+                    return
+                batch, stop = await self._collect(first)
+                await self._commit_batch(batch)
+                self._batch = []
+                if stop:
+                    return
+        finally:
+            self._fail_pending()
+
+    def _fail_pending(self) -> None:
+        """commit 못 한 intent(진행 중 batch + 큐에 남은 것) 전부 DbWriterStopped로 깨움"""
+        pending, self._batch = self._batch, []
+        while True:
+            try:
+                item = self._q.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if item is not None:
+                pending.append(item)
+        err = DbWriterStopped("DbWriter stopped before commit")
+        for _fn, fut in pending:
+            if not fut.done():
+                self.failed += 1
+                _set_future(fut, exc=err)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "intents": self.intents,
+            "commits": self.commits,
+            "failed": self.failed,
+            "max_batch": self.max_seen_batch,
+            "pending": self._q.qsize(),
+        }
+
+
+# db_path → writer. 등록 안 된 경로(sync 도구 등)는 run_write가 기존처럼 바로 연결해서 commit
+_writers: Dict[str, DbWriter] = {}
+
+
+def register_writer(writer: DbWriter) -> None:
+    _writers[writer.db_path] = writer
+
+
+def unregister_writer(db_path: str) -> Optional[DbWriter]:
+    return _writers.pop(db_path, None)
+
+
+def get_writer(db_path: str) -> Optional[DbWriter]:
+    return _writers.get(db_path)
+
+
+async def run_write(db_path: str, fn: WriteFn) -> Any:
+    """
+    fn(db)를 commit까지 실행하고 반환값을 돌려줌(writer가 있으면 group commit)
+    - writer가 죽었으면(DbWriterStopped: fn은 commit되지 않음) 직접 연결로 실행
+    """
+    writer = _writers.get(db_path)
+    if writer is not None and writer.running:
+        try:
+            return await writer.submit(fn)
+        except DbWriterStopped:
+            pass
+
+    async with open_db(db_path) as db:
+        try:
+            r = await fn(db)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        return r
@@ -2,36 +2,102 @@ from __future__ import annotations
 
 import aiosqlite
 
+from shaded.services.migrations import ensure_schema
 from shaded.services.sqlite_conn import open_db
+from shaded.services.weekly_rollup import STATE_KEY_ROLLUP_READY, is_canonical_week
 
 # scope: "normal"(일반) | "ranked"(경쟁) | "total"(전체)
+# 조인 순서 고정(CROSS JOIN): 이번 주 매치(idx_matches_weekly 부분 인덱스 범위) → 매치별 킬(idx_player_matches_match_kills)
+# → 클랜 멤버 PK. 통계(ANALYZE) 유무와 상관없이 같은 계획 — tools/check_query_plans.py가 확인
+# 플래그 컬럼은 NOT NULL DEFAULT 0(migrations v2)이라 COALESCE 없이 비교해야 부분 인덱스를 탐
 SQL_WEEKLY = """
 SELECT
   p.player_name AS player_name,
   COALESCE(SUM(pm.kills), 0) AS kills
-FROM clan_members cm
+FROM matches m
+CROSS JOIN player_matches pm
+  ON pm.match_id = m.match_id AND pm.platform = m.platform
+CROSS JOIN clan_members cm
+  ON cm.clan_id = :clan_id AND cm.platform = pm.platform AND cm.account_id = pm.account_id
 JOIN players p
   ON p.platform = cm.platform AND p.account_id = cm.account_id
-JOIN player_matches pm
-  ON pm.platform = cm.platform AND pm.account_id = cm.account_id
-JOIN matches m
-  ON m.platform = pm.platform AND m.match_id = pm.match_id
 WHERE
-  cm.clan_id = :clan_id
-  AND cm.platform = :platform
-  AND COALESCE(cm.is_active, 1) = 1
+  m.platform = :platform
   AND m.created_at_utc >= :start_utc
   AND m.created_at_utc <  :end_utc
   -- 캐주얼/커스텀 제외(고정)
-  AND COALESCE(m.is_casual, 0) = 0
-  AND COALESCE(m.is_custom_match, 0) = 0
-  -- scope 필터(아래에서 추가)
+  AND m.is_casual = 0
+  AND m.is_custom_match = 0
+  AND cm.is_active = 1
+  -- scope/모드 필터(아래에서 추가)
   {scope_clause}
+  {mode_clause}
 GROUP BY p.player_name
 ORDER BY kills DESC, p.player_name ASC
 LIMIT :limit;
 """
 
+OFFICIAL_MODES_CLAUSE = "AND m.game_mode IN ('solo','duo','squad','solo-fpp','duo-fpp','squad-fpp')"
+
+
+def build_weekly_sql(scope: str, *, official_modes_only: bool = False) -> str:
+    """SQL_WEEKLY + scope 조건. official_modes_only: 6모드만(sync 스냅샷)"""
+    scope = (scope or "total").lower()
+    if scope == "normal":
+        scope_clause = "AND m.is_ranked = 0"
+    elif scope == "ranked":
+        scope_clause = "AND m.is_ranked = 1"
+    else:
+        scope_clause = ""  # total
+    mode_clause = OFFICIAL_MODES_CLAUSE if official_modes_only else ""
+    return SQL_WEEKLY.format(scope_clause=scope_clause, mode_clause=mode_clause)
+
+
+# /status 이번 주 매치 수(부분 인덱스만 읽음)
+SQL_COUNT_WEEK_MATCHES = """
+SELECT COUNT(*)
+  FROM matches
+ WHERE platform = ?
+   AND created_at_utc >= ?
+   AND created_at_utc < ?
+   AND is_casual = 0
+   AND is_custom_match = 0
+"""
+
+
+# sync 스케줄러: 멤버별 저장된 매치 중 최신 시각(idx_player_matches_account → matches PK)
+SQL_MEMBER_LAST_PLAYED = """
+SELECT pm.account_id, MAX(m.created_at_utc)
+  FROM player_matches pm
+  JOIN matches m ON m.match_id = pm.match_id
+ WHERE pm.platform = ?
+ GROUP BY pm.account_id
+"""
+
+
+# 롤업(weekly_player_kills, sync가 유지) → 한 주 구간 인덱스 범위만 읽음. 집계(이름별 합계)는 SQL_WEEKLY와 같게
+SQL_WEEKLY_ROLLUP = """
+SELECT
+  p.player_name AS player_name,
+  COALESCE(SUM(w.kills), 0) AS kills
+FROM weekly_player_kills w
+JOIN clan_members cm
+  ON cm.platform = w.platform AND cm.account_id = w.account_id
+JOIN players p
+  ON p.platform = w.platform AND p.account_id = w.account_id
+WHERE
+  w.week_start_utc = :start_utc
+  AND w.platform = :platform
+  AND w.scope = :scope
+  AND cm.clan_id = :clan_id
+  AND cm.is_active = 1
+GROUP BY p.player_name
+ORDER BY kills DESC, p.player_name ASC
+LIMIT :limit;
+"""
+
+SQL_ROLLUP_READY = "SELECT 1 FROM sync_state WHERE key = :key LIMIT 1;"
+
 
 async def _fetchone(con: aiosqlite.Connection, sql: str, params: dict) -> aiosqlite.Row | None:
     """
@@ -70,17 +136,28 @@ async def fetch_weekly_leaderboard(
     limit: int = 10,
 ) -> list[tuple[str, int]]:
     scope = (scope or "total").lower()
-    if scope == "normal":
-        scope_clause = "AND COALESCE(m.is_ranked, 0) = 0"
-    elif scope == "ranked":
-        scope_clause = "AND COALESCE(m.is_ranked, 0) = 1"
-    else:
-        scope_clause = ""  # total
+    sql = build_weekly_sql(scope)
 
-    sql = SQL_WEEKLY.format(scope_clause=scope_clause)
-
-    async with open_db(db_path) as con:
+    async with open_db(db_path, readonly=True) as con:
         con.row_factory = aiosqlite.Row
+
+        # 정확히 한 주 구간 + 롤업 준비됨 → 롤업 조회, 아니면(임의 구간/첫 sync 전) 원본 조인
+        if scope in ("normal", "ranked", "total") and is_canonical_week(start_utc_z, end_utc_z):
+            ready = await _fetchone(con, SQL_ROLLUP_READY, {"key": STATE_KEY_ROLLUP_READY})
+            if ready:
+                rows = await _fetchall(
+                    con,
+                    SQL_WEEKLY_ROLLUP,
+                    {
+                        "clan_id": clan_id,
+                        "platform": platform,
+                        "start_utc": start_utc_z,
+                        "scope": scope,
+                        "limit": limit,
+                    },
+                )
+                return [(r["player_name"], int(r["kills"])) for r in rows]
+
         rows = await _fetchall(
             con,
             sql,
@@ -111,36 +188,6 @@ async def fetch_weekly_leaderboard_normal(
 # weekly snapshot (지난랭킹 스냅샷)
 # =========================
 
-SNAPSHOT_META_SQL = """
-CREATE TABLE IF NOT EXISTS weekly_snapshot_meta (
-  clan_id        TEXT NOT NULL,
-  platform       TEXT NOT NULL,
-  week_start_utc TEXT NOT NULL,
-  week_end_utc   TEXT NOT NULL,
-  scope          TEXT NOT NULL,  -- normal|ranked|total
-  created_at_utc TEXT NOT NULL DEFAULT (datetime('now')),
-  PRIMARY KEY (clan_id, platform, week_start_utc, scope)
-);
-"""
-
-SNAPSHOT_ROWS_SQL = """
-CREATE TABLE IF NOT EXISTS weekly_snapshot_rows (
-  clan_id        TEXT NOT NULL,
-  platform       TEXT NOT NULL,
-  week_start_utc TEXT NOT NULL,
-  scope          TEXT NOT NULL,
-  rank           INTEGER NOT NULL,
-  player_name    TEXT NOT NULL,
-  kills          INTEGER NOT NULL,
-  PRIMARY KEY (clan_id, platform, week_start_utc, scope, rank)
-);
-"""
-
-SNAPSHOT_INDEX_SQL = """
-CREATE INDEX IF NOT EXISTS idx_weekly_snapshot_rows_lookup
-ON weekly_snapshot_rows (clan_id, platform, week_start_utc, scope);
-"""
-
 SQL_SNAPSHOT_META = """
 SELECT week_end_utc, created_at_utc
   FROM weekly_snapshot_meta
@@ -164,11 +211,8 @@ SELECT player_name, kills
 
 
 async def init_weekly_snapshot_tables(db_path: str) -> None:
-    async with open_db(db_path) as db:
-        await db.execute(SNAPSHOT_META_SQL)
-        await db.execute(SNAPSHOT_ROWS_SQL)
-        await db.execute(SNAPSHOT_INDEX_SQL)
-        await db.commit()
+    # 스키마는 migrations.py에서(호환용 래퍼)
+    await ensure_schema(db_path)
 
 
 async def fetch_weekly_snapshot(
@@ -187,7 +231,7 @@ async def fetch_weekly_snapshot(
     """
     scope = (scope or "total").lower()
 
-    async with open_db(db_path) as con:
+    async with open_db(db_path, readonly=True) as con:
         con.row_factory = aiosqlite.Row
 
         meta = await _fetchone(
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Optional
+
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 압축 후 기준
+
+
+class MatchPayloadCache:
+    """
+    /matches/{id} 응답 원문(bytes)을 zlib 압축해서 SQLite 파일에 저장하는 캐시.
+
+    - 매치 payload는 생성 후 절대 안 바뀜 → TTL 없이 match_id로만 조회
+    - 압축 크기 합계가 max_bytes를 넘으면 마지막 접근이 오래된 것부터 제거(LRU)
+    - hits/misses/evictions 카운터(stats)
+    - 봇/툴(동기, asyncio.to_thread) 어디서든 쓰도록 내부 lock으로 직렬화
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, *, level: int = 6):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_bytes = max(1, int(max_bytes))
+        self.level = int(level)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode=WAL;")
+        self._con.execute("PRAGMA synchronous=NORMAL;")
+        self._con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS match_payload (
+              match_id    TEXT PRIMARY KEY,
+              body        BLOB NOT NULL,     -- zlib(raw json bytes)
+              raw_size    INTEGER NOT NULL,
+              size        INTEGER NOT NULL,  -- len(body)
+              last_access REAL NOT NULL
+            )
+            """
+        )
+        self._con.execute(
+            "CREATE INDEX IF NOT EXISTS idx_match_payload_lru ON match_payload(last_access)"
+        )
+        self._con.commit()
+
+        row = self._con.execute("SELECT COALESCE(SUM(size), 0) FROM match_payload").fetchone()
+        self._total_bytes = int(row[0] or 0)
+
+    def get(self, match_id: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._con.execute(
+                "SELECT body FROM match_payload WHERE match_id=?",
+                (match_id,),
+            ).fetchone()
+            if not row:
+                self.misses += 1
+                return None
+            self._con.execute(
+                "UPDATE match_payload SET last_access=? WHERE match_id=?",
+                (time.time(), match_id),
+            )
+            self._con.commit()
+            self.hits += 1
+            body = row[0]
+
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            # 깨진 항목은 지우고 miss 처리
+            self.delete(match_id)
+            return None
+
+    def put(self, match_id: str, raw: bytes) -> None:
+        if not match_id or not raw:
+            return
+        body = zlib.compress(raw, self.level)
+        if len(body) > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._con.execute(
+                "SELECT size FROM match_payload WHERE match_id=?",
+                (match_id,),
+            ).fetchone()
+            self._con.execute(
+                """
+                INSERT OR REPLACE INTO match_payload (match_id, body, raw_size, size, last_access)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (match_id, body, len(raw), len(body), time.time()),
+            )
+            self._total_bytes += len(body) - (int(old[0]) if old else 0)
+            self._evict_locked()
+            self._con.commit()
+
+    def delete(self, match_id: str) -> None:
+        with self._lock:
+            row = self._con.execute(
+                "SELECT size FROM match_payload WHERE match_id=?",
+                (match_id,),
+            ).fetchone()
+            if not row:
+                return
+            self._con.execute("DELETE FROM match_payload WHERE match_id=?", (match_id,))
+            self._con.commit()
+            self._total_bytes -= int(row[0])
+
+    def _evict_locked(self) -> None:
+        while self._total_bytes > self.max_bytes:
+            rows = self._con.execute(
+                "SELECT match_id, size FROM match_payload ORDER BY last_access ASC LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            for mid, size in rows:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._con.execute("DELETE FROM match_payload WHERE match_id=?", (mid,))
+                self._total_bytes -= int(size)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            row = self._con.execute("SELECT COUNT(*) FROM match_payload").fetchone()
+            entries = int(row[0] or 0)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": self._total_bytes,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._con.close()
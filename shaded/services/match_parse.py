@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# 선택 의존성: orjson이 있으면 디코딩이 수 배 빠름(없으면 표준 json)
+try:
+    import orjson as _orjson
+
+    _loads: Callable[[Any], Any] = _orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:  # pragma: no cover
+    _loads = json.loads
+    JSON_BACKEND = "json"
+
+
+# (account_id, player_name, kills)
+ParticipantKills = Tuple[str, str, int]
+
+_MATCH_ATTR_KEYS = ("createdAt", "gameMode")
+_PLAYER_ID_RE = re.compile(rb'"playerId":"([^"\\]+)"')
+
+
+def extract_participant_kills(match_json: Dict[str, Any], clan_ids: Set[str]) -> List[ParticipantKills]:
+    """디코딩된 매치 JSON에서 clan_ids 참가자만 (account_id, name, kills)"""
+    out: List[ParticipantKills] = []
+    for obj in match_json.get("included") or []:
+        if obj.get("type") != "participant":
+            continue
+        row = _participant_row((obj.get("attributes") or {}).get("stats") or {}, clan_ids)
+        if row is not None:
+            out.append(row)
+    return out
+
+
+def _participant_row(stats: Dict[str, Any], clan_ids: Set[str]) -> Optional[ParticipantKills]:
+    pid = stats.get("playerId")
+    if not pid or pid not in clan_ids:
+        return None
+    nm = (stats.get("name") or "").strip() or pid
+    k = stats.get("kills")
+    try:
+        kills = int(k) if k is not None else 0
+    except Exception:
+        kills = 0
+    return pid, nm, kills
+
+
+def _match_object(raw: bytes, start: int) -> int:
+    """raw[start] == '{' 인 객체의 끝 '}' 다음 위치(문자열/이스케이프 고려). 못 찾으면 -1"""
+    depth = 0
+    in_str = False
+    i = start
+    n = len(raw)
+    while i < n:
+        c = raw[i]
+        if in_str:
+            if c == 0x5C:    # backslash
+                i += 2
+                continue
+            if c == 0x22:    # "
+                in_str = False
+        elif c == 0x22:
+            in_str = True
+        elif c == 0x7B:      # {
+            depth += 1
+        elif c == 0x7D:      # }
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return -1
+
+
+def _match_attributes(raw: bytes) -> Optional[Dict[str, Any]]:
+    """
+    data.attributes만 잘라서 디코딩.
+    PUBG 응답은 {"data":{"type":"match","id":..,"attributes":{...}}, "included":[...]} 순서라
+    첫 "attributes" 객체가 매치 속성. 형태가 다르면 None(→ 전체 파싱)
+    """
+    head = raw.find(b'"attributes":{')
+    if head < 0:
+        return None
+    if raw.find(b'"type":"match"', 0, head) < 0 or raw.find(b'"included"', 0, head) >= 0:
+        return None
+    start = head + len(b'"attributes":')
+    end = _match_object(raw, start)
+    if end < 0:
+        return None
+    try:
+        attrs = _loads(raw[start:end])
+    except ValueError:
+        return None
+    if not isinstance(attrs, dict) or any(k not in attrs for k in _MATCH_ATTR_KEYS):
+        return None
+    return attrs
+
+
+def _selective_participants(raw: bytes, clan_ids: Set[str]) -> Optional[List[ParticipantKills]]:
+    """
+    "playerId":"..." 키를 한 번 훑어서(regex, C 루프) clan_ids인 참가자의 stats 객체만 잘라 디코딩.
+    stats는 스칼라 값만 있는 평평한 객체라 앞뒤 { }만 찾으면 됨.
+    예상과 다른 형태면 None(→ 전체 파싱)
+    """
+    out: List[ParticipantKills] = []
+    found_any = False
+    for m in _PLAYER_ID_RE.finditer(raw):
+        found_any = True
+        pid = m.group(1).decode("utf-8", errors="replace")
+        if pid not in clan_ids:
+            continue
+
+        start = raw.rfind(b"{", 0, m.start())
+        end = raw.find(b"}", m.end())
+        if start < 0 or end < 0:
+            return None
+        try:
+            stats = _loads(raw[start:end + 1])
+        except ValueError:
+            return None
+        if not isinstance(stats, dict) or stats.get("playerId") != pid:
+            return None
+        row = _participant_row(stats, clan_ids)
+        if row is not None:
+            out.append(row)
+
+    if not found_any and b'"participant"' in raw:
+        return None  # 참가자는 있는데 키 모양이 다름(공백 등)
+    return out
+
+
+def parse_match_payload(
+    raw: bytes,
+    clan_ids: Set[str],
+) -> Tuple[Dict[str, Any], List[ParticipantKills]]:
+    """
+    /matches/{id} 원문 bytes → (data.attributes, clan 참가자 kills 목록)
+
+    - 매치 속성 객체 + clan 멤버 stats 객체만 디코딩(수백 명 참가자/roster/asset은 안 만듦)
+    - 형태가 예상과 다르면 전체 디코딩으로 fallback(결과는 같음)
+    """
+    attrs = _match_attributes(raw)
+    if attrs is not None:
+        rows = _selective_participants(raw, clan_ids)
+        if rows is not None:
+            return attrs, rows
+
+    mj = _loads(raw)
+    attrs = (mj.get("data") or {}).get("attributes") or {}
+    return attrs, extract_participant_kills(mj, clan_ids)
@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from pathlib import Path
+from typing import Callable, List, Set, Tuple, Union
+
+from shaded.services.sqlite_conn import DEFAULT_TIMEOUT_SEC, open_db_sync
+
+# 메인 DB(settings.db_path / DB_PATH) 스키마는 전부 여기서만 만든다.
+# - PRAGMA user_version = 적용된 마지막 migration 번호
+# - 최신 DB면 pragma 1번 읽고 끝(프로세스 안에서는 그것도 1번만)
+# - 밀린 migration은 BEGIN IMMEDIATE 트랜잭션 하나로 순서대로 적용 → 봇/sync가 동시에 떠도 한쪽만 적용
+# - 기존 DB(user_version=0)도 그대로 올라오도록 1번은 IF NOT EXISTS로 작성
+# 새 스키마 변경은 MIGRATIONS 끝에 번호를 하나 올려서 추가(이미 나간 항목은 고치지 않음)
+
+Step = Union[Tuple[str, ...], Callable[[sqlite3.Connection], None]]
+
+
+# 1) 기존 init_* / sync _ensure_tables가 만들던 기본 테이블
+_V1_BASE: Tuple[str, ...] = (
+    """
+    CREATE TABLE IF NOT EXISTS pubg_user (
+        discord_id INTEGER PRIMARY KEY,
+        pubg_nickname TEXT NOT NULL,
+        updated_at INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS players (
+        platform TEXT NOT NULL,
+        account_id TEXT NOT NULL,
+        player_name TEXT NOT NULL,
+        updated_at INTEGER NOT NULL,
+        PRIMARY KEY (platform, account_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS clan_members (
+        clan_id TEXT NOT NULL,
+        platform TEXT NOT NULL,
+        account_id TEXT NOT NULL,
+        clan_role TEXT,
+        is_active INTEGER NOT NULL DEFAULT 1,
+        joined_at TEXT DEFAULT (datetime('now')),
+        left_at TEXT,
+        PRIMARY KEY (clan_id, platform, account_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS discord_clan_link (
+        discord_id INTEGER PRIMARY KEY,
+        platform TEXT NOT NULL,
+        account_id TEXT NOT NULL,
+        updated_at INTEGER NOT NULL,
+        UNIQUE(platform, account_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sync_state (
+      key TEXT PRIMARY KEY,
+      value TEXT NOT NULL,
+      updated_at INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS job_lock (
+      job_name     TEXT PRIMARY KEY,
+      locked_until INTEGER NOT NULL,
+      locked_by    TEXT,
+      updated_at   INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS command_error_log (
+      id         INTEGER PRIMARY KEY AUTOINCREMENT,
+      command    TEXT NOT NULL,
+      error      TEXT NOT NULL,
+      created_at INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_command_error_log_cmd_time
+    ON command_error_log(command, created_at)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS matches (
+      match_id        TEXT PRIMARY KEY,
+      platform        TEXT NOT NULL,
+      created_at_utc  TEXT NOT NULL,
+      game_mode       TEXT,
+      is_ranked       INTEGER NOT NULL DEFAULT 0,
+      inserted_at_utc TEXT NOT NULL DEFAULT (datetime('now')),
+      is_custom_match INTEGER NOT NULL DEFAULT 0,
+      is_casual       INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS player_matches (
+      match_id        TEXT NOT NULL,
+      platform        TEXT NOT NULL,
+      account_id      TEXT NOT NULL,
+      kills           INTEGER NOT NULL DEFAULT 0,
+      inserted_at_utc TEXT NOT NULL DEFAULT (datetime('now')),
+      PRIMARY KEY (match_id, platform, account_id),
+      FOREIGN KEY (match_id) REFERENCES matches(match_id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_player_matches_player
+    ON player_matches(platform, account_id)
+    """,
+    # 지난랭킹 스냅샷
+    """
+    CREATE TABLE IF NOT EXISTS weekly_snapshot_meta (
+      clan_id        TEXT NOT NULL,
+      platform       TEXT NOT NULL,
+      week_start_utc TEXT NOT NULL,
+      week_end_utc   TEXT NOT NULL,
+      scope          TEXT NOT NULL,  -- normal|ranked|total
+      created_at_utc TEXT NOT NULL DEFAULT (datetime('now')),
+      PRIMARY KEY (clan_id, platform, week_start_utc, scope)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS weekly_snapshot_rows (
+      clan_id        TEXT NOT NULL,
+      platform       TEXT NOT NULL,
+      week_start_utc TEXT NOT NULL,
+      scope          TEXT NOT NULL,
+      rank           INTEGER NOT NULL,
+      player_name    TEXT NOT NULL,
+      kills          INTEGER NOT NULL,
+      PRIMARY KEY (clan_id, platform, week_start_utc, scope, rank)
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_weekly_snapshot_rows_lookup
+    ON weekly_snapshot_rows (clan_id, platform, week_start_utc, scope)
+    """,
+    # 프로세스 간 공유 rate limit 토큰(rate_budget.py)
+    """
+    CREATE TABLE IF NOT EXISTS api_rate_budget (
+      bucket     TEXT PRIMARY KEY,
+      tokens     REAL NOT NULL,
+      updated_at REAL NOT NULL
+    )
+    """,
+)
+
+
+def _v2_match_flags(con: sqlite3.Connection) -> None:
+    """db/migrate_weekly.sql로 만든 옛 matches에는 캐주얼/커스텀 컬럼이 없음(db/migrate_002_match_flags.sql 대체)"""
+    cols = {r[1] for r in con.execute("PRAGMA table_info(matches)").fetchall()}
+    if "is_custom_match" not in cols:
+        con.execute("ALTER TABLE matches ADD COLUMN is_custom_match INTEGER NOT NULL DEFAULT 0")
+    if "is_casual" not in cols:
+        con.execute("ALTER TABLE matches ADD COLUMN is_casual INTEGER NOT NULL DEFAULT 0")
+        con.execute(
+            """
+            UPDATE matches
+               SET is_casual = CASE
+                 WHEN game_mode IS NOT NULL AND lower(game_mode) LIKE '%casual%' THEN 1
+                 ELSE 0
+               END
+            """
+        )
+    con.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_matches_time_flags
+        ON matches(created_at_utc, is_ranked, is_casual, is_custom_match)
+        """
+    )
+
+
+# 3) sync 부기 테이블
+_V3_SYNC_BOOKKEEPING: Tuple[str, ...] = (
+    # 처리한 매치 ID 원장: matches에 안 남는 스킵 매치도 기록해서 재다운로드 방지
+    """
+    CREATE TABLE IF NOT EXISTS match_ledger (
+      match_id   TEXT PRIMARY KEY,
+      platform   TEXT NOT NULL,
+      reason     TEXT NOT NULL,  -- stored|old|mode|no_clan|no_time
+      seen_at    INTEGER NOT NULL,
+      expires_at INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+    # 멤버별 워터마크: 이미 처리한 가장 최신 match ref
+    """
+    CREATE TABLE IF NOT EXISTS player_match_watermark (
+      platform      TEXT NOT NULL,
+      account_id    TEXT NOT NULL,
+      last_match_id TEXT NOT NULL,
+      updated_at    INTEGER NOT NULL,
+      PRIMARY KEY (platform, account_id)
+    ) WITHOUT ROWID
+    """,
+    # 멤버별 조회 스케줄(last_played_at: 마지막으로 새 매치가 보인 시각)
+    """
+    CREATE TABLE IF NOT EXISTS member_poll_state (
+      platform       TEXT NOT NULL,
+      account_id     TEXT NOT NULL,
+      last_played_at INTEGER NOT NULL DEFAULT 0,
+      last_polled_at INTEGER NOT NULL DEFAULT 0,
+      next_poll_at   INTEGER NOT NULL DEFAULT 0,
+      PRIMARY KEY (platform, account_id)
+    ) WITHOUT ROWID
+    """,
+    # /players 404 negative cache(만료되면 다시 조회해서 확인)
+    """
+    CREATE TABLE IF NOT EXISTS bad_player_ids (
+      platform      TEXT NOT NULL,
+      account_id    TEXT NOT NULL,
+      first_seen_at INTEGER NOT NULL,
+      last_seen_at  INTEGER NOT NULL,
+      expires_at    INTEGER NOT NULL,
+      PRIMARY KEY (platform, account_id)
+    ) WITHOUT ROWID
+    """,
+)
+
+# 4) 주간 킬 롤업(weekly_rollup.py)
+_V4_WEEKLY_ROLLUP: Tuple[str, ...] = (
+    """
+    CREATE TABLE IF NOT EXISTS weekly_player_kills (
+      week_start_utc TEXT NOT NULL,
+      platform       TEXT NOT NULL,
+      scope          TEXT NOT NULL,   -- normal|ranked|total
+      account_id     TEXT NOT NULL,
+      kills          INTEGER NOT NULL DEFAULT 0,
+      matches        INTEGER NOT NULL DEFAULT 0,
+      PRIMARY KEY (week_start_utc, platform, scope, account_id)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_weekly_player_kills_top
+    ON weekly_player_kills (week_start_utc, platform, scope, kills DESC)
+    """,
+)
+
+
+# 5) 핫 쿼리용 인덱스(tools/check_query_plans.py가 실행 계획 확인)
+_V5_HOT_QUERY_INDEXES: Tuple[str, ...] = (
+    # 주간 집계 시작점: 캐주얼/커스텀 아닌 매치만, 플랫폼+시간 범위. 집계에 쓰는 컬럼을 다 담아서 테이블은 안 읽음
+    """
+    CREATE INDEX IF NOT EXISTS idx_matches_weekly
+    ON matches (platform, created_at_utc, is_ranked, match_id, is_casual, is_custom_match)
+    WHERE is_casual = 0 AND is_custom_match = 0
+    """,
+    # 매치 → 참가 멤버 킬(PK에 kills를 더한 covering)
+    """
+    CREATE INDEX IF NOT EXISTS idx_player_matches_match_kills
+    ON player_matches (match_id, platform, account_id, kills)
+    """,
+    # 멤버 → 매치/킬(sync 스케줄러의 멤버별 최근 플레이 등). (platform, account_id) 인덱스를 대체
+    """
+    CREATE INDEX IF NOT EXISTS idx_player_matches_account
+    ON player_matches (platform, account_id, match_id, kills)
+    """,
+    "DROP INDEX IF EXISTS idx_player_matches_player",
+    # db/migrate_weekly.sql로 만든 DB에만 있던 (platform, created_at_utc) — idx_matches_weekly가 대체
+    "DROP INDEX IF EXISTS idx_matches_time",
+    # v2의 (created_at_utc, 플래그) — 쓰는 쿼리 없음(idx_matches_weekly가 대체), 매치 insert마다 비용만
+    "DROP INDEX IF EXISTS idx_matches_time_flags",
+)
+
+
+# 6) 워터마크 매치의 시각(UTC Z, 모르면 NULL) — sync 스케줄러가 최근 플레이 시각으로 씀
+_V6_WATERMARK_TIME: Tuple[str, ...] = (
+    "ALTER TABLE player_match_watermark ADD COLUMN last_match_at TEXT",
+)
+
+
+# (version, 이름, SQL 묶음 또는 sqlite3 연결을 받는 함수) — version은 1부터 연속
+MIGRATIONS: List[Tuple[int, str, Step]] = [
+    (1, "base tables", _V1_BASE),
+    (2, "match casual/custom flags", _v2_match_flags),
+    (3, "sync bookkeeping", _V3_SYNC_BOOKKEEPING),
+    (4, "weekly kill rollup", _V4_WEEKLY_ROLLUP),
+    (5, "hot query indexes", _V5_HOT_QUERY_INDEXES),
+    (6, "watermark match time", _V6_WATERMARK_TIME),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# 이 프로세스에서 최신임을 확인한 db_path(init_command_error_log처럼 자주 불려도 비용 0)
+_checked: Set[str] = set()
+
+
+def schema_version(con: sqlite3.Connection) -> int:
+    return int(con.execute("PRAGMA user_version;").fetchone()[0])
+
+
+def migrate_sync(con: sqlite3.Connection) -> int:
+    """
+    밀린 migration 적용(sqlite3 동기 연결, 호출자 트랜잭션 밖에서).
+    return: 적용한 migration 수(이미 최신이면 0)
+    """
+    if schema_version(con) >= LATEST_VERSION:
+        return 0
+
+    con.execute("BEGIN IMMEDIATE;")
+    try:
+        # 잠금 잡은 뒤 다시 확인(다른 프로세스가 먼저 올렸을 수 있음)
+        current = schema_version(con)
+        applied = 0
+        for version, name, step in MIGRATIONS:
+            if version <= current:
+                continue
+            if callable(step):
+                step(con)
+            else:
+                for sql in step:
+                    con.execute(sql)
+            applied += 1
+            print(f"[MIGRATE] v{version} {name}", flush=True)
+        if applied:
+            con.execute(f"PRAGMA user_version={LATEST_VERSION};")
+        con.commit()
+    except BaseException:
+        con.rollback()
+        raise
+    return applied
+
+
+def ensure_schema_sync(db_path: str, timeout_sec: float = DEFAULT_TIMEOUT_SEC) -> int:
+    if db_path in _checked:
+        return 0
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    con = open_db_sync(db_path, timeout_sec)
+    try:
+        applied = migrate_sync(con)
+    finally:
+        con.close()
+    _checked.add(db_path)
+    return applied
+
+
+async def ensure_schema(db_path: str, timeout_sec: float = DEFAULT_TIMEOUT_SEC) -> int:
+    """봇/async 쪽 진입점. 프로세스당 실제 확인은 1번"""
+    if db_path in _checked:
+        return 0
+    return await asyncio.to_thread(ensure_schema_sync, db_path, timeout_sec)
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+
+from shaded.services.pubg_api import PubgApiClient, PubgPlayerNotFound
+from shaded.services.sqlite_conn import open_db
+from shaded.services.db_writer import run_write
+
+
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_TTL_SEC = 6 * 60 * 60        # 이보다 오래된 매핑은 일단 쓰고 백그라운드 갱신
+DEFAULT_NEGATIVE_TTL_SEC = 10 * 60   # "없는 닉네임" 기억 시간
+
+
+@dataclass(frozen=True)
+class ResolvedPlayer:
+    account_id: str
+    player_name: str  # PUBG가 돌려준 정확한 표기
+
+
+class PlayerResolver:
+    """
+    닉네임 → account_id 조회(봇 전역 1개, PubgHttpService가 소유).
+
+    1) 메모리 LRU (negative 포함)
+    2) players 테이블 (platform, player_name)
+    3) PUBG API /players?filter[playerNames] → players 테이블에 upsert
+
+    - 1/2에서 찾으면 API 예산 0
+    - ttl_sec보다 오래된 매핑은 그대로 반환하고 백그라운드에서 API로 다시 확인(닉변 대응)
+    - 없는 닉네임(PubgPlayerNotFound)은 negative_ttl_sec 동안 메모리에 기억 → 오타 연타에도 API 안 씀
+    """
+
+    def __init__(
+        self,
+        client: PubgApiClient,
+        db_path: Optional[str],
+        platform: str,
+        *,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_sec: float = DEFAULT_TTL_SEC,
+        negative_ttl_sec: float = DEFAULT_NEGATIVE_TTL_SEC,
+    ):
+        self.client = client
+        self.db_path = db_path
+        self.platform = platform
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_sec = float(ttl_sec)
+        self.negative_ttl_sec = float(negative_ttl_sec)
+
+        # name -> (ResolvedPlayer | None, checked_at)
+        self._mem: "OrderedDict[str, Tuple[Optional[ResolvedPlayer], float]]" = OrderedDict()
+        self._refreshing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.mem_hits = 0
+        self.db_hits = 0
+        self.negative_hits = 0
+        self.api_lookups = 0
+        self.refreshes = 0
+
+    # -----------------------------
+    # memory LRU
+    # -----------------------------
+    def _mem_get(self, name: str) -> Optional[Tuple[Optional[ResolvedPlayer], float]]:
+        hit = self._mem.get(name)
+        if hit is not None:
+            self._mem.move_to_end(name)
+        return hit
+
+    def _mem_put(self, name: str, player: Optional[ResolvedPlayer], checked_at: float) -> None:
+        self._mem[name] = (player, checked_at)
+        self._mem.move_to_end(name)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def remember(self, player: ResolvedPlayer) -> None:
+        """다른 경로(등록 명령어 등)로 확인된 매핑을 바로 반영"""
+        now = time.time()
+        self._mem_put(player.player_name, player, now)
+
+    def forget(self, name: str) -> None:
+        self._mem.pop((name or "").strip(), None)
+
+    # -----------------------------
+    # players table
+    # -----------------------------
+    async def _db_get(self, name: str) -> Optional[Tuple[ResolvedPlayer, float]]:
+        if not self.db_path:
+            return None
+        async with open_db(self.db_path, readonly=True) as db:
+            cur = await db.execute(
+                """
+                SELECT account_id, player_name, updated_at
+                  FROM players
+                 WHERE platform=? AND player_name=?
+                 ORDER BY updated_at DESC
+                 LIMIT 1
+                """,
+                (self.platform, name),
+            )
+            row = await cur.fetchone()
+            await cur.close()
+        if not row:
+            return None
+        return ResolvedPlayer(str(row[0]), str(row[1])), float(row[2] or 0)
+
+    async def _db_put(self, player: ResolvedPlayer, now: float) -> None:
+        if not self.db_path:
+            return
+
+        async def _write(db) -> None:
+            await db.execute(
+                """
+                INSERT INTO players (platform, account_id, player_name, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(platform, account_id) DO UPDATE SET
+                  player_name=excluded.player_name,
+                  updated_at=excluded.updated_at
+                """,
+                (self.platform, player.account_id, player.player_name, int(now)),
+            )
+
+        await run_write(self.db_path, _write)
+
+    # -----------------------------
+    # API
+    # -----------------------------
+    async def _lookup_api(self, name: str) -> ResolvedPlayer:
+        self.api_lookups += 1
+        now = time.time()
+        try:
+            p = await self.client.get_player(name)
+        except PubgPlayerNotFound:
+            self._mem_put(name, None, now)
+            raise
+
+        attrs = p.get("attributes") or {}
+        player = ResolvedPlayer(str(p["id"]), attrs.get("name") or name)
+        self._mem_put(name, player, now)
+        if player.player_name != name:
+            self._mem_put(player.player_name, player, now)
+        await self._db_put(player, now)
+        return player
+
+    def _schedule_refresh(self, name: str) -> None:
+        if name in self._refreshing:
+            return
+        self._refreshing.add(name)
+
+        async def _run() -> None:
+            try:
+                self.refreshes += 1
+                await self._lookup_api(name)
+            except Exception as e:
+                print(f"[RESOLVER] refresh failed name={name}: {type(e).__name__}: {e}", flush=True)
+            finally:
+                self._refreshing.discard(name)
+
+        task = asyncio.get_running_loop().create_task(_run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    # -----------------------------
+    # public
+    # -----------------------------
+    async def resolve(self, nickname: str) -> ResolvedPlayer:
+        name = (nickname or "").strip()
+        if not name:
+            raise PubgPlayerNotFound("닉네임이 비어있음")
+        now = time.time()
+
+        hit = self._mem_get(name)
+        if hit is not None:
+            player, checked_at = hit
+            if player is None:
+                if now - checked_at < self.negative_ttl_sec:
+                    self.negative_hits += 1
+                    raise PubgPlayerNotFound(f"플레이어를 찾지 못함: {name}")
+            else:
+                self.mem_hits += 1
+                if now - checked_at >= self.ttl_sec:
+                    self._schedule_refresh(name)
+                return player
+
+        row = await self._db_get(name)
+        if row is not None:
+            player, updated_at = row
+            self.db_hits += 1
+            self._mem_put(name, player, updated_at)
+            if now - updated_at >= self.ttl_sec:
+                self._schedule_refresh(name)
+            return player
+
+        return await self._lookup_api(name)
+
+    async def resolve_id(self, nickname: str) -> str:
+        return (await self.resolve(nickname)).account_id
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "mem_hits": self.mem_hits,
+            "db_hits": self.db_hits,
+            "negative_hits": self.negative_hits,
+            "api_lookups": self.api_lookups,
+            "refreshes": self.refreshes,
+            "entries": len(self._mem),
+        }
+
+    async def close(self) -> None:
+        for t in list(self._tasks):
+            t.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -1,39 +1,168 @@
 import asyncio
+import json
 import random
 import time
-from typing import Any, Dict, Optional, Tuple, List
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Protocol, Sequence, Tuple, List, Union
 import aiohttp
 
+from shaded.services.match_cache import MatchPayloadCache
+
 PUBG_BASE = "https://api.pubg.com"
 
 
 class PubgApiError(Exception):
-    pass
+    def __init__(self, message: str = "", *, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class PubgPlayerNotFound(PubgApiError):
+    """닉네임 조회 결과 없음(404 / 빈 data) — 재시도해도 같은 결과라 negative cache 대상"""
+
+
+def _header_float(headers: aiohttp.typedefs.LooseHeaders, name: str) -> Optional[float]:
+    try:
+        v = headers.get(name)
+        return float(str(v).strip()) if v is not None else None
+    except Exception:
+        return None
+
+
+class RateLimiter(Protocol):
+    """
+    PubgApiClient(limiter=...)에 넣을 수 있는 리미터(_AsyncRateLimiter, rate_budget.SharedRateLimiter).
+    observe(headers)가 있으면 이 리미터가 통과시킨 요청의 응답마다 호출됨(선택).
+    release()가 있으면 통과시킨 요청이 응답(헤더) 없이 끝났을 때 호출됨(선택).
+    """
+    async def wait(self) -> None: ...
 
 
 class _AsyncRateLimiter:
     """
-    키 단위 Rate Limit(예: 10 RPM)을 '요청 시작 간격'으로 보장하는 간단한 리미터.
-    rpm=10이면 평균 6초에 1회만 통과.
+    키 단위 토큰 버킷 리미터(응답 헤더로 보정).
+
+    - 시작: rpm개 토큰(버스트 허용), 헤더 정보가 없으면 window_sec/rpm초마다 1개씩 충전
+    - observe(headers): X-RateLimit-Limit/Remaining/Reset으로 실제 남은 예산과 리셋 시각을 학습
+      (리셋 전까지는 충전 없음 = PUBG 고정 윈도 방식)
+    - 예산이 넉넉하면 바로 통과, low_water(비율) 아래로 줄면 window_sec/rpm 간격으로 천천히
+    - 토큰 0이면 리셋(또는 다음 충전)까지 대기
     """
-    def __init__(self, rpm: int = 10):
+    def __init__(self, rpm: int = 10, *, low_water: float = 0.3, window_sec: float = 60.0):
         rpm = int(rpm) if rpm and int(rpm) > 0 else 10
-        self._interval = 60.0 / float(rpm)
+        self._window = float(window_sec) if window_sec and window_sec > 0 else 60.0
+        self._capacity = float(rpm)
+        self._rate = float(rpm) / self._window
+        self._low_water = max(0.0, float(low_water))
         self._lock = asyncio.Lock()
-        self._next_ts = 0.0  # loop.time()
+
+        self._tokens = float(rpm)
+        self._refill_ts = time.time()
+        self._reset_ts = 0.0     # 서버가 알려준 리셋 시각(epoch), 0이면 모름
+        self._last_grant = 0.0
+        self._unacked = 0        # 통과시켰지만 아직 응답(헤더)을 못 본 요청 수
+
+    def _refill(self, now: float) -> None:
+        if self._reset_ts:
+            if now < self._reset_ts:
+                self._refill_ts = now
+                return
+            # 서버 윈도 리셋 → 꽉 채우고 다시 시간 기반 충전
+            self._tokens = self._capacity
+            self._reset_ts = 0.0
+            self._unacked = 0
+            self._refill_ts = now
+            return
+        elapsed = max(0.0, now - self._refill_ts)
+        self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+        self._refill_ts = now
+
+    def _delay(self, now: float) -> float:
+        if self._tokens < 1.0:
+            if self._reset_ts and now < self._reset_ts:
+                return self._reset_ts - now
+            return (1.0 - self._tokens) / self._rate
+
+        # 바닥 근처: 기존처럼 window/rpm 간격으로만 통과(남은 예산을 다른 호출자 몫으로 남김)
+        if self._tokens < self._capacity * self._low_water:
+            return max(0.0, self._last_grant + self._window / self._capacity - now)
+        return 0.0
 
     async def wait(self) -> None:
-        loop = asyncio.get_running_loop()
         async with self._lock:
-            now = loop.time()
-            if now < self._next_ts:
-                delay = self._next_ts - now
-                self._next_ts += self._interval
-            else:
-                delay = 0.0
-                self._next_ts = now + self._interval
-        if delay > 0:
-            await asyncio.sleep(delay)
+            while True:
+                now = time.time()
+                self._refill(now)
+                delay = self._delay(now)
+                if delay <= 0:
+                    self._tokens -= 1.0
+                    self._last_grant = now
+                    self._unacked += 1
+                    return
+                await asyncio.sleep(delay)
+
+    def observe(self, headers: aiohttp.typedefs.LooseHeaders) -> None:
+        limit = _header_float(headers, "X-RateLimit-Limit")
+        remaining = _header_float(headers, "X-RateLimit-Remaining")
+        reset = _header_float(headers, "X-RateLimit-Reset")
+
+        self.release()
+        if limit and limit > 0:
+            self._capacity = limit
+            self._rate = limit / self._window
+        if remaining is not None:
+            # 서버가 아직 못 본(진행 중) 요청만큼 빼서 반영
+            self._tokens = max(0.0, min(self._capacity, remaining - self._unacked))
+            self._refill_ts = time.time()
+        if reset is not None and reset > time.time():
+            self._reset_ts = reset
+
+    def release(self) -> None:
+        """wait()로 통과시킨 요청 1건이 끝남(observe 안에서, 또는 헤더 없이 실패했을 때)"""
+        self._unacked = max(0, self._unacked - 1)
+
+
+class _EndpointPolicy:
+    """
+    엔드포인트별 호출 정책. slot() 안에서 실제 HTTP 요청 1회를 수행.
+    slot()은 키 리미터를 거쳐 통과했는지(granted)를 넘겨줌.
+    """
+    name = "base"
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[bool]:
+        yield False
+
+
+class _RateLimitedPolicy(_EndpointPolicy):
+    """키 RPM에 잡히는 엔드포인트(/players, /seasons, 시즌 스탯): 리미터 간격을 그대로 지킴."""
+    name = "rate_limited"
+
+    def __init__(self, limiter: RateLimiter):
+        self.limiter = limiter
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[bool]:
+        await self.limiter.wait()
+        yield True
+
+
+class _ConcurrencyCappedPolicy(_EndpointPolicy):
+    """RPM에 안 잡히는 엔드포인트(/matches): 간격 없이 동시 요청 수만 제한."""
+    name = "concurrency_capped"
+
+    def __init__(self, max_concurrency: int = 16):
+        self._sem = asyncio.Semaphore(max(1, int(max_concurrency)))
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[bool]:
+        async with self._sem:
+            yield False
+
+
+class _UnlimitedPolicy(_EndpointPolicy):
+    """제한 없음(match_concurrency<=0 등)."""
+    name = "unlimited"
 
 
 def _retry_delay(headers: aiohttp.typedefs.LooseHeaders) -> float:
@@ -65,81 +194,373 @@ def _retry_delay(headers: aiohttp.typedefs.LooseHeaders) -> float:
     return 6.0
 
 
+class _ApiKeySlot:
+    """
+    키 1개의 상태: 전용 리미터 + 429 backoff + 마지막 응답의 X-RateLimit-Remaining/Reset.
+    """
+    def __init__(self, key: str, limiter: RateLimiter, rpm: int):
+        self.key = key
+        self.policy = _RateLimitedPolicy(limiter)
+        self.rpm = int(rpm) if rpm and int(rpm) > 0 else 10
+        self.remaining: Optional[float] = None
+        self.reset_ts = 0.0          # epoch
+        self.backoff_until = 0.0     # epoch, 429 받으면 이때까지 이 키는 안 씀
+        self.pending = 0             # 이 프로세스에서 이 키로 대기/진행 중인 요청 수
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.key}",
+            "Accept": "application/vnd.api+json",
+        }
+
+    def budget(self, now: float) -> float:
+        """남은 예산 추정치: 헤더 기준 remaining(리셋 지났으면 rpm) - 대기 중 요청 수"""
+        if self.remaining is None or now >= self.reset_ts:
+            base = float(self.rpm)
+        else:
+            base = self.remaining
+        return base - self.pending
+
+    def observe(self, headers: aiohttp.typedefs.LooseHeaders, *, granted: bool) -> None:
+        remaining = _header_float(headers, "X-RateLimit-Remaining")
+        reset = _header_float(headers, "X-RateLimit-Reset")
+        if remaining is not None:
+            self.remaining = remaining
+        if reset is not None:
+            self.reset_ts = reset
+        # 리미터는 자기가 통과시킨 요청의 응답만 받음(/matches 등 미통과 요청으로 진행 중 수가 줄지 않게)
+        if not granted:
+            return
+        observe = getattr(self.policy.limiter, "observe", None)
+        if observe is not None:
+            observe(headers)
+
+    def release(self) -> None:
+        release = getattr(self.policy.limiter, "release", None)
+        if release is not None:
+            release()
+
+
+def _error_body(body: bytes) -> Any:
+    """에러 메시지용: JSON이면 파싱, 아니면 앞부분 텍스트"""
+    if not body:
+        return None
+    try:
+        return json.loads(body)
+    except ValueError:
+        return body[:800].decode("utf-8", errors="replace")
+
+
 def _chunked(xs: List[str], n: int) -> List[List[str]]:
     return [xs[i:i + n] for i in range(0, len(xs), n)]
 
 
+async def _bisect_lookup(
+    fetch: Callable[[List[str]], Awaitable[List[Dict[str, Any]]]],
+    values: List[str],
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    /players 묶음 조회(fetch)인데 404(잘못된 값 하나라도 포함)면 절반씩 나눠 다시 조회.
+    return (찾은 players, 404로 확인된 값들). 404가 아닌 오류는 그대로 올라감
+    - 잘못된 값 1개 → 약 2*log2(N)+1번 호출(단건 재시도는 N+1번)
+    """
+    if not values:
+        return [], []
+    try:
+        return await fetch(values), []
+    except PubgApiError as e:
+        if e.status != 404:
+            raise
+        if len(values) == 1:
+            return [], list(values)
+
+    mid = len(values) // 2
+    left, right = await asyncio.gather(
+        _bisect_lookup(fetch, values[:mid]),
+        _bisect_lookup(fetch, values[mid:]),
+    )
+    return left[0] + right[0], left[1] + right[1]
+
+
+class _PlayerLookupBatcher:
+    """
+    단건 /players 조회(닉네임 또는 account_id)를 window_sec 동안 모아 최대 max_batch개씩 한 번에 요청.
+
+    - 첫 요청이 들어오면 window_sec 뒤 flush, 그 전에 max_batch개가 차면 즉시 flush
+    - 응답은 match_key(player)로 호출자에게 나눠 줌, 응답에 없으면 PubgPlayerNotFound
+    - 묶음 요청이 404면(하나라도 잘못된 값) 절반씩 나눠 다시 조회(_bisect_lookup)
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[List[str]], Awaitable[List[Dict[str, Any]]]],
+        match_key: Callable[[Dict[str, Any]], Optional[str]],
+        *,
+        window_sec: float = 0.15,
+        max_batch: int = 10,
+    ):
+        self._fetch = fetch
+        self._match_key = match_key
+        self.window_sec = float(window_sec)
+        self.max_batch = max(1, min(10, int(max_batch)))
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._timer: Optional[asyncio.Task] = None
+        self._tasks: set = set()
+        self.requests = 0   # 실제로 보낸 /players 요청 수
+        self.lookups = 0    # 들어온 단건 조회 수
+
+    async def lookup(self, value: str) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future = loop.create_future()
+        self._waiters.setdefault(value, []).append(fut)
+        self.lookups += 1
+
+        if len(self._waiters) >= self.max_batch:
+            self._spawn(self._flush())
+        elif self._timer is None or self._timer.done():
+            self._timer = self._spawn(self._flush_after())
+        return await fut
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _flush_after(self) -> None:
+        await asyncio.sleep(self.window_sec)
+        await self._flush()
+
+    async def _flush(self) -> None:
+        while self._waiters:
+            values = list(self._waiters)[: self.max_batch]
+            batch = {v: self._waiters.pop(v) for v in values}
+            await self._dispatch(batch)
+
+    async def _counted_fetch(self, values: List[str]) -> List[Dict[str, Any]]:
+        self.requests += 1
+        return await self._fetch(values)
+
+    async def _dispatch(self, batch: Dict[str, List[asyncio.Future]]) -> None:
+        try:
+            # 404로 확인된 값은 응답(found)에 없으니 _resolve에서 PubgPlayerNotFound
+            found, _bad = await _bisect_lookup(self._counted_fetch, list(batch))
+        except Exception as e:
+            self._resolve(batch, {}, e)
+            return
+
+        by_key: Dict[str, Dict[str, Any]] = {}
+        for p in found:
+            k = self._match_key(p)
+            if k:
+                by_key[k] = p
+        self._resolve(batch, by_key, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"lookups": self.lookups, "requests": self.requests}
+
+    @staticmethod
+    def _resolve(
+        batch: Dict[str, List[asyncio.Future]],
+        by_key: Dict[str, Dict[str, Any]],
+        error: Optional[BaseException],
+    ) -> None:
+        for value, futs in batch.items():
+            # PUBG 닉네임은 대소문자 구분 → 정확히 같은 값만(배치 밖 단건 조회와 같은 결과)
+            p = by_key.get(value)
+            for fut in futs:
+                if fut.done():
+                    continue
+                if error is not None:
+                    fut.set_exception(error)
+                elif p is None:
+                    fut.set_exception(PubgPlayerNotFound(f"플레이어를 찾지 못함: {value}"))
+                else:
+                    fut.set_result(p)
+
+
 class PubgApiClient:
     """
     - 기본: rpm=10, max_retries=3
     - PUBG /players 필터는 playerIds/playerNames 모두 최대 10개 콤마-구분 지원
+    - /matches 는 PUBG 키 RPM에 포함되지 않음 → 리미터 대신 동시성(match_concurrency)만 제한(0 이하면 무제한)
+    - api_key에 키 여러 개(list/tuple)를 주면 키마다 리미터/429 backoff를 따로 두고,
+      요청마다 남은 예산(X-RateLimit-Remaining/Reset)이 가장 많은 키로 보냄
+      (limiter_factory(key)로 키별 리미터 지정, limiter는 키 1개일 때만 사용)
+    - get_player/get_player_by_id(단건)는 150ms 동안 모아서 /players 한 번(최대 10개)으로 보냄
+    - 같은 (path, params) 요청이 이미 진행 중이면 새로 보내지 않고 그 결과를 같이 기다림(single-flight)
+      → dedup_hits: 그렇게 아낀 호출 수, flights: 실제로 보낸 요청 수
     """
     def __init__(
         self,
-        api_key: str,
+        api_key: Union[str, Sequence[str]],
         shard: str,
         session: aiohttp.ClientSession,
         *,
         rpm: int = 10,
         max_retries: int = 3,
-        limiter: Optional[_AsyncRateLimiter] = None,
+        limiter: Optional[RateLimiter] = None,
+        limiter_factory: Optional[Callable[[str], RateLimiter]] = None,
+        match_concurrency: int = 16,
+        match_cache: Optional[MatchPayloadCache] = None,
     ):
-        self.api_key = (api_key or "").strip()
+        if isinstance(api_key, str):
+            keys = [api_key]
+        else:
+            keys = list(api_key or [])
+        keys = list(dict.fromkeys(k.strip() for k in keys if k and k.strip())) or [""]
+
+        self.api_keys = keys
+        self.api_key = keys[0]
         self.shard = shard
         self.session = session
         self.max_retries = int(max_retries) if max_retries is not None else 3
-        self._limiter = limiter or _AsyncRateLimiter(rpm)
-        self._season_cache: Tuple[Optional[str], float] = (None, 0.0)  # (season_id, ts)
 
-    def _headers(self) -> Dict[str, str]:
+        def _make_limiter(key: str) -> RateLimiter:
+            if limiter is not None and len(keys) == 1:
+                return limiter
+            if limiter_factory is not None:
+                return limiter_factory(key)
+            return _AsyncRateLimiter(rpm)
+
+        self._slots = [_ApiKeySlot(k, _make_limiter(k), rpm) for k in keys]
+        self._match_policy: _EndpointPolicy = (
+            _ConcurrencyCappedPolicy(match_concurrency) if int(match_concurrency or 0) > 0 else _UnlimitedPolicy()
+        )
+        self._season_cache: Tuple[Optional[str], float] = (None, 0.0)  # (season_id, ts)
+        self.match_cache = match_cache
+
+        self._inflight: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], asyncio.Task] = {}
+        self.flights = 0
+        self.dedup_hits = 0
+
+        self._name_batcher = _PlayerLookupBatcher(
+            self.get_players_by_names,
+            lambda p: (p.get("attributes") or {}).get("name"),
+        )
+        self._id_batcher = _PlayerLookupBatcher(
+            self.get_players_by_ids,
+            lambda p: p.get("id"),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """/status용 호출 통계(name_lookups/id_lookups: 단건 조회 수와 묶어서 보낸 /players 요청 수)"""
         return {
-            "Authorization": f"Bearer {self.api_key}",
-            "Accept": "application/vnd.api+json",
+            "flights": self.flights,
+            "dedup_hits": self.dedup_hits,
+            "name_lookups": self._name_batcher.stats(),
+            "id_lookups": self._id_batcher.stats(),
         }
 
+    def _pick_slot(self) -> Tuple[Optional[_ApiKeySlot], float]:
+        """
+        backoff 아닌 키 중 남은 예산이 가장 많은 키.
+        전부 backoff면 (None, 가장 빨리 풀리는 키까지 남은 초)
+        """
+        now = time.time()
+        ready = [s for s in self._slots if s.backoff_until <= now]
+        if not ready:
+            return None, max(0.0, min(s.backoff_until for s in self._slots) - now)
+        return max(ready, key=lambda s: s.budget(now)), 0.0
+
+    def _policy_for(self, path: str, slot: _ApiKeySlot) -> _EndpointPolicy:
+        if path.startswith("/matches/"):
+            return self._match_policy
+        return slot.policy
+
     async def _get(
         self,
         path: str,
         params: Optional[Dict[str, str]] = None
     ) -> Tuple[Dict[str, Any], aiohttp.typedefs.LooseHeaders]:
+        body, headers = await self._get_raw(path, params)
+        return json.loads(body), headers
+
+    async def _get_raw(
+        self,
+        path: str,
+        params: Optional[Dict[str, str]] = None
+    ) -> Tuple[bytes, aiohttp.typedefs.LooseHeaders]:
+        key = (path, tuple(sorted((params or {}).items())))
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_raw(path, params))
+            self._inflight[key] = task
+            self.flights += 1
+
+            def _done(t: asyncio.Task, k=key) -> None:
+                if self._inflight.get(k) is t:
+                    del self._inflight[k]
+                # 기다리던 쪽이 모두 취소돼도 "exception was never retrieved" 안 나게
+                if not t.cancelled():
+                    t.exception()
+
+            task.add_done_callback(_done)
+        else:
+            self.dedup_hits += 1
+
+        # 한 호출자가 취소돼도 같이 기다리는 다른 호출자의 요청은 계속 진행
+        return await asyncio.shield(task)
+
+    async def _fetch_raw(
+        self,
+        path: str,
+        params: Optional[Dict[str, str]] = None
+    ) -> Tuple[bytes, aiohttp.typedefs.LooseHeaders]:
         url = f"{PUBG_BASE}/shards/{self.shard}{path}"
 
         last_err: Optional[Exception] = None
         for attempt in range(self.max_retries + 1):
-            await self._limiter.wait()
-
+            slot, wait = self._pick_slot()
+            while slot is None:
+                await asyncio.sleep(wait)
+                slot, wait = self._pick_slot()
+            policy = self._policy_for(path, slot)
+
+            # 재시도 대기는 slot 밖에서(동시성 슬롯을 잡고 자지 않도록)
+            retry_in = 0.0
+            granted = False
+            observed = False
+            slot.pending += 1
             try:
-                async with self.session.get(url, headers=self._headers(), params=params, timeout=aiohttp.ClientTimeout(total=25)) as resp:
-                    data = await resp.json(content_type=None)
+                async with policy.slot() as granted, self.session.get(url, headers=slot.headers(), params=params, timeout=aiohttp.ClientTimeout(total=25)) as resp:
+                    body = await resp.read()
+                    slot.observe(resp.headers, granted=granted)
+                    observed = True
 
                     if resp.status == 429:
                         delay = _retry_delay(resp.headers) + random.uniform(0.1, 0.7)
-                        if attempt < self.max_retries:
-                            await asyncio.sleep(delay)
-                            continue
-                        remaining = resp.headers.get("X-RateLimit-Remaining", "")
-                        reset = resp.headers.get("X-RateLimit-Reset", "")
-                        raise PubgApiError(f"PUBG API rate limited (remaining={remaining}, reset={reset}, delay={delay:.1f}s)")
+                        if attempt >= self.max_retries:
+                            remaining = resp.headers.get("X-RateLimit-Remaining", "")
+                            reset = resp.headers.get("X-RateLimit-Reset", "")
+                            raise PubgApiError(f"PUBG API rate limited (remaining={remaining}, reset={reset}, delay={delay:.1f}s)")
+                        # 이 키만 쉬게 하고, 다른 키가 남아 있으면 바로 재시도
+                        slot.backoff_until = time.time() + delay
 
-                    if resp.status in (500, 502, 503, 504):
-                        if attempt < self.max_retries:
-                            backoff = min(2.0 ** attempt, 20.0) + random.uniform(0.1, 0.9)
-                            await asyncio.sleep(backoff)
-                            continue
-                        raise PubgApiError(f"PUBG API server error {resp.status}: {data}")
+                    elif resp.status in (500, 502, 503, 504):
+                        if attempt >= self.max_retries:
+                            raise PubgApiError(f"PUBG API server error {resp.status}: {_error_body(body)}")
+                        retry_in = min(2.0 ** attempt, 20.0) + random.uniform(0.1, 0.9)
 
-                    if resp.status >= 400:
-                        raise PubgApiError(f"PUBG API error {resp.status}: {data}")
+                    elif resp.status >= 400:
+                        raise PubgApiError(f"PUBG API error {resp.status}: {_error_body(body)}", status=resp.status)
 
-                    return data, resp.headers
+                    else:
+                        return body, resp.headers
 
             except (aiohttp.ClientError, asyncio.TimeoutError) as e:
                 last_err = e
-                if attempt < self.max_retries:
-                    backoff = min(2.0 ** attempt, 20.0) + random.uniform(0.1, 0.9)
-                    await asyncio.sleep(backoff)
-                    continue
-                raise PubgApiError(f"PUBG API network error: {e}") from e
+                if attempt >= self.max_retries:
+                    raise PubgApiError(f"PUBG API network error: {e}") from e
+                retry_in = min(2.0 ** attempt, 20.0) + random.uniform(0.1, 0.9)
+            finally:
+                slot.pending -= 1
+                # 통과는 했는데 헤더를 못 봄(네트워크 오류/타임아웃/취소) → 리미터의 진행 중 수에서 빼기
+                if granted and not observed:
+                    slot.release()
+
+            if retry_in > 0:
+                await asyncio.sleep(retry_in)
 
         raise PubgApiError(f"PUBG API failed: {last_err}")
 
@@ -164,16 +585,48 @@ class PubgApiClient:
         data, _ = await self._get("/players", params={"filter[playerIds]": ",".join(ids)})
         return data.get("data") or []
 
+    async def get_players_by_ids_bisect(self, player_ids: List[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        get_players_by_ids인데 404(삭제/잘못된 account_id 포함)면 절반씩 나눠 다시 조회(_bisect_lookup).
+        return (찾은 players, 404로 확인된 잘못된 id들)
+        """
+        ids = [i.strip() for i in (player_ids or []) if str(i).strip()]
+        return await _bisect_lookup(self.get_players_by_ids, ids)
+
     async def get_player(self, player_name: str) -> Dict[str, Any]:
-        items = await self.get_players_by_names([player_name])
-        if not items:
-            raise PubgApiError(f"플레이어를 찾지 못함: {player_name}")
-        return items[0]
+        name = (player_name or "").strip()
+        if not name:
+            raise PubgPlayerNotFound("닉네임이 비어있음")
+        return await self._name_batcher.lookup(name)
+
+    async def get_player_by_id(self, account_id: str) -> Dict[str, Any]:
+        aid = (account_id or "").strip()
+        if not aid:
+            raise PubgPlayerNotFound("account_id가 비어있음")
+        return await self._id_batcher.lookup(aid)
 
     async def get_player_id(self, player_name: str) -> str:
         p = await self.get_player(player_name)
         return p["id"]
 
+    # -----------------------------
+    # Matches (불변 → match_cache 우선)
+    # -----------------------------
+    async def get_match_raw(self, match_id: str) -> bytes:
+        cache = self.match_cache
+        if cache is not None:
+            hit = await asyncio.to_thread(cache.get, match_id)
+            if hit is not None:
+                return hit
+
+        body, _ = await self._get_raw(f"/matches/{match_id}")
+        if cache is not None:
+            await asyncio.to_thread(cache.put, match_id, body)
+        return body
+
+    async def get_match(self, match_id: str) -> Dict[str, Any]:
+        return json.loads(await self.get_match_raw(match_id))
+
     # -----------------------------
     # Seasons / Stats
     # -----------------------------
@@ -181,7 +634,10 @@ class PubgApiClient:
         cached, ts = self._season_cache
         if cached and (time.time() - ts) < 60 * 60 * 24 * 7:  # 7일 캐시
             return cached
+        return await self.fetch_current_season_id()
 
+    async def fetch_current_season_id(self) -> str:
+        """캐시 무시하고 /seasons 조회(season_tracker의 주기 갱신용)"""
         data, _ = await self._get("/seasons")
         for s in data.get("data", []):
             attrs = s.get("attributes") or {}
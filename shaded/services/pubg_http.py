@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Optional
+
+import aiohttp
+
+from shaded.config import Settings
+from shaded.services.pubg_api import PUBG_BASE, PubgApiClient
+from shaded.services.player_resolver import PlayerResolver
+from shaded.services.pubg_stats import PubgStatsService
+from shaded.services.season_tracker import CurrentSeasonTracker
+from shaded.services.rate_budget import PRIORITY_INTERACTIVE, shared_limiter
+
+
+class PubgHttpService:
+    """
+    봇 프로세스 전역 PUBG HTTP 클라이언트(ShadedBot.setup_hook에서 start, close에서 정리).
+
+    - aiohttp 세션 1개를 모든 cog가 공유 → 명령어마다 DNS/TCP/TLS 재연결 안 함
+    - TCPConnector: keep-alive + DNS 캐시
+    - PubgApiClient/PlayerResolver/PubgStatsService도 1개씩만 → 리미터/시즌/닉네임 캐시가 명령어 사이에 유지됨
+    - start()에서 api.pubg.com 연결을 미리 열어 둠(/status는 키/RPM 소모 없음)
+    - 현재 시즌 ID는 CurrentSeasonTracker가 sync_state에 두고 백그라운드로 갱신
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._client: Optional[PubgApiClient] = None
+        self._resolver: Optional[PlayerResolver] = None
+        self._seasons: Optional[CurrentSeasonTracker] = None
+        self._stats: Optional[PubgStatsService] = None
+
+    @property
+    def client(self) -> PubgApiClient:
+        if self._client is None:
+            raise RuntimeError("PubgHttpService not started")
+        return self._client
+
+    @property
+    def resolver(self) -> PlayerResolver:
+        if self._resolver is None:
+            raise RuntimeError("PubgHttpService not started")
+        return self._resolver
+
+    @property
+    def stats(self) -> PubgStatsService:
+        if self._stats is None:
+            raise RuntimeError("PubgHttpService not started")
+        return self._stats
+
+    async def start(self) -> None:
+        if self._session is not None:
+            return
+
+        connector = aiohttp.TCPConnector(
+            limit=32,
+            limit_per_host=16,
+            ttl_dns_cache=300,
+            keepalive_timeout=75,
+            enable_cleanup_closed=True,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=25, connect=8),
+        )
+
+        s = self.settings
+        self._client = PubgApiClient(
+            s.pubg_api_keys,
+            s.pubg_shard,
+            self._session,
+            limiter_factory=lambda key: shared_limiter(
+                s.db_path,
+                key,
+                priority=PRIORITY_INTERACTIVE,
+                reserved=s.pubg_rate_reserved,
+            ),
+        )
+        self._resolver = PlayerResolver(self._client, s.db_path, s.pubg_shard)
+        self._seasons = CurrentSeasonTracker(self._client, s.db_path, s.pubg_shard)
+        self._stats = PubgStatsService(self._client, self._resolver, self._seasons)
+
+        await self._warm()
+        self._seasons.start()
+
+    async def _warm(self) -> None:
+        try:
+            async with self._session.get(f"{PUBG_BASE}/status", timeout=aiohttp.ClientTimeout(total=8)) as resp:
+                await resp.read()
+            print(f"[PUBG] http warm-up ok status={resp.status}", flush=True)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"[PUBG] http warm-up failed: {type(e).__name__}: {e}", flush=True)
+
+    async def close(self) -> None:
+        if self._stats is not None:
+            await self._stats.close()
+        if self._seasons is not None:
+            await self._seasons.close()
+        if self._resolver is not None:
+            await self._resolver.close()
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+        self._client = None
+        self._resolver = None
+        self._seasons = None
+        self._stats = None
@@ -1,8 +1,16 @@
+import asyncio
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
-import aiohttp
+from typing import Any, Dict, Optional, Set, Tuple
 
 from shaded.services.pubg_api import PubgApiClient, PubgApiError
+from shaded.services.player_resolver import PlayerResolver
+from shaded.services.season_tracker import CurrentSeasonTracker
+
+STATS_FRESH_SEC = 5 * 60        # 이 안이면 캐시 그대로
+STATS_STALE_SEC = 60 * 60       # 이 안이면 캐시 먼저 반환 + 백그라운드 갱신, 넘으면 새로 조회
+STATS_CACHE_MAX_ENTRIES = 512
 
 def _safe_div(a: float, b: float) -> float:
     return a / b if b else 0.0
@@ -61,116 +69,197 @@ class RankedStats:
     rounds: int
 
 class PubgStatsService:
-    def __init__(self, api_key: str, shard: str):
-        self.api_key = api_key
-        self.shard = shard
+    """
+    봇 전역 PubgApiClient(PubgHttpService.client)를 받아서 전적 조회
+
+    - 시즌/랭크 payload는 (kind, account, season)별로 통째로 캐시 → 모드/시점 6가지를 한 번의 조회로
+    - stale-while-revalidate: STATS_FRESH_SEC 지나면 캐시를 바로 주고 뒤에서 갱신,
+      STATS_STALE_SEC 지나면 기다려서 새로 조회
+    """
+    def __init__(
+        self,
+        client: PubgApiClient,
+        resolver: Optional[PlayerResolver] = None,
+        seasons: Optional[CurrentSeasonTracker] = None,
+    ):
+        self.client = client
+        self.resolver = resolver
+        self.seasons = seasons
+
+        # (kind, account_id, season_id) -> (payload, fetched_at)
+        self._payloads: "OrderedDict[Tuple[str, str, str], Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._refreshing: Set[Tuple[str, str, str]] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self.cache_hits = 0
+        self.cache_stale_hits = 0
+        self.cache_misses = 0
+
+    async def _fetch_payload(self, key: Tuple[str, str, str]) -> Dict[str, Any]:
+        kind, player_id, season_id = key
+        if kind == "ranked":
+            payload = await self.client.get_ranked_stats(player_id, season_id)
+        else:
+            payload = await self.client.get_season_stats(player_id, season_id)
+        self._payloads[key] = (payload, time.time())
+        self._payloads.move_to_end(key)
+        while len(self._payloads) > STATS_CACHE_MAX_ENTRIES:
+            self._payloads.popitem(last=False)
+        return payload
+
+    def _refresh_later(self, key: Tuple[str, str, str]) -> None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def _run() -> None:
+            try:
+                await self._fetch_payload(key)
+            except Exception as e:
+                print(f"[STATS] refresh failed {key[0]} {key[1]}: {type(e).__name__}: {e}", flush=True)
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.get_running_loop().create_task(_run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _stats_payload(self, kind: str, player_id: str, season_id: str) -> Dict[str, Any]:
+        key = (kind, player_id, season_id)
+        hit = self._payloads.get(key)
+        if hit is not None:
+            payload, fetched_at = hit
+            age = time.time() - fetched_at
+            if age < STATS_FRESH_SEC:
+                self.cache_hits += 1
+                self._payloads.move_to_end(key)
+                return payload
+            if age < STATS_STALE_SEC:
+                self.cache_stale_hits += 1
+                self._payloads.move_to_end(key)
+                self._refresh_later(key)
+                return payload
+
+        self.cache_misses += 1
+        return await self._fetch_payload(key)
+
+    async def close(self) -> None:
+        for t in list(self._tasks):
+            t.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _player_id(self, nickname: str) -> str:
+        # resolver: 메모리/players 테이블에서 찾으면 /players 호출 없음
+        if self.resolver is not None:
+            return await self.resolver.resolve_id(nickname)
+        return await self.client.get_player_id(nickname)
+
+    async def _season_id(self) -> str:
+        # tracker: sync_state에 저장된 값(백그라운드 갱신) → /seasons 대기 없음
+        if self.seasons is not None:
+            return await self.seasons.get()
+        return await self.client.get_current_season_id()
 
     async def fetch_normal(self, nickname: str, base_mode: str, view: str) -> NormalStats:
-        async with aiohttp.ClientSession() as session:
-            client = PubgApiClient(self.api_key, self.shard, session)
-
-            player_id = await client.get_player_id(nickname)
-            season_id = await client.get_current_season_id()
-            payload = await client.get_season_stats(player_id, season_id)
-
-            attrs = payload.get("data", {}).get("attributes", {})
-            gm = (attrs.get("gameModeStats") or {}).get(mode_key(base_mode, view))
-            if not gm:
-                raise PubgApiError("전적 데이터가 없음(현재 시즌/모드)")
-
-            rounds = int(gm.get("roundsPlayed", 0))
-            if rounds == 0:
-                raise PubgApiError("플레이 기록이 없음(현재 시즌/모드)")
-
-            wins = int(gm.get("wins", 0))
-            top10 = int(gm.get("top10s", 0))
-            kills = int(gm.get("kills", 0))
-            dmg = float(gm.get("damageDealt", 0.0))
-            losses = int(gm.get("losses", 0))
-
-            headshot_kills = int(gm.get("headshotKills", 0))
-            longest_kill = float(gm.get("longestKill", 0.0))
-            time_survived = float(gm.get("timeSurvived", 0.0))
-            yopo = int(float(gm.get("roundMostKills") or 0))
-
-            win_rate = _safe_div(wins * 100.0, rounds)
-            top10_rate = _safe_div(top10 * 100.0, rounds)
-            kd = _safe_div(kills, max(losses, 1))
-            adr = _safe_div(dmg, rounds)
-
-            hs_rate = _safe_div(headshot_kills * 100.0, kills)
-            avg_survival_sec = _safe_div(time_survived, rounds)
-            mm = int(avg_survival_sec // 60)
-            ss = int(avg_survival_sec % 60)
-            survival_txt = f"{mm}m {ss:02d}s" if avg_survival_sec > 0 else "-"
-
-            title = f"일반 {base_mode.upper()} {view.upper()}".replace("SOLO", "솔로").replace("DUO", "듀오").replace("SQUAD", "스쿼드")
-
-            return NormalStats(
-                nickname=nickname,
-                season_label=season_label(season_id),
-                title=title,
-                kd=kd,
-                win_rate=win_rate,
-                top10_rate=top10_rate,
-                adr=adr,
-                rounds=rounds,
-                yopo=yopo,
-                hs_rate=hs_rate,
-                longest_kill=longest_kill,
-                survival_txt=survival_txt,
-            )
+        player_id = await self._player_id(nickname)
+        season_id = await self._season_id()
+        payload = await self._stats_payload("normal", player_id, season_id)
+
+        attrs = payload.get("data", {}).get("attributes", {})
+        gm = (attrs.get("gameModeStats") or {}).get(mode_key(base_mode, view))
+        if not gm:
+            raise PubgApiError("전적 데이터가 없음(현재 시즌/모드)")
+
+        rounds = int(gm.get("roundsPlayed", 0))
+        if rounds == 0:
+            raise PubgApiError("플레이 기록이 없음(현재 시즌/모드)")
+
+        wins = int(gm.get("wins", 0))
+        top10 = int(gm.get("top10s", 0))
+        kills = int(gm.get("kills", 0))
+        dmg = float(gm.get("damageDealt", 0.0))
+        losses = int(gm.get("losses", 0))
+
+        headshot_kills = int(gm.get("headshotKills", 0))
+        longest_kill = float(gm.get("longestKill", 0.0))
+        time_survived = float(gm.get("timeSurvived", 0.0))
+        yopo = int(float(gm.get("roundMostKills") or 0))
+
+        win_rate = _safe_div(wins * 100.0, rounds)
+        top10_rate = _safe_div(top10 * 100.0, rounds)
+        kd = _safe_div(kills, max(losses, 1))
+        adr = _safe_div(dmg, rounds)
+
+        hs_rate = _safe_div(headshot_kills * 100.0, kills)
+        avg_survival_sec = _safe_div(time_survived, rounds)
+        mm = int(avg_survival_sec // 60)
+        ss = int(avg_survival_sec % 60)
+        survival_txt = f"{mm}m {ss:02d}s" if avg_survival_sec > 0 else "-"
+
+        title = f"일반 {base_mode.upper()} {view.upper()}".replace("SOLO", "솔로").replace("DUO", "듀오").replace("SQUAD", "스쿼드")
+
+        return NormalStats(
+            nickname=nickname,
+            season_label=season_label(season_id),
+            title=title,
+            kd=kd,
+            win_rate=win_rate,
+            top10_rate=top10_rate,
+            adr=adr,
+            rounds=rounds,
+            yopo=yopo,
+            hs_rate=hs_rate,
+            longest_kill=longest_kill,
+            survival_txt=survival_txt,
+        )
 
     async def fetch_ranked(self, nickname: str, base_mode: str, view: str) -> RankedStats:
-        async with aiohttp.ClientSession() as session:
-            client = PubgApiClient(self.api_key, self.shard, session)
-
-            player_id = await client.get_player_id(nickname)
-            season_id = await client.get_current_season_id()
-            payload = await client.get_ranked_stats(player_id, season_id)
-
-            attrs = payload.get("data", {}).get("attributes", {})
-            ranked_map = attrs.get("rankedGameModeStats") or {}
-            gm = ranked_map.get(mode_key(base_mode, view))
-
-            # FPP 없고 TPP만 있을 때 메시지용 에러
-            if not gm and view == "fpp" and ranked_map.get(mode_key(base_mode, "tpp")):
-                raise PubgApiError("FPP 데이터가 없음 → TPP로 선택해서 조회")
-
-            if not gm:
-                raise PubgApiError("전적 데이터가 없음(현재 시즌/모드)")
-
-            tier = _tier_str(gm.get("currentTier"))
-            best_tier = _tier_str(gm.get("bestTier"))
-            rp = int(gm.get("currentRankPoint") or 0)
-            best_rp = int(gm.get("bestRankPoint") or 0)
-
-            rounds = int(gm.get("roundsPlayed", 0))
-            wins = int(gm.get("wins", 0))
-            top10 = int(gm.get("top10s", 0))
-
-            kills = int(gm.get("kills", 0))
-            deaths = int(gm.get("deaths", 0) or gm.get("losses", 0))
-            dmg = float(gm.get("damageDealt", 0.0))
-
-            win_rate = _safe_div(wins * 100.0, rounds)
-            top10_rate = _safe_div(top10 * 100.0, rounds)
-            kd = _safe_div(kills, max(deaths, 1))
-            adr = _safe_div(dmg, rounds)
-
-            title = f"경쟁 {base_mode.upper()} {view.upper()}".replace("SOLO", "솔로").replace("DUO", "듀오").replace("SQUAD", "스쿼드")
-
-            return RankedStats(
-                nickname=nickname,
-                season_label=season_label(season_id),
-                title=title,
-                tier=tier,
-                rp=rp,
-                best_rp=best_rp,
-                best_tier=best_tier,
-                kd=kd,
-                win_rate=win_rate,
-                top10_rate=top10_rate,
-                adr=adr,
-                rounds=rounds,
-            )
+        player_id = await self._player_id(nickname)
+        season_id = await self._season_id()
+        payload = await self._stats_payload("ranked", player_id, season_id)
+
+        attrs = payload.get("data", {}).get("attributes", {})
+        ranked_map = attrs.get("rankedGameModeStats") or {}
+        gm = ranked_map.get(mode_key(base_mode, view))
+
+        # FPP 없고 TPP만 있을 때 메시지용 에러
+        if not gm and view == "fpp" and ranked_map.get(mode_key(base_mode, "tpp")):
+            raise PubgApiError("FPP 데이터가 없음 → TPP로 선택해서 조회")
+
+        if not gm:
+            raise PubgApiError("전적 데이터가 없음(현재 시즌/모드)")
+
+        tier = _tier_str(gm.get("currentTier"))
+        best_tier = _tier_str(gm.get("bestTier"))
+        rp = int(gm.get("currentRankPoint") or 0)
+        best_rp = int(gm.get("bestRankPoint") or 0)
+
+        rounds = int(gm.get("roundsPlayed", 0))
+        wins = int(gm.get("wins", 0))
+        top10 = int(gm.get("top10s", 0))
+
+        kills = int(gm.get("kills", 0))
+        deaths = int(gm.get("deaths", 0) or gm.get("losses", 0))
+        dmg = float(gm.get("damageDealt", 0.0))
+
+        win_rate = _safe_div(wins * 100.0, rounds)
+        top10_rate = _safe_div(top10 * 100.0, rounds)
+        kd = _safe_div(kills, max(deaths, 1))
+        adr = _safe_div(dmg, rounds)
+
+        title = f"경쟁 {base_mode.upper()} {view.upper()}".replace("SOLO", "솔로").replace("DUO", "듀오").replace("SQUAD", "스쿼드")
+
+        return RankedStats(
+            nickname=nickname,
+            season_label=season_label(season_id),
+            title=title,
+            tier=tier,
+            rp=rp,
+            best_rp=best_rp,
+            best_tier=best_tier,
+            kd=kd,
+            win_rate=win_rate,
+            top10_rate=top10_rate,
+            adr=adr,
+            rounds=rounds,
+        )
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple
+
+from shaded.services.migrations import migrate_sync
+from shaded.services.sqlite_conn import open_db_sync
+
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+
+DEFAULT_RESERVED_INTERACTIVE = 2
+
+
+def _bucket_key(api_key: str) -> str:
+    # 키 원문은 DB에 남기지 않음
+    return hashlib.sha256((api_key or "").strip().encode("utf-8")).hexdigest()[:16]
+
+
+class SharedRateLimiter:
+    """
+    같은 PUBG 키를 쓰는 모든 프로세스(봇, tools.sync_weekly_kills 서브프로세스)가
+    SQLite(api_rate_budget)에 저장된 토큰 버킷 하나를 나눠 쓰는 리미터.
+
+    - 충전: 초당 rpm/60 토큰, 최대 capacity(= rpm, 예산이 있으면 버스트 허용)
+    - interactive(슬래시 명령어): 버킷을 0까지 사용
+    - background(sync): reserved 토큰은 남겨 둠 → 명령어용 예약분
+    - observe(headers): X-RateLimit-Remaining이 버킷보다 적으면 버킷을 낮추고,
+      0이면 X-RateLimit-Reset까지 충전이 안 되도록 음수(빚)로 기록
+    - _AsyncRateLimiter와 같은 wait()/observe() 인터페이스라 PubgApiClient(limiter=...)에 그대로 넣으면 됨
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        api_key: str,
+        rpm: int = 10,
+        *,
+        priority: str = PRIORITY_BACKGROUND,
+        reserved: int = DEFAULT_RESERVED_INTERACTIVE,
+        timeout_sec: float = 5.0,
+    ):
+        rpm = int(rpm) if rpm and int(rpm) > 0 else 10
+        self.db_path = db_path
+        self.bucket = _bucket_key(api_key)
+        self.rate = float(rpm) / 60.0
+        self.reserved = max(0, int(reserved))
+        self.capacity = float(max(rpm, self.reserved + 1))
+        self.priority = priority
+        self.timeout_sec = float(timeout_sec)
+
+        self._floor = 0.0 if priority == PRIORITY_INTERACTIVE else float(self.reserved)
+        self._lock = asyncio.Lock()  # 같은 프로세스 안에서는 순서대로
+        self._db_lock = threading.Lock()
+        self._con = None
+        self._pending_observe: Set[asyncio.Task] = set()
+
+    def _conn(self):
+        if self._con is None:
+            con = open_db_sync(self.db_path, timeout_sec=self.timeout_sec, check_same_thread=False)
+            migrate_sync(con)  # api_rate_budget(migrations v1)
+            self._con = con
+        return self._con
+
+    def _read_tokens(self, con, now: float) -> float:
+        """저장된 토큰 + 경과 시간만큼 충전(capacity 상한)"""
+        row = con.execute(
+            "SELECT tokens, updated_at FROM api_rate_budget WHERE bucket=?",
+            (self.bucket,),
+        ).fetchone()
+        if not row:
+            return self.capacity
+        elapsed = max(0.0, now - float(row[1]))
+        return min(self.capacity, float(row[0]) + elapsed * self.rate)
+
+    def _write_tokens(self, con, tokens: float, now: float) -> None:
+        con.execute(
+            """
+            INSERT INTO api_rate_budget (bucket, tokens, updated_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(bucket) DO UPDATE SET
+              tokens=excluded.tokens,
+              updated_at=excluded.updated_at
+            """,
+            (self.bucket, tokens, now),
+        )
+
+    def _try_take(self) -> float:
+        """토큰 1개를 가져오면 0, 아니면 다시 시도할 때까지 기다릴 초."""
+        with self._db_lock:
+            con = self._conn()
+            now = time.time()
+            con.execute("BEGIN IMMEDIATE;")
+            try:
+                tokens = self._read_tokens(con, now)
+
+                need = self._floor + 1.0
+                if tokens >= need:
+                    tokens -= 1.0
+                    delay = 0.0
+                else:
+                    delay = (need - tokens) / self.rate
+
+                self._write_tokens(con, tokens, now)
+                con.commit()
+                return delay
+            except Exception:
+                con.rollback()
+                raise
+
+    def _apply_remaining(self, remaining: float, reset: Optional[float]) -> None:
+        """서버가 알려준 남은 예산으로 공유 버킷을 아래쪽으로만 보정."""
+        with self._db_lock:
+            con = self._conn()
+            now = time.time()
+            con.execute("BEGIN IMMEDIATE;")
+            try:
+                tokens = self._read_tokens(con, now)
+
+                tokens = min(tokens, remaining)
+                if remaining <= 0 and reset and reset > now:
+                    tokens = min(tokens, -(reset - now) * self.rate)
+
+                self._write_tokens(con, tokens, now)
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
+
+    def observe(self, headers) -> None:
+        try:
+            remaining = headers.get("X-RateLimit-Remaining")
+            if remaining is None:
+                return
+            remaining_f = float(str(remaining).strip())
+            reset = headers.get("X-RateLimit-Reset")
+            reset_f = float(str(reset).strip()) if reset is not None else None
+        except Exception:
+            return
+
+        task = asyncio.get_running_loop().create_task(
+            asyncio.to_thread(self._apply_remaining, remaining_f, reset_f)
+        )
+        self._pending_observe.add(task)
+        task.add_done_callback(self._pending_observe.discard)
+
+    async def wait(self) -> None:
+        async with self._lock:
+            while True:
+                delay = await asyncio.to_thread(self._try_take)
+                if delay <= 0:
+                    return
+                await asyncio.sleep(min(delay, 60.0))
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._con is not None:
+                self._con.close()
+                self._con = None
+
+
+_SHARED: Dict[Tuple[str, str, str], SharedRateLimiter] = {}
+
+
+def shared_limiter(
+    db_path: str,
+    api_key: str,
+    *,
+    priority: str = PRIORITY_BACKGROUND,
+    rpm: int = 10,
+    reserved: Optional[int] = None,
+) -> SharedRateLimiter:
+    """프로세스 안에서는 (db, key, priority)당 리미터 1개만 만들어 재사용."""
+    k = (db_path, _bucket_key(api_key), priority)
+    lim = _SHARED.get(k)
+    if lim is None:
+        lim = SharedRateLimiter(
+            db_path,
+            api_key,
+            rpm,
+            priority=priority,
+            reserved=DEFAULT_RESERVED_INTERACTIVE if reserved is None else reserved,
+        )
+        _SHARED[k] = lim
+    return lim
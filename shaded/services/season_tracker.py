@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from shaded.services.pubg_api import PubgApiClient
+from shaded.services.sync_state import get_current_season_id, set_current_season_id
+
+KST = timezone(timedelta(hours=9))
+
+# PUBG 시즌 교체는 수요일(KST) 점검 시간대에 일어남 → 그때만 자주 확인
+ROLLOVER_WEEKDAY = 2              # Monday=0
+ROLLOVER_HOURS_KST = (6, 15)      # [06:00, 15:00)
+REFRESH_ROLLOVER_SEC = 60 * 60
+REFRESH_NORMAL_SEC = 12 * 60 * 60
+RETRY_SEC = 5 * 60
+
+
+def _in_rollover_window(now: float) -> bool:
+    kst = datetime.fromtimestamp(now, tz=KST)
+    return kst.weekday() == ROLLOVER_WEEKDAY and ROLLOVER_HOURS_KST[0] <= kst.hour < ROLLOVER_HOURS_KST[1]
+
+
+def refresh_interval(now: float) -> float:
+    return REFRESH_ROLLOVER_SEC if _in_rollover_window(now) else REFRESH_NORMAL_SEC
+
+
+class CurrentSeasonTracker:
+    """
+    현재 시즌 ID를 sync_state(pubg_current_season_id:{shard})에 저장해 두고 프로세스 간 공유.
+
+    - get(): 메모리 → sync_state 순으로 반환, 둘 다 없을 때만 /seasons 호출
+    - start(): 백그라운드 갱신 루프(수요일 06~15시 KST는 1시간, 그 외 12시간마다 /seasons)
+      → 명령어가 /seasons 때문에 기다리는 일은 최초 1회(DB도 비었을 때)뿐
+    """
+
+    def __init__(self, client: PubgApiClient, db_path: str, shard: str):
+        self.client = client
+        self.db_path = db_path
+        self.shard = shard
+        self._current: Optional[Tuple[str, float]] = None  # (season_id, checked_at)
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _load(self) -> Optional[Tuple[str, float]]:
+        row = await get_current_season_id(self.db_path, self.shard)
+        if not row or not row[0]:
+            return None
+        return row[0], float(row[1])
+
+    async def refresh(self) -> str:
+        season_id = await self.client.fetch_current_season_id()
+        prev = self._current[0] if self._current else None
+        self._current = (season_id, time.time())
+        await set_current_season_id(self.db_path, self.shard, season_id)
+        if prev and prev != season_id:
+            print(f"[SEASON] rollover {prev} -> {season_id}", flush=True)
+        return season_id
+
+    async def get(self) -> str:
+        if self._current:
+            return self._current[0]
+        async with self._lock:
+            if self._current:
+                return self._current[0]
+            loaded = await self._load()
+            if loaded:
+                self._current = loaded
+                return loaded[0]
+            return await self.refresh()
+
+    async def _run(self) -> None:
+        while True:
+            now = time.time()
+            try:
+                # DB 읽기 실패(잠김 등)도 refresh 실패와 똑같이 재시도(task가 죽지 않게)
+                if self._current is None:
+                    self._current = await self._load()
+
+                due = (self._current[1] + refresh_interval(now)) if self._current else now
+                if due > now:
+                    # 수요일 창이 시작되면 바로 짧은 주기로 바뀌도록 최대 1시간씩 잠
+                    await asyncio.sleep(min(due - now, REFRESH_ROLLOVER_SEC))
+                    continue
+
+                await self.refresh()
+            except Exception as e:
+                print(f"[SEASON] refresh failed: {type(e).__name__}: {e}", flush=True)
+                await asyncio.sleep(RETRY_SEC)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import asyncio
 import sqlite3
+import time
 from contextlib import asynccontextmanager
-from typing import AsyncIterator
+from typing import AsyncIterator, Dict, List, Optional
 
 import aiosqlite
 
 
 DEFAULT_TIMEOUT_SEC = 5.0
+DEFAULT_POOL_READERS = 4  # 봇은 Settings.db_pool_readers(DB_POOL_READERS)로 넘김
 
 
 async def _apply_pragmas_async(db: aiosqlite.Connection, timeout_sec: float) -> None:
@@ -23,13 +26,127 @@ def _apply_pragmas_sync(con: sqlite3.Connection, timeout_sec: float) -> None:
     con.execute(f"PRAGMA busy_timeout={int(timeout_sec * 1000)};")
 
 
+class SqlitePool:
+    """
+    봇 수명 동안 유지하는 aiosqlite 연결 풀(reader N개 + writer 1개). PRAGMA는 연결 만들 때 1번만.
+
+    - acquire(readonly=True): reader(PRAGMA query_only=ON) 하나를 빌림, 다 쓰고 있으면 반납까지 대기
+    - acquire(readonly=False): writer 1개 → 봇 안의 쓰기는 여기서 직렬화(WAL이라 reader는 안 막힘)
+    - 반납 시: 남은 트랜잭션 rollback + row_factory 원복(다음 사용자에게 상태가 새지 않게)
+    - 지표: stats() → 빌린 횟수 / 기다린 횟수 / 평균·최대 대기(ms)
+    """
+
+    def __init__(self, db_path: str, readers: int = DEFAULT_POOL_READERS, timeout_sec: float = DEFAULT_TIMEOUT_SEC):
+        self.db_path = db_path
+        self.readers = max(1, int(readers))
+        self.timeout_sec = timeout_sec
+        self._read_q: "asyncio.Queue[aiosqlite.Connection]" = asyncio.Queue()
+        self._write_q: "asyncio.Queue[aiosqlite.Connection]" = asyncio.Queue()
+        self._all: List[aiosqlite.Connection] = []
+        self._closed = False
+
+        self.acquired = {"read": 0, "write": 0}
+        self.waited = {"read": 0, "write": 0}
+        self.wait_total_sec = {"read": 0.0, "write": 0.0}
+        self.wait_max_sec = {"read": 0.0, "write": 0.0}
+
+    async def _connect(self, readonly: bool) -> aiosqlite.Connection:
+        db = await aiosqlite.connect(self.db_path, timeout=self.timeout_sec)
+        await _apply_pragmas_async(db, self.timeout_sec)
+        if readonly:
+            await db.execute("PRAGMA query_only=ON;")
+        self._all.append(db)
+        return db
+
+    async def start(self) -> None:
+        # writer 먼저(journal_mode=WAL 전환은 쓰기 연결에서)
+        self._write_q.put_nowait(await self._connect(readonly=False))
+        for _ in range(self.readers):
+            self._read_q.put_nowait(await self._connect(readonly=True))
+
+    async def close(self) -> None:
+        self._closed = True
+        conns, self._all = self._all, []
+        for db in conns:
+            try:
+                await db.close()
+            except Exception:
+                pass
+
+    @asynccontextmanager
+    async def acquire(self, readonly: bool = False) -> AsyncIterator[aiosqlite.Connection]:
+        if self._closed:
+            raise RuntimeError("SqlitePool is closed")
+        kind = "read" if readonly else "write"
+        q = self._read_q if readonly else self._write_q
+
+        t0 = time.perf_counter()
+        db = await q.get()
+        waited = time.perf_counter() - t0
+        self.acquired[kind] += 1
+        if waited > 0.001:
+            self.waited[kind] += 1
+        self.wait_total_sec[kind] += waited
+        self.wait_max_sec[kind] = max(self.wait_max_sec[kind], waited)
+
+        try:
+            yield db
+        finally:
+            try:
+                if db.in_transaction:
+                    await db.rollback()
+                db.row_factory = None
+            finally:
+                q.put_nowait(db)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        out: Dict[str, Dict[str, float]] = {}
+        for kind in ("read", "write"):
+            n = self.acquired[kind]
+            out[kind] = {
+                "acquired": n,
+                "waited": self.waited[kind],
+                "avg_wait_ms": (self.wait_total_sec[kind] / n * 1000) if n else 0.0,
+                "max_wait_ms": self.wait_max_sec[kind] * 1000,
+            }
+        return out
+
+
+# db_path → 풀. 등록된 경로만 open_db가 풀을 씀(sync 도구 등 다른 프로세스는 기존처럼 매번 연결)
+_pools: Dict[str, SqlitePool] = {}
+
+
+def register_pool(pool: SqlitePool) -> None:
+    _pools[pool.db_path] = pool
+
+
+def unregister_pool(db_path: str) -> Optional[SqlitePool]:
+    return _pools.pop(db_path, None)
+
+
+def get_pool(db_path: str) -> Optional[SqlitePool]:
+    return _pools.get(db_path)
+
+
 @asynccontextmanager
-async def open_db(db_path: str, timeout_sec: float = DEFAULT_TIMEOUT_SEC) -> AsyncIterator[aiosqlite.Connection]:
+async def open_db(
+    db_path: str,
+    timeout_sec: float = DEFAULT_TIMEOUT_SEC,
+    *,
+    readonly: bool = False,
+) -> AsyncIterator[aiosqlite.Connection]:
     """aiosqlite 연결 + 공통 PRAGMA 적용.
 
     - timeout_sec: sqlite3 connect timeout(=잠김 대기)
     - busy_timeout: PRAGMA로도 동일 값 적용(드라이버/환경 차이를 줄임)
+    - db_path에 풀이 등록돼 있으면(봇) 풀에서 빌림: readonly=True → reader, 아니면 writer
     """
+    pool = _pools.get(db_path)
+    if pool is not None:
+        async with pool.acquire(readonly=readonly) as db:
+            yield db
+        return
+
     db = await aiosqlite.connect(db_path, timeout=timeout_sec)
     try:
         await _apply_pragmas_async(db, timeout_sec)
@@ -38,8 +155,16 @@ async def open_db(db_path: str, timeout_sec: float = DEFAULT_TIMEOUT_SEC) -> Asy
         await db.close()
 
 
-def open_db_sync(db_path: str, timeout_sec: float = DEFAULT_TIMEOUT_SEC) -> sqlite3.Connection:
-    """sqlite3 동기 연결 + 공통 PRAGMA 적용."""
-    con = sqlite3.connect(db_path, timeout=timeout_sec)
+def open_db_sync(
+    db_path: str,
+    timeout_sec: float = DEFAULT_TIMEOUT_SEC,
+    *,
+    check_same_thread: bool = True,
+) -> sqlite3.Connection:
+    """sqlite3 동기 연결 + 공통 PRAGMA 적용.
+
+    - check_same_thread=False: asyncio.to_thread 등 여러 스레드에서 lock으로 직렬화해 쓸 때
+    """
+    con = sqlite3.connect(db_path, timeout=timeout_sec, check_same_thread=check_same_thread)
     _apply_pragmas_sync(con, timeout_sec)
     return con
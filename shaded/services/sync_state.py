@@ -4,30 +4,27 @@ import time
 from typing import Optional, Tuple
 
 from shaded.services.sqlite_conn import open_db
+from shaded.services.db_writer import run_write
+from shaded.services.migrations import ensure_schema
 
 
 STATE_KEY_WEEKLY_SYNC_UTC_Z = "weekly_sync_last_utc_z"
 STATE_KEY_WEEKLY_SYNC_LAST_ERROR = "weekly_sync_last_error"
 STATE_KEY_WEEKLY_SYNC_LAST_ERROR_NOTIFIED_AT = "weekly_sync_last_error_notified_at"
+STATE_KEY_WEEKLY_SYNC_BAD_PLAYER_IDS = "weekly_sync_bad_player_ids"  # 콤마 구분, sync가 갱신
+STATE_KEY_WEEKLY_SYNC_CLAN_IDS = "weekly_sync_clan_ids"  # 콤마 구분, no_clan 원장을 만든 멤버 목록(sync가 갱신)
+STATE_KEY_PUBG_CURRENT_SEASON_PREFIX = "pubg_current_season_id:"  # + shard
 
 
 async def init_sync_state(db_path: str) -> None:
-    async with open_db(db_path) as db:
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS sync_state (
-                key TEXT PRIMARY KEY,
-                value TEXT NOT NULL,
-                updated_at INTEGER NOT NULL
-            )
-            """
-        )
-        await db.commit()
+    # 스키마는 migrations.py에서(호환용 래퍼)
+    await ensure_schema(db_path)
 
 
 async def _upsert_state(db_path: str, key: str, value: str) -> None:
     now = int(time.time())
-    async with open_db(db_path) as db:
+
+    async def _write(db) -> None:
         await db.execute(
             """
             INSERT INTO sync_state (key, value, updated_at)
@@ -38,11 +35,12 @@ async def _upsert_state(db_path: str, key: str, value: str) -> None:
             """,
             (key, value, now),
         )
-        await db.commit()
+
+    await run_write(db_path, _write)
 
 
 async def _get_state(db_path: str, key: str) -> Optional[Tuple[str, int]]:
-    async with open_db(db_path) as db:
+    async with open_db(db_path, readonly=True) as db:
         cur = await db.execute(
             "SELECT value, updated_at FROM sync_state WHERE key=?",
             (key,),
@@ -63,6 +61,11 @@ async def get_weekly_sync_last_utc_z(db_path: str) -> Optional[str]:
     return v[0] if v else None
 
 
+async def get_weekly_sync_last_state(db_path: str) -> Optional[Tuple[str, int]]:
+    """(last_utc_z, updated_at) — 리더보드 캐시의 데이터 버전으로도 씀"""
+    return await _get_state(db_path, STATE_KEY_WEEKLY_SYNC_UTC_Z)
+
+
 async def set_weekly_sync_last_error(db_path: str, message: str) -> None:
     msg = (message or "").strip()
     await _upsert_state(db_path, STATE_KEY_WEEKLY_SYNC_LAST_ERROR, msg)
@@ -85,3 +88,20 @@ async def get_weekly_sync_last_error_notified_at(db_path: str) -> int:
         return int(v[0])
     except Exception:
         return 0
+
+
+async def set_current_season_id(db_path: str, shard: str, season_id: str) -> None:
+    await _upsert_state(db_path, STATE_KEY_PUBG_CURRENT_SEASON_PREFIX + shard, season_id)
+
+
+async def get_current_season_id(db_path: str, shard: str) -> Optional[Tuple[str, int]]:
+    """return (season_id, updated_at_epoch)"""
+    return await _get_state(db_path, STATE_KEY_PUBG_CURRENT_SEASON_PREFIX + shard)
+
+
+async def get_weekly_sync_bad_player_ids(db_path: str) -> list[str]:
+    """sync가 404로 확인해서 조회에서 빼고 있는 account_id 목록"""
+    v = await _get_state(db_path, STATE_KEY_WEEKLY_SYNC_BAD_PLAYER_IDS)
+    if not v or not v[0]:
+        return []
+    return [x for x in v[0].split(",") if x]
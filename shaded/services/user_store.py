@@ -1,14 +1,12 @@
 from __future__ import annotations
 
-from pathlib import Path
 from typing import Optional
 import time
 
 import aiosqlite
 from shaded.services.sqlite_conn import open_db
-
-from shaded.services.sync_state import init_sync_state
-from shaded.services.leaderboard_store import init_weekly_snapshot_tables
+from shaded.services.db_writer import run_write
+from shaded.services.migrations import ensure_schema
 
 
 async def _fetchone(con: aiosqlite.Connection, sql: str, params: tuple) -> Optional[aiosqlite.Row]:
@@ -27,25 +25,8 @@ async def _fetchone(con: aiosqlite.Connection, sql: str, params: tuple) -> Optio
 
 
 async def init_db(db_path: str) -> None:
-    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-
-    async with open_db(db_path) as db:
-        await db.execute(
-            """
-            CREATE TABLE IF NOT EXISTS pubg_user (
-                discord_id INTEGER PRIMARY KEY,
-                pubg_nickname TEXT NOT NULL,
-                updated_at INTEGER NOT NULL
-            )
-            """
-        )
-        await db.commit()
-
-    # sync_state(마지막 갱신 시각 저장용)
-    await init_sync_state(db_path)
-
-    # snapshot 테이블(지난랭킹 고정 저장)
-    await init_weekly_snapshot_tables(db_path)
+    # 전체 스키마(pubg_user/sync_state/스냅샷/...)는 migrations.py가 user_version 기준으로 한 번에 적용
+    await ensure_schema(db_path)
 
 
 async def set_pubg_nickname(db_path: str, discord_id: int, nickname: str) -> None:
@@ -54,7 +35,8 @@ async def set_pubg_nickname(db_path: str, discord_id: int, nickname: str) -> Non
         raise ValueError("nickname is empty")
 
     now = int(time.time())
-    async with open_db(db_path) as db:
+
+    async def _write(db: aiosqlite.Connection) -> None:
         await db.execute(
             """
             INSERT INTO pubg_user (discord_id, pubg_nickname, updated_at)
@@ -65,11 +47,12 @@ async def set_pubg_nickname(db_path: str, discord_id: int, nickname: str) -> Non
             """,
             (int(discord_id), nick, int(now)),
         )
-        await db.commit()
+
+    await run_write(db_path, _write)
 
 
 async def get_pubg_nickname(db_path: str, discord_id: int) -> Optional[str]:
-    async with open_db(db_path) as db:
+    async with open_db(db_path, readonly=True) as db:
         row = await _fetchone(
             db,
             "SELECT pubg_nickname FROM pubg_user WHERE discord_id=?",
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from shaded.utils.time_window import _parse_z, week_window_utc
+
+# 주간 킬 롤업: (주 시작, 계정, scope)별 kills/matches 합계를 미리 들고 있는 작은 테이블(DDL은 migrations.py v4).
+# - sync(_flush_pending)가 매치를 새로 넣을 때 같은 트랜잭션에서 += (sqlite3 동기 연결용 함수들)
+# - 캐주얼/커스텀 매치는 집계하지 않음(fetch_weekly_leaderboard 조건과 같음)
+# - scope: normal|ranked|total (total = normal + ranked, 읽기를 인덱스 top-N 한 번으로 끝내려고 따로 저장)
+# - 롤업이 matches와 맞는 상태일 때만 sync_state(weekly_rollup_ready)가 있음 → 봇은 그때만 롤업을 읽음
+
+STATE_KEY_ROLLUP_READY = "weekly_rollup_ready"
+
+_UPSERT_SQL = """
+INSERT INTO weekly_player_kills (week_start_utc, platform, scope, account_id, kills, matches)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(week_start_utc, platform, scope, account_id) DO UPDATE SET
+  kills   = kills + excluded.kills,
+  matches = matches + excluded.matches
+"""
+
+
+def week_start_for(created_at_utc: str) -> str:
+    """매치 시각(UTC Z) → 그 매치가 속한 주(수 09:00 KST) 시작 UTC Z"""
+    return week_window_utc(_parse_z(created_at_utc)).start_utc_z
+
+
+def is_canonical_week(start_utc_z: str, end_utc_z: str) -> bool:
+    """[start, end)가 정확히 한 주(수 09:00 KST 경계)인지 — 롤업으로 답할 수 있는 구간"""
+    try:
+        w = week_window_utc(_parse_z(start_utc_z))
+    except ValueError:
+        return False
+    return w.start_utc_z == start_utc_z and w.end_utc_z == end_utc_z
+
+
+def _scopes(is_ranked: int) -> Tuple[str, str]:
+    return ("ranked" if is_ranked else "normal"), "total"
+
+
+def apply_match(
+    con,
+    platform: str,
+    created_at_utc: str,
+    is_ranked: int,
+    is_custom_match: int,
+    is_casual: int,
+    rows: Iterable[Tuple[str, str, int]],
+) -> None:
+    """새로 저장된 매치 1개를 롤업에 더함(호출자 트랜잭션 안에서). rows: (account_id, name, kills)"""
+    if is_custom_match or is_casual:
+        return
+    week = week_start_for(created_at_utc)
+    params = [
+        (week, platform, scope, account_id, int(kills or 0), 1)
+        for (account_id, _nm, kills) in rows
+        for scope in _scopes(is_ranked)
+    ]
+    if params:
+        con.executemany(_UPSERT_SQL, params)
+
+
+# 롤업 재계산 원본: SQL_WEEKLY와 같은 경로(idx_matches_weekly → idx_player_matches_match_kills)
+REBUILD_SQL = """
+SELECT m.created_at_utc, m.is_ranked, pm.account_id, pm.kills
+  FROM matches m
+ CROSS JOIN player_matches pm
+    ON pm.match_id = m.match_id AND pm.platform = m.platform
+ WHERE m.platform = ?
+   AND m.created_at_utc >= ?
+   AND m.is_casual = 0
+   AND m.is_custom_match = 0
+"""
+
+
+def delete_before(con, platform: str, keep_from_utc: str) -> None:
+    con.execute(
+        "DELETE FROM weekly_player_kills WHERE platform=? AND week_start_utc < ?",
+        (platform, keep_from_utc),
+    )
+
+
+def rebuild(con, platform: str, since_utc: Optional[str] = None) -> int:
+    """
+    matches/player_matches로 롤업을 다시 계산(since_utc 이후 주만, None이면 전체). 호출자 트랜잭션 안에서.
+    return: 다시 쓴 row 수
+    """
+    since_week = week_start_for(since_utc) if since_utc else ""
+    rows = con.execute(REBUILD_SQL, (platform, since_week)).fetchall()
+
+    agg: Dict[Tuple[str, str, str], List[int]] = {}
+    week_cache: Dict[str, str] = {}
+    for created_at_utc, is_ranked, account_id, kills in rows:
+        # 주 경계(수 09:00 KST = 00:00 UTC)가 정시라 'YYYY-MM-DDTHH' 단위로 캐시해도 같음
+        key = created_at_utc[:13]
+        week = week_cache.get(key)
+        if week is None:
+            week = week_cache[key] = week_start_for(created_at_utc)
+        for scope in _scopes(int(is_ranked or 0)):
+            acc = agg.setdefault((week, scope, account_id), [0, 0])
+            acc[0] += int(kills or 0)
+            acc[1] += 1
+
+    con.execute(
+        "DELETE FROM weekly_player_kills WHERE platform=? AND week_start_utc >= ?",
+        (platform, since_week),
+    )
+    con.executemany(
+        """
+        INSERT INTO weekly_player_kills (week_start_utc, platform, scope, account_id, kills, matches)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        [(week, platform, scope, aid, k, n) for (week, scope, aid), (k, n) in agg.items()],
+    )
+    return len(agg)
+
+
+def is_ready(con) -> bool:
+    row = con.execute("SELECT 1 FROM sync_state WHERE key=?", (STATE_KEY_ROLLUP_READY,)).fetchone()
+    return row is not None
+
+
+def mark_ready(con) -> None:
+    con.execute(
+        """
+        INSERT INTO sync_state (key, value, updated_at)
+        VALUES (?, '1', ?)
+        ON CONFLICT(key) DO UPDATE SET value=excluded.value, updated_at=excluded.updated_at
+        """,
+        (STATE_KEY_ROLLUP_READY, int(time.time())),
+    )
@@ -0,0 +1,174 @@
+"""Match payload parse benchmark: 전체 디코딩(기존) vs 선택 파싱(match_parse.parse_match_payload).
+
+Usage (from project root):
+  python -m tools.bench_match_parse                      # db/match_cache.db의 캐시된 매치
+  python -m tools.bench_match_parse --limit 200 --members 4
+  python -m tools.bench_match_parse --synthetic 50       # 캐시가 비었을 때: PUBG 형태의 가짜 payload
+
+- clan_ids: 각 매치 참가자 중 --members명(측정 밖에서 미리 뽑음) + 매치에 없는 id 40개(클랜 규모 흉내)
+- 매치당 CPU 시간(평균)과 tracemalloc peak(평균)를 출력
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sqlite3
+import sys
+import time
+import tracemalloc
+import zlib
+from pathlib import Path
+from typing import Callable, List, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from shaded.services.match_parse import JSON_BACKEND, extract_participant_kills, parse_match_payload
+
+
+def _load_cached(path: str, limit: int) -> List[bytes]:
+    if not Path(path).exists():
+        return []
+    con = sqlite3.connect(path)
+    try:
+        rows = con.execute(
+            "SELECT body FROM match_payload ORDER BY last_access DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+    finally:
+        con.close()
+    return [zlib.decompress(r[0]) for r in rows]
+
+
+def _synthetic(n: int, seed: int = 7) -> List[bytes]:
+    rnd = random.Random(seed)
+    out: List[bytes] = []
+    for m in range(n):
+        included = []
+        for i in range(96):
+            included.append({
+                "type": "participant",
+                "id": f"p-{m}-{i}",
+                "attributes": {
+                    "actor": "",
+                    "shardId": "steam",
+                    "stats": {
+                        "DBNOs": rnd.randint(0, 5), "assists": rnd.randint(0, 3), "boosts": rnd.randint(0, 6),
+                        "damageDealt": rnd.random() * 800, "deathType": "byplayer", "headshotKills": rnd.randint(0, 3),
+                        "heals": rnd.randint(0, 8), "killPlace": i + 1, "killStreaks": rnd.randint(0, 2),
+                        "kills": rnd.randint(0, 9), "longestKill": rnd.random() * 300, "name": f"Player_{m}_{i}",
+                        "playerId": f"account.{m:04d}{i:028d}", "revives": 0, "rideDistance": rnd.random() * 5000,
+                        "roadKills": 0, "swimDistance": 0, "teamKills": 0, "timeSurvived": rnd.random() * 1800,
+                        "vehicleDestroys": 0, "walkDistance": rnd.random() * 4000, "weaponsAcquired": rnd.randint(0, 9),
+                        "winPlace": rnd.randint(1, 25),
+                    },
+                },
+            })
+        for r in range(25):
+            included.append({
+                "type": "roster",
+                "id": f"r-{m}-{r}",
+                "attributes": {"shardId": "steam", "stats": {"rank": r + 1, "teamId": r + 1}, "won": "false"},
+                "relationships": {
+                    "participants": {"data": [{"type": "participant", "id": f"p-{m}-{r * 4 + k}"} for k in range(4)]},
+                    "team": {"data": None},
+                },
+            })
+        included.append({
+            "type": "asset",
+            "id": f"a-{m}",
+            "attributes": {"URL": "https://telemetry-cdn.pubg.com/x.json", "createdAt": "2026-10-12T10:30:00Z",
+                           "description": "", "name": "telemetry"},
+        })
+        doc = {
+            "data": {
+                "type": "match",
+                "id": f"m-{m}",
+                "attributes": {
+                    "createdAt": "2026-10-12T10:00:00Z", "duration": 1800, "gameMode": "squad-fpp",
+                    "isCustomMatch": False, "mapName": "Baltic_Main", "matchType": "official",
+                    "seasonState": "progress", "shardId": "steam", "stats": None, "tags": None, "titleId": "bluehole-pubg",
+                },
+                "relationships": {"assets": {"data": [{"type": "asset", "id": f"a-{m}"}]},
+                                  "rosters": {"data": [{"type": "roster", "id": f"r-{m}-{r}"} for r in range(25)]}},
+            },
+            "included": included,
+            "links": {"self": f"https://api.pubg.com/shards/steam/matches/m-{m}"},
+            "meta": {},
+        }
+        out.append(json.dumps(doc, separators=(",", ":")).encode("utf-8"))
+    return out
+
+
+def _pick_clan_ids(raw: bytes, members: int, rnd: random.Random) -> Set[str]:
+    mj = json.loads(raw)
+    pids = [
+        ((o.get("attributes") or {}).get("stats") or {}).get("playerId")
+        for o in mj.get("included") or []
+        if o.get("type") == "participant"
+    ]
+    pids = [p for p in pids if p]
+    picked = set(rnd.sample(pids, min(members, len(pids))))
+    picked.update(f"account.{rnd.getrandbits(128):032x}" for _ in range(40))
+    return picked
+
+
+def _full(raw: bytes, clan_ids: Set[str]):
+    mj = json.loads(raw)
+    attrs = (mj.get("data") or {}).get("attributes") or {}
+    return attrs, extract_participant_kills(mj, clan_ids)
+
+
+def _measure(fn: Callable, cases: List[Tuple[bytes, Set[str]]]) -> Tuple[float, float, list]:
+    results = []
+    t0 = time.process_time()
+    for raw, ids in cases:
+        results.append(fn(raw, ids))
+    cpu = (time.process_time() - t0) / len(cases)
+
+    peaks = 0
+    for raw, ids in cases:
+        tracemalloc.start()
+        fn(raw, ids)
+        peaks += tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return cpu, peaks / len(cases), results
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="tools.bench_match_parse")
+    ap.add_argument("--cache", default="db/match_cache.db", help="MatchPayloadCache sqlite path")
+    ap.add_argument("--limit", type=int, default=200, help="max cached matches to load (default: 200)")
+    ap.add_argument("--members", type=int, default=4, help="clan members per match (default: 4)")
+    ap.add_argument("--synthetic", type=int, default=0, help="use N synthetic payloads instead of the cache")
+    args = ap.parse_args(argv)
+
+    payloads = _synthetic(args.synthetic) if args.synthetic > 0 else _load_cached(args.cache, args.limit)
+    if not payloads:
+        print(f"no payloads (cache={args.cache}). try --synthetic 50")
+        return 1
+
+    rnd = random.Random(1)
+    cases = [(raw, _pick_clan_ids(raw, args.members, rnd)) for raw in payloads]
+
+    full_cpu, full_peak, full_res = _measure(_full, cases)
+    sel_cpu, sel_peak, sel_res = _measure(parse_match_payload, cases)
+
+    mismatched = sum(
+        1 for (fa, fr), (sa, sr) in zip(full_res, sel_res)
+        if sorted(fr) != sorted(sr) or fa.get("createdAt") != sa.get("createdAt") or fa.get("gameMode") != sa.get("gameMode")
+    )
+
+    avg_kb = sum(len(r) for r in payloads) / len(payloads) / 1024
+    print(f"matches={len(payloads)} avg_payload={avg_kb:.0f}KB members/match={args.members} backend={JSON_BACKEND}")
+    print(f"full json.loads : {full_cpu * 1000:8.3f} ms/match  peak={full_peak / 1024:9.1f} KB")
+    print(f"selective parse : {sel_cpu * 1000:8.3f} ms/match  peak={sel_peak / 1024:9.1f} KB")
+    if sel_cpu > 0 and sel_peak > 0:
+        print(f"speedup         : x{full_cpu / sel_cpu:.1f} cpu, x{full_peak / sel_peak:.1f} peak memory")
+    print(f"result mismatches: {mismatched}")
+    return 0 if mismatched == 0 else 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,115 @@
+"""Rate limiter benchmark: fixed-interval(기존) vs header-adaptive token bucket.
+
+Usage (from project root):
+  python -m tools.bench_rate_limiter
+  python -m tools.bench_rate_limiter --batches 10 --time-scale 0.02
+
+- 가짜 PUBG 서버: 60초 고정 윈도에 limit(기본 10)회, 응답마다 X-RateLimit-* 헤더
+- 시나리오: sync 멤버 조회처럼 /players 10명 배치를 순서대로 N번 호출
+- time-scale로 시간 축을 줄여서 실행(0.02 → 60초 윈도가 1.2초). 결과는 실제 초로 환산해 출력
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Dict
+
+from shaded.services.pubg_api import _AsyncRateLimiter
+
+
+class _FixedIntervalLimiter:
+    """기존 _AsyncRateLimiter: 요청 시작 간격을 60/rpm초로 고정"""
+    def __init__(self, rpm: float):
+        self._interval = 60.0 / float(rpm)
+        self._lock = asyncio.Lock()
+        self._next_ts = 0.0
+
+    async def wait(self) -> None:
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            if now < self._next_ts:
+                delay = self._next_ts - now
+                self._next_ts += self._interval
+            else:
+                delay = 0.0
+                self._next_ts = now + self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class _FakeServer:
+    def __init__(self, limit: int, window_sec: float, latency_sec: float):
+        self.limit = limit
+        self.window_sec = window_sec
+        self.latency_sec = latency_sec
+        self.window_end = 0.0
+        self.used = 0
+        self.rejected = 0
+
+    async def call(self) -> Dict[str, str]:
+        await asyncio.sleep(self.latency_sec)
+        now = time.time()
+        if now >= self.window_end:
+            self.window_end = now + self.window_sec
+            self.used = 0
+        if self.used >= self.limit:
+            self.rejected += 1
+            ok = False
+        else:
+            self.used += 1
+            ok = True
+        return {
+            "status": "200" if ok else "429",
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.limit - self.used),
+            "X-RateLimit-Reset": str(self.window_end),
+        }
+
+
+async def _run(limiter, batches: int, limit: int, scale: float, latency: float) -> tuple[float, int]:
+    server = _FakeServer(limit, 60.0 * scale, latency * scale)
+    observe = getattr(limiter, "observe", None)
+    t0 = time.time()
+    done = 0
+    while done < batches:
+        await limiter.wait()
+        headers = await server.call()
+        if observe is not None:
+            observe(headers)
+        if headers["status"] == "200":
+            done += 1
+    return (time.time() - t0) / scale, server.rejected
+
+
+async def main_async(args) -> None:
+    scale = float(args.time_scale)
+
+    old = _FixedIntervalLimiter(args.rpm / scale)
+    new = _AsyncRateLimiter(args.rpm, window_sec=60.0 * scale)
+
+    old_sec, old_429 = await _run(old, args.batches, args.rpm, scale, args.latency)
+    new_sec, new_429 = await _run(new, args.batches, args.rpm, scale, args.latency)
+
+    print(f"scenario: {args.batches} x /players(10 ids) sequential, limit={args.rpm}/60s, latency={args.latency:.2f}s")
+    print(f"fixed-interval : {old_sec:7.2f}s  (429={old_429})")
+    print(f"token-bucket   : {new_sec:7.2f}s  (429={new_429})")
+    if new_sec > 0:
+        print(f"speedup        : x{old_sec / new_sec:.1f}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="tools.bench_rate_limiter")
+    ap.add_argument("--batches", type=int, default=10, help="number of 10-player /players calls (default: 10)")
+    ap.add_argument("--rpm", type=int, default=10, help="key limit per minute (default: 10)")
+    ap.add_argument("--latency", type=float, default=0.3, help="simulated response time in seconds (default: 0.3)")
+    ap.add_argument("--time-scale", type=float, default=0.02, help="time compression factor (default: 0.02)")
+    args = ap.parse_args(argv)
+    asyncio.run(main_async(args))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,178 @@
+"""핫 쿼리 EXPLAIN QUERY PLAN 회귀 체크.
+
+Usage (from project root):
+  python -m tools.check_query_plans              # 메모리 DB에 migrations 적용 후 확인
+  python -m tools.check_query_plans --db db/shaded.db   # 실제 DB(통계 포함)로 확인(읽기 전용)
+  python -m tools.check_query_plans -v           # 통과한 쿼리의 계획도 출력
+
+- 쿼리는 각 모듈의 실제 SQL을 가져다 씀(복사본 아님)
+- 기대: 지정한 인덱스를 타고, 테이블 전체 SCAN이 없음. 하나라도 어긋나면 exit 1
+- 대체돼서 지운 인덱스(DROPPED_INDEXES)가 남아 있어도 실패(쓰기 비용만 늘림)
+- 인덱스/쿼리를 바꿨으면 여기 기대값도 같이 고칠 것
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Tuple, Union
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from shaded.services import migrations, weekly_rollup
+from shaded.services.leaderboard_store import (
+    SQL_COUNT_WEEK_MATCHES,
+    SQL_MEMBER_LAST_PLAYED,
+    SQL_SNAPSHOT_ROWS,
+    SQL_WEEKLY_ROLLUP,
+    build_weekly_sql,
+)
+
+Params = Union[Tuple[Any, ...], Dict[str, Any]]
+
+WEEK = {"start_utc": "2026-10-14T00:00:00Z", "end_utc": "2026-10-21T00:00:00Z"}
+BOARD = {"clan_id": "shaded_steam", "platform": "steam", "limit": 10, **WEEK}
+
+
+class PlanCheck(NamedTuple):
+    name: str
+    sql: str
+    params: Params
+    expect: Tuple[str, ...]            # 계획에 반드시 있어야 하는 문자열
+    forbid: Tuple[str, ...] = ("SCAN ",)
+
+
+CHECKS: List[PlanCheck] = [
+    *[
+        PlanCheck(
+            f"weekly leaderboard ({scope})",
+            build_weekly_sql(scope),
+            BOARD,
+            (
+                "SEARCH m USING COVERING INDEX idx_matches_weekly (platform=? AND created_at_utc>? AND created_at_utc<?)",
+                "SEARCH pm USING COVERING INDEX idx_player_matches_match_kills (match_id=? AND platform=?)",
+                "SEARCH cm USING INDEX sqlite_autoindex_clan_members_1",
+            ),
+        )
+        for scope in ("total", "normal", "ranked")
+    ],
+    PlanCheck(
+        "sync snapshot top10 (6 modes)",
+        build_weekly_sql("total", official_modes_only=True),
+        BOARD,
+        (
+            "SEARCH m USING INDEX idx_matches_weekly (platform=? AND created_at_utc>? AND created_at_utc<?)",
+            "SEARCH pm USING COVERING INDEX idx_player_matches_match_kills",
+        ),
+    ),
+    PlanCheck(
+        "weekly leaderboard (rollup)",
+        SQL_WEEKLY_ROLLUP,
+        {"clan_id": "shaded_steam", "platform": "steam", "scope": "total", "limit": 10, "start_utc": WEEK["start_utc"]},
+        ("SEARCH w USING", "(week_start_utc=? AND platform=? AND scope=?)"),
+    ),
+    PlanCheck(
+        "status week match count",
+        SQL_COUNT_WEEK_MATCHES,
+        ("steam", WEEK["start_utc"], WEEK["end_utc"]),
+        ("SEARCH matches USING COVERING INDEX idx_matches_weekly",),
+    ),
+    PlanCheck(
+        "rollup rebuild source",
+        weekly_rollup.REBUILD_SQL,
+        ("steam", WEEK["start_utc"]),
+        (
+            "SEARCH m USING COVERING INDEX idx_matches_weekly (platform=? AND created_at_utc>?)",
+            "SEARCH pm USING COVERING INDEX idx_player_matches_match_kills",
+        ),
+    ),
+    PlanCheck(
+        "sync member last played",
+        SQL_MEMBER_LAST_PLAYED,
+        ("steam",),
+        (
+            "SEARCH pm USING COVERING INDEX idx_player_matches_account (platform=?)",
+            "SEARCH m USING INDEX sqlite_autoindex_matches_1 (match_id=?)",
+        ),
+    ),
+    PlanCheck(
+        "snapshot rows",
+        SQL_SNAPSHOT_ROWS,
+        {"clan_id": "shaded_steam", "platform": "steam", "week_start_utc": WEEK["start_utc"], "scope": "total", "limit": 10},
+        ("SEARCH weekly_snapshot_rows USING",),
+    ),
+]
+
+
+# migrations v5에서 지운 인덱스(다른 인덱스가 대체)
+DROPPED_INDEXES: Tuple[str, ...] = (
+    "idx_matches_time",
+    "idx_matches_time_flags",
+    "idx_player_matches_player",
+)
+
+
+def explain(con: sqlite3.Connection, sql: str, params: Params) -> List[str]:
+    return [str(r[3]) for r in con.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()]
+
+
+def run_checks(con: sqlite3.Connection, verbose: bool = False) -> int:
+    failed = 0
+    for c in CHECKS:
+        plan = explain(con, c.sql, c.params)
+        text = "\n".join(plan)
+        missing = [e for e in c.expect if e not in text]
+        bad = [line for line in plan for f in c.forbid if line.startswith(f)]
+        ok = not missing and not bad
+        failed += 0 if ok else 1
+        print(f"[{'OK' if ok else 'FAIL'}] {c.name}")
+        if not ok or verbose:
+            for line in plan:
+                print(f"       {line}")
+        for e in missing:
+            print(f"       expected: {e}")
+        for line in bad:
+            print(f"       unexpected: {line}")
+
+    present = {
+        r[0]
+        for r in con.execute("SELECT name FROM sqlite_master WHERE type='index'").fetchall()
+    }
+    for name in DROPPED_INDEXES:
+        ok = name not in present
+        failed += 0 if ok else 1
+        print(f"[{'OK' if ok else 'FAIL'}] index {name} dropped")
+    return failed
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="tools.check_query_plans")
+    ap.add_argument("--db", default=None, help="check against an existing DB (read-only) instead of a fresh schema")
+    ap.add_argument("-v", "--verbose", action="store_true", help="print plans for passing queries too")
+    args = ap.parse_args(argv)
+
+    if args.db:
+        if not Path(args.db).exists():
+            raise SystemExit(f"DB not found: {args.db}")
+        con = sqlite3.connect(f"file:{Path(args.db).as_posix()}?mode=ro", uri=True)
+        version = migrations.schema_version(con)
+        if version < migrations.LATEST_VERSION:
+            print(f"[WARN] user_version={version} < {migrations.LATEST_VERSION}: migrations not applied yet")
+    else:
+        con = sqlite3.connect(":memory:")
+        migrations.migrate_sync(con)
+
+    try:
+        failed = run_checks(con, args.verbose)
+    finally:
+        con.close()
+
+    total = len(CHECKS) + len(DROPPED_INDEXES)
+    print(f"{total - failed}/{total} checks as expected")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,6 @@
 import os
 import sys
+import json
 import sqlite3
 from pathlib import Path
 from typing import Any, Dict, Optional, Tuple, List
@@ -8,7 +9,12 @@ from dotenv import load_dotenv
 
 load_dotenv()  # 프로젝트 루트의 .env 자동 로드
 
+# python tools/ingest_one_player.py 로 실행해도 shaded 패키지를 찾도록
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
 from print_week_window import week_window_utc, last_week_window_utc
+from shaded.services.match_cache import MatchPayloadCache
+from shaded.services import migrations, weekly_rollup
 
 DB_PATH = Path("db/shaded.db")
 CLAN_ID = "shaded_steam"
@@ -16,11 +22,19 @@ CLAN_ID = "shaded_steam"
 SHARD = "steam"  # PUBG API shard
 BASE = f"https://api.pubg.com/shards/{SHARD}"
 
+# /matches 응답 캐시(sync_weekly_kills와 같은 파일 공유). 비우면 캐시 안 씀
+MATCH_CACHE_PATH = (os.getenv("PUBG_MATCH_CACHE_PATH", "db/match_cache.db") or "").strip()
+MATCH_CACHE_MAX_BYTES = int(float(os.getenv("PUBG_MATCH_CACHE_MAX_MB", "256")) * 1024 * 1024)
+
 # 집계 대상 6모드(솔/듀/스쿼드 + FPP 3개)
 ALLOWED_MODES = {"solo", "duo", "squad", "solo-fpp", "duo-fpp", "squad-fpp"}
 
 
 def api_get(path: str) -> Dict[str, Any]:
+    return json.loads(api_get_raw(path))
+
+
+def api_get_raw(path: str) -> bytes:
     api_key = os.getenv("PUBG_API_KEY")
     if not api_key:
         raise SystemExit("PUBG_API_KEY 환경변수가 비어있음 (PowerShell에서 $env:PUBG_API_KEY=... 먼저)")
@@ -34,7 +48,18 @@ def api_get(path: str) -> Dict[str, Any]:
     r = requests.get(url, headers=headers, timeout=20)
     if r.status_code != 200:
         raise SystemExit(f"HTTP {r.status_code} {url}\n{r.text[:800]}")
-    return r.json()
+    return r.content
+
+
+def get_match(mid: str, cache: Optional[MatchPayloadCache]) -> Dict[str, Any]:
+    if cache is not None:
+        hit = cache.get(mid)
+        if hit is not None:
+            return json.loads(hit)
+    raw = api_get_raw(f"/matches/{mid}")
+    if cache is not None:
+        cache.put(mid, raw)
+    return json.loads(raw)
 
 
 def upsert_member(con: sqlite3.Connection, account_id: str, player_name: str) -> None:
@@ -201,6 +226,7 @@ def main() -> None:
     con = sqlite3.connect(DB_PATH)
     con.execute("PRAGMA journal_mode=WAL;")
     con.execute("PRAGMA foreign_keys=ON;")
+    migrations.migrate_sync(con)
 
     # 1) 플레이어 계정ID + 최근 매치ID 리스트
     account_id, player_name, match_ids = find_player(target_name)
@@ -211,9 +237,10 @@ def main() -> None:
     # 3) 매치 적재 (최근 14일 내 match refs가 올 수 있음)
     inserted = 0
     skipped = 0
+    cache = MatchPayloadCache(MATCH_CACHE_PATH, MATCH_CACHE_MAX_BYTES) if MATCH_CACHE_PATH else None
 
     for mid in match_ids:
-        mj = api_get(f"/matches/{mid}")
+        mj = get_match(mid, cache)
         attrs = (mj.get("data") or {}).get("attributes") or {}
 
         created_at_utc = attrs.get("createdAt")
@@ -262,12 +289,20 @@ def main() -> None:
     # 4) 오래된 매치 정리(지난주 시작 이전 삭제)
     purge_before(con, last_s)
 
+    # 5) 주간 킬 롤업도 matches 기준으로 다시 맞춤(sync 경로를 안 거쳤으므로)
+    weekly_rollup.delete_before(con, SHARD, last_s)
+    weekly_rollup.rebuild(con, SHARD, last_s)
+
     con.commit()
     con.close()
 
     print(f"player = {player_name} ({account_id})")
     print(f"window = {last_s} ~ {this_e} (UTC)")
     print(f"inserted = {inserted}, skipped = {skipped}")
+    if cache is not None:
+        cs = cache.stats()
+        cache.close()
+        print(f"match cache: hits={cs['hits']} misses={cs['misses']} entries={cs['entries']} bytes={cs['bytes']}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+"""weekly_player_kills(주간 킬 롤업) 점검/수리.
+
+Usage (from project root):
+  python -m tools.rebuild_weekly_rollup --check          # 롤업 vs matches 원본 집계 비교만
+  python -m tools.rebuild_weekly_rollup                  # 전체 다시 계산 + ready 표시
+  python -m tools.rebuild_weekly_rollup --since 2026-10-07T00:00:00Z
+
+- 롤업은 sync가 매치를 새로 넣을 때 같이 갱신됨. 수동으로 matches/player_matches를 고쳤거나
+  --check에서 차이가 나오면 이걸로 다시 계산
+- 다시 계산하는 동안 sync와 겹치지 않게 BEGIN IMMEDIATE 트랜잭션 하나로 처리
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from shaded.services import migrations, weekly_rollup
+from shaded.services.sqlite_conn import open_db_sync
+
+DB_PATH = Path(os.getenv("DB_PATH", "db/shaded.db"))
+SHARD = os.getenv("PUBG_SHARD", "steam").strip() or "steam"
+
+
+def _rollup_totals(con) -> Dict[Tuple[str, str, str], Tuple[int, int]]:
+    rows = con.execute(
+        "SELECT week_start_utc, scope, account_id, kills, matches FROM weekly_player_kills WHERE platform=?",
+        (SHARD,),
+    ).fetchall()
+    return {(r[0], r[1], r[2]): (int(r[3]), int(r[4])) for r in rows}
+
+
+def check(con) -> int:
+    """롤업을 임시로 다시 계산해서(롤백) 지금 값과 비교. return: 다른 row 수"""
+    current = _rollup_totals(con)
+    con.execute("SAVEPOINT rollup_check;")
+    try:
+        weekly_rollup.rebuild(con, SHARD)
+        expected = _rollup_totals(con)
+    finally:
+        con.execute("ROLLBACK TO rollup_check;")
+        con.execute("RELEASE rollup_check;")
+
+    diff = 0
+    for key in sorted(set(current) | set(expected)):
+        a = current.get(key, (0, 0))
+        b = expected.get(key, (0, 0))
+        if a != b:
+            diff += 1
+            if diff <= 20:
+                week, scope, aid = key
+                print(f"  {week} {scope:6s} {aid}: rollup kills/matches={a} expected={b}")
+    print(f"ready={weekly_rollup.is_ready(con)} rows={len(current)} expected_rows={len(expected)} diff={diff}")
+    return diff
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="tools.rebuild_weekly_rollup")
+    ap.add_argument("--check", action="store_true", help="compare only, do not write")
+    ap.add_argument("--since", default=None, help="rebuild weeks from this UTC Z time (default: all)")
+    args = ap.parse_args(argv)
+
+    if not DB_PATH.exists():
+        raise SystemExit(f"DB not found: {DB_PATH}")
+
+    con = open_db_sync(str(DB_PATH))
+    try:
+        migrations.migrate_sync(con)
+
+        if args.check:
+            return 1 if check(con) else 0
+
+        con.execute("BEGIN IMMEDIATE;")
+        try:
+            n = weekly_rollup.rebuild(con, SHARD, args.since)
+            weekly_rollup.mark_ready(con)
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+        print(f"[OK] rebuilt weekly_player_kills rows={n} since={args.since or 'all'}")
+        return 0
+    finally:
+        con.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,10 +1,14 @@
 import os
 import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import queue
 import socket
 import sys
+import threading
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Set, Tuple
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
 from datetime import datetime, timezone
 
 from dotenv import load_dotenv
@@ -12,10 +16,17 @@ import aiohttp
 
 load_dotenv(override=True)
 
+from shaded.config import pubg_keys_from_env
 from shaded.services.pubg_api import PubgApiClient, PubgApiError
+from shaded.services.match_cache import MatchPayloadCache
+from shaded.services.match_parse import parse_match_payload
+from shaded.services.rate_budget import PRIORITY_BACKGROUND, shared_limiter
 from shaded.utils.time_window import last_week_window_utc
 from shaded.services.clan_store import CLAN_ID_ALIAS
+from shaded.services.leaderboard_store import SQL_MEMBER_LAST_PLAYED, build_weekly_sql
 from shaded.services.sqlite_conn import open_db_sync
+from shaded.services import migrations, weekly_rollup
+from shaded.services.sync_state import STATE_KEY_WEEKLY_SYNC_BAD_PLAYER_IDS, STATE_KEY_WEEKLY_SYNC_CLAN_IDS
 
 # sync_state는 프로젝트 버전에 따라 함수가 다를 수 있어서 안전하게 처리
 try:
@@ -29,7 +40,8 @@ except Exception:
 
 DB_PATH = Path(os.getenv("DB_PATH", "db/shaded.db"))
 SHARD = os.getenv("PUBG_SHARD", "steam").strip() or "steam"
-API_KEY = (os.getenv("PUBG_API_KEY", "") or "").strip().removeprefix("Bearer ").strip()
+# 키 풀(PUBG_API_KEYS 콤마 구분 + PUBG_API_KEY, 봇 Settings와 같은 파서). 키마다 리미터를 따로 쓰므로 멤버 조회가 키 수만큼 빨라짐
+API_KEYS = list(pubg_keys_from_env())
 
 # 집계 대상 6모드(솔/듀/스쿼드 + FPP 3개)
 ALLOWED_MODES = {"solo", "duo", "squad", "solo-fpp", "duo-fpp", "squad-fpp"}
@@ -39,6 +51,36 @@ BUSY_TIMEOUT_SEC = float(os.getenv("SQLITE_BUSY_TIMEOUT_SEC", "8"))
 JOB_LOCK_TTL_SEC = int(os.getenv("SYNC_JOB_LOCK_TTL_SEC", "1800"))
 JOB_NAME = "sync_weekly_kills"
 WRITE_BATCH_SIZE = int(os.getenv("SYNC_WRITE_BATCH_SIZE", "25"))
+# writer 스레드: 배치가 안 차도 이 시간이 지나면 커밋. 큐가 차면 fetch 쪽이 기다림(backpressure)
+WRITE_FLUSH_SEC = float(os.getenv("SYNC_WRITE_FLUSH_SEC", "2"))
+WRITE_QUEUE_MAX = max(1, int(os.getenv("SYNC_WRITE_QUEUE_MAX", "200")))
+
+# 처리한 매치(저장/스킵 모두) 기록 보관 기간. PUBG match ref는 14일치만 오므로 그보다 길게
+MATCH_LEDGER_TTL_SEC = int(float(os.getenv("SYNC_MATCH_LEDGER_TTL_DAYS", "30")) * 86400)
+
+# /matches 상세 조회 동시성(세마포어). in-flight 태스크 수도 이 값으로 묶여서 메모리가 일정함
+MATCH_FETCH_CONCURRENCY = max(1, int(os.getenv("SYNC_MATCH_FETCH_CONCURRENCY", "8")))
+
+# /matches 응답 캐시(zlib + SQLite, LRU). 경로를 비우면 캐시 안 씀
+MATCH_CACHE_PATH = (os.getenv("PUBG_MATCH_CACHE_PATH", "db/match_cache.db") or "").strip()
+MATCH_CACHE_MAX_BYTES = int(float(os.getenv("PUBG_MATCH_CACHE_MAX_MB", "256")) * 1024 * 1024)
+
+# 매치 파싱 프로세스 풀(0이면 이벤트 루프에서 직접 파싱). 새 매치가 PARSE_MIN_BATCH개 미만이면 풀 안 띄움
+PARSE_WORKERS = max(0, int(os.getenv("SYNC_PARSE_WORKERS", "0")))
+PARSE_MIN_BATCH = max(1, int(os.getenv("SYNC_PARSE_MIN_BATCH", "32")))
+
+# 같은 키를 쓰는 봇 명령어용 예약 토큰(봇의 PUBG_RATE_RESERVED_INTERACTIVE와 같게)
+RATE_RESERVED_INTERACTIVE = int(os.getenv("PUBG_RATE_RESERVED_INTERACTIVE", "2"))
+
+# 멤버 조회 스케줄: 최근 ACTIVE_DAYS 안에 플레이 → 매 주기, WARM_DAYS 안 → 1시간, 그 외 → 1일마다
+POLL_SCHEDULER = os.getenv("SYNC_POLL_SCHEDULER", "1").strip() not in ("0", "false", "no")
+POLL_ACTIVE_SEC = int(float(os.getenv("SYNC_POLL_ACTIVE_DAYS", "3")) * 86400)
+POLL_WARM_SEC = int(float(os.getenv("SYNC_POLL_WARM_DAYS", "30")) * 86400)
+POLL_WARM_INTERVAL_SEC = 60 * 60
+POLL_DORMANT_INTERVAL_SEC = 24 * 60 * 60
+
+# /players 404로 확인된 잘못된(삭제 등) account_id는 이 기간 동안 조회에서 뺌, 지나면 다시 확인
+BAD_PLAYER_TTL_SEC = int(float(os.getenv("SYNC_BAD_PLAYER_TTL_DAYS", "7")) * 86400)
 
 # 스냅샷: 지난주 Top10을 고정 저장
 SNAPSHOT_SCOPES = ("normal", "ranked", "total")
@@ -66,113 +108,141 @@ def _classify_match_flags(attrs: dict, game_mode: str | None) -> Tuple[int, int,
     return is_ranked, is_custom_match, is_casual
 
 
-def _extract_participant_kills(match_json: Dict[str, Any], clan_ids: Set[str]) -> List[Tuple[str, str, int]]:
+PendingMatch = Tuple[str, str, str, int, int, int, List[Tuple[str, str, int]]]
+
+
+def _parse_match(mid: str, raw: bytes, clan_ids: Set[str], keep_from_utc: str) -> Tuple[Optional[PendingMatch], str, str]:
     """
-    return [(account_id, player_name, kills), ...] for clan members only
+    매치 상세 원문 -> (_flush_pending용 튜플, 스킵 사유, createdAt)
+    - 저장 대상이면 (tuple, "", createdAt)
+    - 아니면 (None, "no_time" | "old" | "mode" | "no_clan", createdAt) — 스킵해도 시각은 워터마크용으로 돌려줌
+    - 매치 속성 + clan 멤버 stats만 디코딩(match_parse.parse_match_payload)
     """
-    out: List[Tuple[str, str, int]] = []
-    for obj in match_json.get("included") or []:
-        if obj.get("type") != "participant":
-            continue
-        stats = ((obj.get("attributes") or {}).get("stats") or {})
-        pid = stats.get("playerId")
-        if not pid or pid not in clan_ids:
-            continue
-        nm = (stats.get("name") or "").strip() or pid
-        k = stats.get("kills")
-        try:
-            kills = int(k) if k is not None else 0
-        except Exception:
-            kills = 0
-        out.append((pid, nm, kills))
-    return out
+    attrs, rows = parse_match_payload(raw, clan_ids)
+    created_at_utc = (attrs.get("createdAt") or "").strip()
+    game_mode = (attrs.get("gameMode") or "").strip().lower()
 
+    if not created_at_utc:
+        return None, "no_time", ""
 
-def _ensure_tables(con) -> None:
-    con.execute("PRAGMA foreign_keys=ON;")
-
-    con.execute("""
-    CREATE TABLE IF NOT EXISTS matches (
-      match_id        TEXT PRIMARY KEY,
-      platform        TEXT NOT NULL,
-      created_at_utc  TEXT NOT NULL,
-      game_mode       TEXT,
-      is_ranked       INTEGER NOT NULL DEFAULT 0,
-      inserted_at_utc TEXT NOT NULL DEFAULT (datetime('now')),
-      is_custom_match INTEGER NOT NULL DEFAULT 0,
-      is_casual       INTEGER NOT NULL DEFAULT 0
-    )
-    """)
-
-    con.execute("""
-    CREATE TABLE IF NOT EXISTS player_matches (
-      match_id        TEXT NOT NULL,
-      platform        TEXT NOT NULL,
-      account_id      TEXT NOT NULL,
-      kills           INTEGER NOT NULL DEFAULT 0,
-      inserted_at_utc TEXT NOT NULL DEFAULT (datetime('now')),
-      PRIMARY KEY (match_id, platform, account_id),
-      FOREIGN KEY (match_id) REFERENCES matches(match_id) ON DELETE CASCADE
-    )
-    """)
-
-    con.execute("""
-    CREATE INDEX IF NOT EXISTS idx_matches_time_flags
-    ON matches(created_at_utc, is_ranked, is_casual, is_custom_match)
-    """)
-
-    con.execute("""
-    CREATE INDEX IF NOT EXISTS idx_player_matches_player
-    ON player_matches(platform, account_id)
-    """)
-
-    con.execute("""
-    CREATE TABLE IF NOT EXISTS sync_state (
-      key TEXT PRIMARY KEY,
-      value TEXT NOT NULL,
-      updated_at INTEGER NOT NULL
-    )
-    """)
-
-    con.execute("""
-    CREATE TABLE IF NOT EXISTS job_lock (
-      job_name     TEXT PRIMARY KEY,
-      locked_until INTEGER NOT NULL,
-      locked_by    TEXT,
-      updated_at   INTEGER NOT NULL
-    )
-    """)
-
-    # 지난랭킹 스냅샷 테이블
-    con.execute("""
-    CREATE TABLE IF NOT EXISTS weekly_snapshot_meta (
-      clan_id        TEXT NOT NULL,
-      platform       TEXT NOT NULL,
-      week_start_utc TEXT NOT NULL,
-      week_end_utc   TEXT NOT NULL,
-      scope          TEXT NOT NULL,  -- normal|ranked|total
-      created_at_utc TEXT NOT NULL DEFAULT (datetime('now')),
-      PRIMARY KEY (clan_id, platform, week_start_utc, scope)
-    )
-    """)
-
-    con.execute("""
-    CREATE TABLE IF NOT EXISTS weekly_snapshot_rows (
-      clan_id        TEXT NOT NULL,
-      platform       TEXT NOT NULL,
-      week_start_utc TEXT NOT NULL,
-      scope          TEXT NOT NULL,
-      rank           INTEGER NOT NULL,
-      player_name    TEXT NOT NULL,
-      kills          INTEGER NOT NULL,
-      PRIMARY KEY (clan_id, platform, week_start_utc, scope, rank)
-    )
-    """)
+    if created_at_utc < keep_from_utc:
+        return None, "old", created_at_utc
+
+    if game_mode and game_mode not in ALLOWED_MODES:
+        return None, "mode", created_at_utc
+
+    is_ranked, is_custom_match, is_casual = _classify_match_flags(attrs, game_mode)
+    if not rows:
+        return None, "no_clan", created_at_utc
+
+    return (mid, created_at_utc, game_mode, is_ranked, is_custom_match, is_casual, rows), "", created_at_utc
+
+
+# ---- 프로세스 풀 워커 ----
+# clan_ids/keep_from은 initializer로 한 번만 넘기고, 매치마다 (mid, raw bytes)만 보냄
+_W_CLAN_IDS: Set[str] = set()
+_W_KEEP_FROM = ""
+
+
+def _parse_worker_init(clan_ids: Set[str], keep_from_utc: str) -> None:
+    global _W_CLAN_IDS, _W_KEEP_FROM
+    _W_CLAN_IDS = clan_ids
+    _W_KEEP_FROM = keep_from_utc
 
-    con.execute("""
-    CREATE INDEX IF NOT EXISTS idx_weekly_snapshot_rows_lookup
-    ON weekly_snapshot_rows (clan_id, platform, week_start_utc, scope)
-    """)
+
+def _parse_in_worker(mid: str, raw: bytes) -> Tuple[Optional[PendingMatch], str, str]:
+    return _parse_match(mid, raw, _W_CLAN_IDS, _W_KEEP_FROM)
+
+
+async def _iter_match_payloads(
+    client: PubgApiClient,
+    match_ids: List[str],
+    concurrency: int,
+) -> AsyncIterator[Tuple[str, Optional[bytes]]]:
+    """
+    /matches/{id}를 최대 concurrency개 동시에 조회해서 끝나는 순서대로 (match_id, 원문 bytes) 반환.
+    - 조회 실패는 payload=None (경고만 찍고 계속)
+    - 태스크는 슬라이딩 윈도(2 x concurrency)로만 만들기 때문에 매치 수와 무관하게 메모리 상한이 고정
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _one(mid: str) -> Tuple[str, Optional[bytes]]:
+        async with sem:
+            try:
+                return mid, await client.get_match_raw(mid)
+            except PubgApiError as e:
+                print(f"[WARN] match fetch failed: {mid} {e}", flush=True)
+                return mid, None
+
+    it = iter(match_ids)
+    window = max(1, concurrency) * 2
+    inflight = {asyncio.create_task(_one(mid)) for mid in itertools.islice(it, window)}
+    try:
+        while inflight:
+            done, inflight = await asyncio.wait(inflight, return_when=asyncio.FIRST_COMPLETED)
+            for mid in itertools.islice(it, len(done)):
+                inflight.add(asyncio.create_task(_one(mid)))
+            for t in done:
+                yield t.result()
+    finally:
+        for t in inflight:
+            t.cancel()
+
+
+async def _iter_parsed_matches(
+    client: PubgApiClient,
+    match_ids: List[str],
+    clan_ids: Set[str],
+    keep_from_utc: str,
+) -> AsyncIterator[Tuple[str, Optional[PendingMatch], str, str]]:
+    """
+    조회 + 파싱 → (match_id, PendingMatch | None, 스킵 사유, createdAt). 조회 실패는 사유 "fetch_failed"(시각 "").
+
+    - PARSE_WORKERS > 0 이고 매치가 PARSE_MIN_BATCH개 이상이면 ProcessPoolExecutor에서 파싱
+      → 이벤트 루프는 HTTP 읽기만 함. 파싱 대기 작업은 워커 x 2개까지만(넘으면 조회를 잠깐 멈춤)
+    - 아니면 받은 즉시 여기서 파싱
+    """
+    if PARSE_WORKERS <= 0 or len(match_ids) < PARSE_MIN_BATCH:
+        async for mid, raw in _iter_match_payloads(client, match_ids, MATCH_FETCH_CONCURRENCY):
+            if raw is None:
+                yield mid, None, "fetch_failed", ""
+            else:
+                item, reason, created_at_utc = _parse_match(mid, raw, clan_ids, keep_from_utc)
+                yield mid, item, reason, created_at_utc
+        return
+
+    loop = asyncio.get_running_loop()
+    max_pending = PARSE_WORKERS * 2
+    with ProcessPoolExecutor(
+        max_workers=PARSE_WORKERS,
+        initializer=_parse_worker_init,
+        initargs=(clan_ids, keep_from_utc),
+    ) as pool:
+        parsing: Dict[asyncio.Future, str] = {}
+
+        async def _drain(block_until: int) -> AsyncIterator[Tuple[str, Optional[PendingMatch], str, str]]:
+            while len(parsing) > block_until:
+                done, _ = await asyncio.wait(parsing, return_when=asyncio.FIRST_COMPLETED)
+                for f in done:
+                    mid = parsing.pop(f)
+                    item, reason, created_at_utc = f.result()
+                    yield mid, item, reason, created_at_utc
+
+        async for mid, raw in _iter_match_payloads(client, match_ids, MATCH_FETCH_CONCURRENCY):
+            if raw is None:
+                yield mid, None, "fetch_failed", ""
+                continue
+            parsing[loop.run_in_executor(pool, _parse_in_worker, mid, raw)] = mid
+            async for r in _drain(max_pending - 1):
+                yield r
+
+        async for r in _drain(0):
+            yield r
+
+
+def _ensure_tables(con) -> None:
+    # 스키마는 shaded/services/migrations.py(user_version 기준, 최신이면 pragma 1번)
+    migrations.migrate_sync(con)
 
 
 def _get_active_clan_members(con) -> List[Tuple[str, str]]:
@@ -184,7 +254,7 @@ def _get_active_clan_members(con) -> List[Tuple[str, str]]:
             ON p.platform = cm.platform AND p.account_id = cm.account_id
          WHERE cm.clan_id = ?
            AND cm.platform = ?
-           AND COALESCE(cm.is_active, 1) = 1
+           AND cm.is_active = 1
          ORDER BY COALESCE(cm.joined_at, 0) ASC, p.player_name ASC
         """,
         (CLAN_ID_ALIAS, SHARD),
@@ -193,17 +263,194 @@ def _get_active_clan_members(con) -> List[Tuple[str, str]]:
 
 
 def _existing_match_ids(con, match_ids: List[str]) -> Set[str]:
+    """matches에 있거나 match_ledger에 (만료 전) 기록된 매치 = 다시 받을 필요 없음"""
     if not match_ids:
         return set()
+    now = int(time.time())
     exist: Set[str] = set()
-    for batch in _chunked(match_ids, 900):
+    for batch in _chunked(match_ids, 450):
         ph = ",".join(["?"] * len(batch))
-        rows = con.execute(f"SELECT match_id FROM matches WHERE match_id IN ({ph})", batch).fetchall()
+        rows = con.execute(
+            f"""
+            SELECT match_id FROM matches WHERE match_id IN ({ph})
+            UNION
+            SELECT match_id FROM match_ledger WHERE match_id IN ({ph}) AND expires_at > ?
+            """,
+            [*batch, *batch, now],
+        ).fetchall()
         for r in rows:
             exist.add(r[0])
     return exist
 
 
+def _utc_z_to_epoch(utc_z: Optional[str]) -> int:
+    if not utc_z:
+        return 0
+    try:
+        return int(datetime.fromisoformat(utc_z.replace("Z", "+00:00")).timestamp())
+    except ValueError:
+        return 0
+
+
+def _poll_interval(last_played_at: int, now: int) -> int:
+    idle = now - last_played_at if last_played_at else None
+    if idle is not None and idle < POLL_ACTIVE_SEC:
+        return 0
+    if idle is not None and idle < POLL_WARM_SEC:
+        return POLL_WARM_INTERVAL_SEC
+    return POLL_DORMANT_INTERVAL_SEC
+
+
+def _plan_member_polls(con, ids: List[str]) -> Tuple[List[str], Dict[str, int], Dict[str, int]]:
+    """
+    이번 주기에 /players로 조회할 멤버, 통계, 멤버별 최근 플레이 시각(epoch, _update_poll_state에 넘김).
+
+    - next_poll_at이 지난 멤버(처음 보는 멤버 포함)만 조회
+    - 최근 플레이 순으로 정렬해서 10명 배치를 채움(활동 중인 멤버끼리 같은 배치)
+    - 마지막 배치에 빈 자리가 있으면 아직 차례가 아닌 멤버 중 최근 플레이 순으로 채움(추가 호출 없음)
+    - 최근 플레이: member_poll_state.last_played_at, 저장된 매치(player_matches), 워터마크 매치 시각 중 최신
+      (워터마크는 캐주얼 등 저장 안 한 매치도 포함)
+    """
+    now = int(time.time())
+    state = {
+        r[0]: (int(r[1] or 0), int(r[2] or 0))
+        for r in con.execute(
+            "SELECT account_id, last_played_at, next_poll_at FROM member_poll_state WHERE platform=?",
+            (SHARD,),
+        ).fetchall()
+    }
+    played = {
+        r[0]: _utc_z_to_epoch(r[1])
+        for r in con.execute(SQL_MEMBER_LAST_PLAYED, (SHARD,)).fetchall()
+    }
+    for aid, at in con.execute(
+        "SELECT account_id, last_match_at FROM player_match_watermark WHERE platform=? AND last_match_at IS NOT NULL",
+        (SHARD,),
+    ).fetchall():
+        played[aid] = max(played.get(aid, 0), _utc_z_to_epoch(at))
+
+    def _last_played(aid: str) -> int:
+        return max(state.get(aid, (0, 0))[0], played.get(aid, 0))
+
+    def _is_due(aid: str) -> bool:
+        st = state.get(aid)
+        if st is None:
+            return True
+        return st[1] <= now
+
+    order = sorted(ids, key=_last_played, reverse=True)
+    due = [aid for aid in order if _is_due(aid)]
+    if due and len(due) % 10:
+        spare = 10 - len(due) % 10
+        due += [aid for aid in order if not _is_due(aid)][:spare]
+
+    calls_all = (len(ids) + 9) // 10
+    calls = (len(due) + 9) // 10
+    active = sum(1 for aid in ids if _poll_interval(_last_played(aid), now) == 0)
+    return due, {
+        "members": len(ids),
+        "polled": len(due),
+        "active": active,
+        "calls": calls,
+        "calls_saved": calls_all - calls,
+    }, {aid: _last_played(aid) for aid in ids}
+
+
+def _update_poll_state(con, polled: List[str], last_played: Dict[str, int]) -> None:
+    """
+    조회한 멤버의 다음 조회 시각 갱신.
+    last_played: 멤버별 최근 플레이 시각(플래너 값 + 이번에 새 ref가 보인 시각), 저장된 값보다 작으면 무시
+    """
+    if not polled:
+        return
+    now = int(time.time())
+    prev = {
+        r[0]: int(r[1] or 0)
+        for r in con.execute(
+            "SELECT account_id, last_played_at FROM member_poll_state WHERE platform=?",
+            (SHARD,),
+        ).fetchall()
+    }
+    rows = []
+    for aid in polled:
+        played_at = max(prev.get(aid, 0), last_played.get(aid, 0))
+        rows.append((SHARD, aid, played_at, now, now + _poll_interval(played_at, now)))
+
+    con.execute("BEGIN IMMEDIATE;")
+    try:
+        con.executemany(
+            """
+            INSERT INTO member_poll_state (platform, account_id, last_played_at, last_polled_at, next_poll_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(platform, account_id) DO UPDATE SET
+              last_played_at=MAX(member_poll_state.last_played_at, excluded.last_played_at),
+              last_polled_at=excluded.last_polled_at,
+              next_poll_at=excluded.next_poll_at
+            """,
+            rows,
+        )
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+
+
+def _load_watermarks(con) -> Dict[str, Tuple[str, Optional[str]]]:
+    """account_id -> (last_match_id, last_match_at)"""
+    rows = con.execute(
+        "SELECT account_id, last_match_id, last_match_at FROM player_match_watermark WHERE platform=?",
+        (SHARD,),
+    ).fetchall()
+    return {r[0]: (r[1], r[2]) for r in rows}
+
+
+def _refs_since(refs: List[str], watermark: Optional[str]) -> List[str]:
+    """최신순 refs에서 watermark 이전(= 더 새로운) 것만. watermark가 목록에 없으면(14일 밖 등) 전체"""
+    if not watermark:
+        return refs
+    try:
+        return refs[:refs.index(watermark)]
+    except ValueError:
+        return refs
+
+
+def _advance_watermarks(con, heads: List[Tuple[str, str, Optional[str]]]) -> None:
+    """heads: (account_id, 최신 match_id, 그 매치 시각) — 시각을 모르면(이번에 안 받음) 저장된 매치에서"""
+    if not heads:
+        return
+    now = int(time.time())
+    con.execute("BEGIN IMMEDIATE;")
+    try:
+        con.executemany(
+            """
+            INSERT INTO player_match_watermark (platform, account_id, last_match_id, last_match_at, updated_at)
+            VALUES (?, ?, ?, COALESCE(?, (SELECT created_at_utc FROM matches WHERE match_id=?)), ?)
+            ON CONFLICT(platform, account_id) DO UPDATE SET
+              last_match_id=excluded.last_match_id,
+              last_match_at=COALESCE(excluded.last_match_at, player_match_watermark.last_match_at),
+              updated_at=excluded.updated_at
+            """,
+            [(SHARD, aid, mid, at, mid, now) for (aid, mid, at) in heads],
+        )
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+
+
+def _record_seen_matches(con, seen: List[Tuple[str, str]]) -> None:
+    if not seen:
+        return
+    now = int(time.time())
+    con.executemany(
+        """
+        INSERT OR REPLACE INTO match_ledger (match_id, platform, reason, seen_at, expires_at)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [(mid, SHARD, reason, now, now + MATCH_LEDGER_TTL_SEC) for (mid, reason) in seen],
+    )
+
+
 def _insert_match_and_kills(
     con,
     match_id: str,
@@ -214,7 +461,7 @@ def _insert_match_and_kills(
     is_casual: int,
     rows: List[Tuple[str, str, int]],
 ) -> None:
-    con.execute(
+    cur = con.execute(
         """
         INSERT OR IGNORE INTO matches (
           match_id, platform, created_at_utc, game_mode, is_ranked, is_custom_match, is_casual
@@ -222,6 +469,9 @@ def _insert_match_and_kills(
         """,
         (match_id, SHARD, created_at_utc, game_mode, is_ranked, is_custom_match, is_casual),
     )
+    # 롤업은 매치가 처음 들어올 때만 더함(같은 매치 재처리로 두 번 세지 않게)
+    if cur.rowcount == 1:
+        weekly_rollup.apply_match(con, SHARD, created_at_utc, is_ranked, is_custom_match, is_casual, rows)
 
     # 이름 최신화
     for account_id, player_name, _kills in rows:
@@ -298,8 +548,12 @@ def _release_job_lock(con, job_name: str, locked_by: str) -> None:
         con.rollback()
 
 
-def _flush_pending(con, pending: List[Tuple[str, str, str, int, int, int, List[Tuple[str, str, int]]]]) -> None:
-    if not pending:
+def _flush_pending(con, pending: List[PendingMatch], seen: List[Tuple[str, str]]) -> None:
+    """
+    pending: 저장할 매치
+    seen: 스킵한 매치 (match_id, reason) → match_ledger에만 기록
+    """
+    if not pending and not seen:
         return
     con.execute("BEGIN IMMEDIATE;")
     try:
@@ -314,6 +568,221 @@ def _flush_pending(con, pending: List[Tuple[str, str, str, int, int, int, List[T
                 is_casual=is_casual,
                 rows=rows,
             )
+        _record_seen_matches(con, [(p[0], "stored") for p in pending] + seen)
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+
+
+class _MatchWriter:
+    """
+    SQLite 쓰기 전용 스레드(자기 연결 사용). 이벤트 루프는 큐에 넣기만 함.
+
+    - 매치/스킵 기록을 모아서 WRITE_BATCH_SIZE개 또는 WRITE_FLUSH_SEC마다 _flush_pending 한 번(group commit)
+    - 큐(WRITE_QUEUE_MAX)가 가득 차면 put()이 기다림 → writer가 밀리면 조회도 같이 느려짐
+    - call(fn): 쌓인 것 먼저 커밋한 뒤 writer 스레드에서 fn(con) 실행(정리/스냅샷 등)
+    - writer에서 난 예외는 다음 put/call/close에서 그대로 올라옴(연결 실패 포함)
+    - writer 스레드가 죽었으면 put/call은 기다리지 않고 바로 실패
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._q: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=WRITE_QUEUE_MAX)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="sync-writer", daemon=True)
+        self.inserted = 0
+        self.commits = 0
+        self.stalls = 0  # 큐가 가득 차서 기다린 횟수
+
+    def start(self) -> "_MatchWriter":
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        con = None
+        pending: List[PendingMatch] = []
+        seen: List[Tuple[str, str]] = []
+        first_at = 0.0
+
+        def _flush() -> None:
+            nonlocal first_at
+            if pending or seen:
+                _flush_pending(con, pending, seen)
+                self.inserted += len(pending)
+                self.commits += 1
+                pending.clear()
+                seen.clear()
+            first_at = 0.0
+
+        try:
+            con = open_db_sync(self.db_path, timeout_sec=BUSY_TIMEOUT_SEC)
+            while True:
+                timeout = None
+                if first_at:
+                    timeout = max(0.0, first_at + WRITE_FLUSH_SEC - time.monotonic())
+                try:
+                    msg = self._q.get(timeout=timeout)
+                except queue.Empty:
+                    _flush()
+                    continue
+
+                if msg is None:
+                    _flush()
+                    return
+
+                kind = msg[0]
+                if kind == "match":
+                    pending.append(msg[1])
+                elif kind == "seen":
+                    seen.append(msg[1])
+                elif kind == "call":
+                    _flush()
+                    fn, loop, fut = msg[1], msg[2], msg[3]
+                    try:
+                        res = fn(con)
+                    except BaseException as e:
+                        loop.call_soon_threadsafe(_set_future, fut, None, e)
+                    else:
+                        loop.call_soon_threadsafe(_set_future, fut, res, None)
+                    continue
+
+                if not first_at:
+                    first_at = time.monotonic()
+                if len(pending) + len(seen) >= WRITE_BATCH_SIZE:
+                    _flush()
+        except BaseException as e:
+            self._error = e
+            # 기다리는 put()이 막히지 않게 남은 것 비우기
+            while True:
+                try:
+                    msg = self._q.get_nowait()
+                except queue.Empty:
+                    break
+                if msg and msg[0] == "call":
+                    msg[2].call_soon_threadsafe(_set_future, msg[3], None, e)
+        finally:
+            if con is not None:
+                con.close()
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _raise_if_dead(self) -> None:
+        self._raise_if_failed()
+        if not self._thread.is_alive():
+            raise RuntimeError("sync writer thread is not running")
+
+    async def _put(self, msg: tuple) -> None:
+        self._raise_if_dead()
+        try:
+            self._q.put_nowait(msg)
+        except queue.Full:
+            self.stalls += 1
+            while True:
+                self._raise_if_dead()
+                try:
+                    await asyncio.to_thread(self._q.put, msg, True, 1.0)
+                    return
+                except queue.Full:
+                    continue
+
+    async def put_match(self, item: PendingMatch) -> None:
+        await self._put(("match", item))
+
+    async def put_seen(self, match_id: str, reason: str) -> None:
+        await self._put(("seen", (match_id, reason)))
+
+    async def call(self, fn: Callable[[Any], Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        await self._put(("call", fn, loop, fut))
+        # 넣은 직후 writer가 죽으면(실패 처리에서 큐를 이미 비운 뒤) fut이 안 깨어남 → 스레드 생존 확인하며 대기
+        while True:
+            done, _ = await asyncio.wait({fut}, timeout=1.0)
+            if done:
+                return fut.result()
+            if not self._thread.is_alive():
+                await asyncio.sleep(0)  # 죽기 직전에 넘긴 결과(call_soon_threadsafe) 먼저 반영
+                if fut.done():
+                    return fut.result()
+                self._raise_if_dead()
+
+    async def close(self) -> None:
+        if self._thread.is_alive():
+            await asyncio.to_thread(self._q.put, None)
+            await asyncio.to_thread(self._thread.join)
+        self._raise_if_failed()
+
+
+def _set_future(fut: asyncio.Future, result: Any, error: Optional[BaseException]) -> None:
+    if fut.done():
+        return
+    if error is not None:
+        fut.set_exception(error)
+    else:
+        fut.set_result(result)
+
+
+def _reset_no_clan_ledger(con, clan_ids: Set[str]) -> None:
+    """
+    match_ledger의 no_clan은 기록할 때의 멤버 기준 판정 → 멤버가 새로 들어오면 그 사람 매치가 계속 스킵됨.
+    지난 sync 이후 추가된 멤버가 있으면(처음이면 목록을 모르니 무조건) no_clan 기록을 지워서 다시 판정.
+    (다시 받는 매치는 match_cache가 있으면 디스크에서 읽음)
+    """
+    row = con.execute("SELECT value FROM sync_state WHERE key=?", (STATE_KEY_WEEKLY_SYNC_CLAN_IDS,)).fetchone()
+    prev = {x for x in (row[0] or "").split(",") if x} if row else None
+    if prev == clan_ids:
+        return
+    added = clan_ids - prev if prev is not None else clan_ids
+
+    con.execute("BEGIN IMMEDIATE;")
+    try:
+        cleared = 0
+        if added:
+            cleared = con.execute(
+                "DELETE FROM match_ledger WHERE platform=? AND reason='no_clan'", (SHARD,)
+            ).rowcount
+        con.execute(
+            """
+            INSERT INTO sync_state (key, value, updated_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET value=excluded.value, updated_at=excluded.updated_at
+            """,
+            (STATE_KEY_WEEKLY_SYNC_CLAN_IDS, ",".join(sorted(clan_ids)), int(time.time())),
+        )
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+    if added:
+        print(f"[LEDGER] members_added={len(added)} cleared_no_clan={cleared}", flush=True)
+
+
+def _ensure_rollup_ready(con) -> None:
+    """롤업이 아직 없으면(첫 실행/수리 후) matches 기준으로 한 번 다시 계산하고 ready 표시"""
+    if weekly_rollup.is_ready(con):
+        return
+    con.execute("BEGIN IMMEDIATE;")
+    try:
+        n = weekly_rollup.rebuild(con, SHARD)
+        weekly_rollup.mark_ready(con)
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+    print(f"[ROLLUP] rebuilt weekly_player_kills rows={n}", flush=True)
+
+
+def _finalize_retention(con, keep_from_utc: str) -> None:
+    """3) 오래된 매치/원장/롤업 삭제 + 4) 지난주 스냅샷(없으면 생성) — writer 스레드에서 실행"""
+    con.execute("BEGIN IMMEDIATE;")
+    try:
+        con.execute("DELETE FROM matches WHERE created_at_utc < ?", (keep_from_utc,))
+        con.execute("DELETE FROM match_ledger WHERE expires_at <= ?", (int(time.time()),))
+        weekly_rollup.delete_before(con, SHARD, keep_from_utc)
+        _create_last_week_snapshots_if_missing(con)
         con.commit()
     except Exception:
         con.rollback()
@@ -337,40 +806,18 @@ def _snapshot_exists(con, week_start_utc_z: str, scope: str) -> bool:
 
 
 def _query_weekly_top10(con, week_start_utc_z: str, week_end_utc_z: str, scope: str) -> List[Tuple[str, int]]:
-    scope = (scope or "total").lower()
-    if scope == "normal":
-        scope_clause = "AND COALESCE(m.is_ranked, 0) = 0"
-    elif scope == "ranked":
-        scope_clause = "AND COALESCE(m.is_ranked, 0) = 1"
-    else:
-        scope_clause = ""
-
-    sql = f"""
-    SELECT
-      p.player_name AS player_name,
-      COALESCE(SUM(pm.kills), 0) AS kills
-    FROM clan_members cm
-    JOIN players p
-      ON p.platform = cm.platform AND p.account_id = cm.account_id
-    JOIN player_matches pm
-      ON pm.platform = cm.platform AND pm.account_id = cm.account_id
-    JOIN matches m
-      ON m.platform = pm.platform AND m.match_id = pm.match_id
-    WHERE
-      cm.clan_id = ?
-      AND cm.platform = ?
-      AND COALESCE(cm.is_active, 1) = 1
-      AND m.created_at_utc >= ?
-      AND m.created_at_utc <  ?
-      AND m.game_mode IN ('solo','duo','squad','solo-fpp','duo-fpp','squad-fpp')
-      AND COALESCE(m.is_casual, 0) = 0
-      AND COALESCE(m.is_custom_match, 0) = 0
-      {scope_clause}
-    GROUP BY p.player_name
-    ORDER BY kills DESC, p.player_name ASC
-    LIMIT 10;
-    """
-    rows = con.execute(sql, (CLAN_ID_ALIAS, SHARD, week_start_utc_z, week_end_utc_z)).fetchall()
+    # 봇 /주간랭킹과 같은 SQL(조인 순서/인덱스 고정) + 6모드만
+    sql = build_weekly_sql(scope, official_modes_only=True)
+    rows = con.execute(
+        sql,
+        {
+            "clan_id": CLAN_ID_ALIAS,
+            "platform": SHARD,
+            "start_utc": week_start_utc_z,
+            "end_utc": week_end_utc_z,
+            "limit": 10,
+        },
+    ).fetchall()
     return [(r[0], int(r[1])) for r in rows]
 
 
@@ -408,46 +855,77 @@ def _create_last_week_snapshots_if_missing(con) -> None:
             )
 
 
-async def _get_players_by_ids_safe(client: PubgApiClient, ids: List[str]) -> List[Dict[str, Any]]:
+async def _get_players_by_ids_safe(client: PubgApiClient, ids: List[str], bad: List[str]) -> List[Dict[str, Any]]:
     """
     filter[playerIds] 배치 조회가 404로 터지는 케이스 방어:
-    - 배치(<=10)가 404면 1개씩 쪼개서 가능한 것만 수집
+    - 배치(<=10)가 404면 절반씩 나눠서(bisection) 잘못된 id만 골라내고 나머지는 수집
+    - 골라낸 id는 bad에 추가(→ bad_player_ids)
     """
-    ids = [i.strip() for i in (ids or []) if str(i).strip()]
-    if not ids:
-        return []
+    players, bad_ids = await client.get_players_by_ids_bisect(ids)
+    for one in bad_ids:
+        print(f"[WARN] get_players_by_ids 404: {one}", flush=True)
+    bad.extend(bad_ids)
+    return players
+
+
+def _load_bad_player_ids(con) -> Set[str]:
+    rows = con.execute(
+        "SELECT account_id FROM bad_player_ids WHERE platform=? AND expires_at > ?",
+        (SHARD, int(time.time())),
+    ).fetchall()
+    return {r[0] for r in rows}
 
-    # PubgApiClient에 get_players_by_ids가 없을 수도 있어 fallback
-    async def _call(batch: List[str]) -> List[Dict[str, Any]]:
-        if hasattr(client, "get_players_by_ids"):
-            return await client.get_players_by_ids(batch)  # type: ignore
-        data, _ = await client._get("/players", params={"filter[playerIds]": ",".join(batch)})
-        return data.get("data") or []
 
+def _record_bad_player_ids(con, bad: List[str], rechecked: List[str]) -> None:
+    """
+    bad: 이번에 404로 확인된 id, rechecked: 이번에 조회했는데 정상이었던 id(→ 목록에서 제거)
+    운영자용으로 현재 목록을 sync_state(weekly_sync_bad_player_ids)에도 남김(/status)
+    """
+    now = int(time.time())
+    con.execute("BEGIN IMMEDIATE;")
     try:
-        return await _call(ids)
-    except PubgApiError as e:
-        msg = str(e)
-        if ("404" in msg or "Not Found" in msg) and len(ids) > 1:
-            out: List[Dict[str, Any]] = []
-            for one in ids:
-                try:
-                    got = await _call([one])
-                    out.extend(got)
-                except PubgApiError as e2:
-                    print(f"[WARN] get_players_by_ids failed: {one} {e2}", flush=True)
-            return out
+        con.executemany(
+            """
+            INSERT INTO bad_player_ids (platform, account_id, first_seen_at, last_seen_at, expires_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(platform, account_id) DO UPDATE SET
+              last_seen_at=excluded.last_seen_at,
+              expires_at=excluded.expires_at
+            """,
+            [(SHARD, aid, now, now, now + BAD_PLAYER_TTL_SEC) for aid in bad],
+        )
+        con.executemany(
+            "DELETE FROM bad_player_ids WHERE platform=? AND account_id=?",
+            [(SHARD, aid) for aid in rechecked],
+        )
+        rows = con.execute(
+            "SELECT account_id FROM bad_player_ids WHERE platform=? ORDER BY last_seen_at DESC",
+            (SHARD,),
+        ).fetchall()
+        con.execute(
+            """
+            INSERT INTO sync_state (key, value, updated_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET value=excluded.value, updated_at=excluded.updated_at
+            """,
+            (STATE_KEY_WEEKLY_SYNC_BAD_PLAYER_IDS, ",".join(r[0] for r in rows), now),
+        )
+        con.commit()
+    except Exception:
+        con.rollback()
         raise
 
 
 async def main() -> None:
-    if not API_KEY:
+    if not API_KEYS:
         raise SystemExit("PUBG_API_KEY is empty (.env에 PUBG_API_KEY 설정 필요)")
     if not DB_PATH.exists():
         raise SystemExit(f"DB not found: {DB_PATH}")
 
     con = open_db_sync(str(DB_PATH), timeout_sec=BUSY_TIMEOUT_SEC)
     locked_by = f"{socket.gethostname()}:{os.getpid()}"
+    writer: Optional[_MatchWriter] = None
+    match_cache: Optional[MatchPayloadCache] = None
 
     try:
         _ensure_tables(con)
@@ -457,90 +935,129 @@ async def main() -> None:
             print(f"[SKIP] already running: job={JOB_NAME} locked_until={locked_until}", flush=True)
             return
 
+        _ensure_rollup_ready(con)
+
         members = _get_active_clan_members(con)
         if not members:
             raise SystemExit("clan_members에 활성 멤버가 없음. 먼저 멤버 등록/동기화 필요.")
 
         clan_ids = {aid for (aid, _nm) in members}
+        _reset_no_clan_ledger(con, clan_ids)
 
         # 보관 정책: 지난주 시작(UTC)보다 오래된 매치는 삭제
         last_w = last_week_window_utc()
         keep_from_utc = last_w.start_utc_z
 
+        writer = _MatchWriter(str(DB_PATH)).start()
+
         # 1) playerIds로 10명씩 배치 조회해서 최근 match id 수집 (✅ 여기 수정)
         all_recent_match_ids: Set[str] = set()
+        match_cache = MatchPayloadCache(MATCH_CACHE_PATH, MATCH_CACHE_MAX_BYTES) if MATCH_CACHE_PATH else None
         async with aiohttp.ClientSession() as session:
-            client = PubgApiClient(API_KEY, SHARD, session, rpm=10, max_retries=3)
+            client = PubgApiClient(
+                API_KEYS, SHARD, session, rpm=10, max_retries=3,
+                limiter_factory=lambda key: shared_limiter(
+                    str(DB_PATH), key, priority=PRIORITY_BACKGROUND, reserved=RATE_RESERVED_INTERACTIVE
+                ),
+                match_concurrency=MATCH_FETCH_CONCURRENCY, match_cache=match_cache,
+            )
 
-            ids = [aid for (aid, _nm) in members]
-            for batch in _chunked(ids, 10):
-                players = await _get_players_by_ids_safe(client, batch)
+            known_bad = _load_bad_player_ids(con)
+            ids = [aid for (aid, _nm) in members if aid not in known_bad]
+            if known_bad:
+                print(f"[SKIP] bad_player_ids={len(known_bad)} (404 negative cache)", flush=True)
+            last_played: Dict[str, int] = {}
+            if POLL_SCHEDULER:
+                ids, plan, last_played = _plan_member_polls(con, ids)
+                print(
+                    f"[SCHED] members={plan['members']} active={plan['active']} polled={plan['polled']} "
+                    f"players_calls={plan['calls']} saved_calls={plan['calls_saved']}",
+                    flush=True,
+                )
+
+            # 키 수만큼 배치를 동시에 보냄(키별 리미터가 각각 간격을 지킴)
+            discover_sem = asyncio.Semaphore(len(client.api_keys))
+
+            bad_ids: List[str] = []
+
+            async def _discover(batch: List[str]) -> List[Dict[str, Any]]:
+                async with discover_sem:
+                    return await _get_players_by_ids_safe(client, batch, bad_ids)
+
+            watermarks = _load_watermarks(con)
+            heads: Dict[str, Tuple[str, List[str]]] = {}  # account_id -> (최신 ref, 워터마크 이후 refs)
+            total_refs = 0
+            found_ids: List[str] = []
+
+            for players in await asyncio.gather(*(_discover(b) for b in _chunked(ids, 10))):
                 for p in players:
+                    if p.get("id"):
+                        found_ids.append(p["id"])
                     rel = (p.get("relationships") or {}).get("matches") or {}
-                    refs = rel.get("data") or []
-                    for m in refs:
-                        mid = m.get("id")
-                        if mid:
-                            all_recent_match_ids.add(mid)
+                    refs = [m.get("id") for m in (rel.get("data") or []) if m.get("id")]
+                    total_refs += len(refs)
+                    wm = watermarks.get(p.get("id"))
+                    fresh = _refs_since(refs, wm[0] if wm else None)
+                    if refs and p.get("id"):
+                        heads[p["id"]] = (refs[0], fresh)
+                    all_recent_match_ids.update(fresh)
+
+            print(f"[DISCOVER] refs={total_refs} after_watermark={len(all_recent_match_ids)}", flush=True)
 
             candidates = list(all_recent_match_ids)
             exist = _existing_match_ids(con, candidates)
             new_match_ids = [mid for mid in candidates if mid not in exist]
 
-            inserted = 0
             skipped_old = 0
-            pending: List[Tuple[str, str, str, int, int, int, List[Tuple[str, str, int]]]] = []
-
-            # 2) 새 매치만 상세 조회(/matches) 후 DB 저장
-            for mid in new_match_ids:
-                try:
-                    mj, _ = await client._get(f"/matches/{mid}")
-                except PubgApiError as e:
-                    print(f"[WARN] match fetch failed: {mid} {e}", flush=True)
-                    continue
-
-                data = mj.get("data") or {}
-                attrs = data.get("attributes") or {}
-                created_at_utc = (attrs.get("createdAt") or "").strip()
-                game_mode = (attrs.get("gameMode") or "").strip().lower()
-
-                if not created_at_utc:
-                    continue
-
-                if created_at_utc < keep_from_utc:
-                    skipped_old += 1
-                    continue
-
-                if game_mode and game_mode not in ALLOWED_MODES:
-                    continue
-
-                is_ranked, is_custom_match, is_casual = _classify_match_flags(attrs, game_mode)
-                rows = _extract_participant_kills(mj, clan_ids)
-                if not rows:
-                    continue
-
-                pending.append((mid, created_at_utc, game_mode, is_ranked, is_custom_match, is_casual, rows))
-
-                if len(pending) >= WRITE_BATCH_SIZE:
-                    _flush_pending(con, pending)
-                    inserted += len(pending)
-                    pending.clear()
-
-            if pending:
-                _flush_pending(con, pending)
-                inserted += len(pending)
-                pending.clear()
+            failed: Set[str] = set()
+
+            # 2) 새 매치만 상세 조회(/matches, 동시 N개) → 파싱(옵션: 프로세스 풀) → writer 스레드가 배치로 DB 저장
+            match_times: Dict[str, str] = {}  # 이번에 받은 매치 시각(스킵 포함) → 워터마크 시각
+            async for mid, item, reason, created_at_utc in _iter_parsed_matches(client, new_match_ids, clan_ids, keep_from_utc):
+                if created_at_utc:
+                    match_times[mid] = created_at_utc
+                if reason == "fetch_failed":
+                    failed.add(mid)
+                    continue  # 조회 실패는 원장/워터마크에 안 남김 → 다음 주기에 재시도
+
+                if item is None:
+                    if reason == "old":
+                        skipped_old += 1
+                    await writer.put_seen(mid, reason)
+                else:
+                    await writer.put_match(item)
+
+        if match_cache is not None:
+            cs = match_cache.stats()
+            print(
+                f"[CACHE] match hits={cs['hits']} misses={cs['misses']} evictions={cs['evictions']} "
+                f"entries={cs['entries']} bytes={cs['bytes']}",
+                flush=True,
+            )
 
-        # 3) 오래된 매치 삭제(지난주 시작 이전)
-        con.execute("BEGIN IMMEDIATE;")
-        try:
-            con.execute("DELETE FROM matches WHERE created_at_utc < ?", (keep_from_utc,))
-            # 4) 지난주 스냅샷(없으면 생성)
-            _create_last_week_snapshots_if_missing(con)
-            con.commit()
-        except Exception:
-            con.rollback()
-            raise
+        # 워터마크는 그 멤버의 새 매치가 전부 처리됐을 때만 전진
+        advance = [
+            (aid, head, match_times.get(head))
+            for aid, (head, fresh) in heads.items()
+            if head != (watermarks.get(aid) or (None,))[0] and not failed.intersection(fresh)
+        ]
+        await writer.call(lambda wcon: _advance_watermarks(wcon, advance))
+        await writer.call(lambda wcon: _record_bad_player_ids(wcon, bad_ids, found_ids))
+        # 새 ref가 보인 멤버: 워터마크가 있던 멤버는 지금 플레이한 것으로,
+        # 처음 보는 멤버는 14일치 ref가 전부 fresh라 최신 ref(매치)의 시각으로
+        now = int(time.time())
+        for aid, (head, fresh) in heads.items():
+            if not fresh:
+                continue
+            seen_at = now if aid in watermarks else _utc_z_to_epoch(match_times.get(head))
+            last_played[aid] = max(last_played.get(aid, 0), seen_at)
+        await writer.call(lambda wcon: _update_poll_state(wcon, ids, last_played))
+
+        # 3) 오래된 매치 삭제(지난주 시작 이전) + 4) 지난주 스냅샷 — 남은 배치 커밋 후 writer에서
+        await writer.call(lambda wcon: _finalize_retention(wcon, keep_from_utc))
+        await writer.close()
+        inserted = writer.inserted
+        print(f"[WRITER] commits={writer.commits} inserted={inserted} stalls={writer.stalls}", flush=True)
 
         await set_weekly_sync_last_utc_z(str(DB_PATH), _to_z(datetime.now(timezone.utc)))
         await set_weekly_sync_last_error(str(DB_PATH), "")
@@ -555,6 +1072,13 @@ async def main() -> None:
             )
 
     finally:
+        if writer is not None:
+            try:
+                await writer.close()
+            except Exception as e:
+                print(f"[WARN] writer close failed: {type(e).__name__}: {e}", flush=True)
+        if match_cache is not None:
+            match_cache.close()
         try:
             _release_job_lock(con, JOB_NAME, locked_by)
         finally: